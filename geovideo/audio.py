@@ -1,45 +1,140 @@
 from __future__ import annotations
 
+import math
+import subprocess
+import wave
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional
 
-from moviepy.audio.AudioClip import CompositeAudioClip
-from moviepy.audio.io.AudioFileClip import AudioFileClip
+import numpy as np
+from moviepy.config import get_setting
+from numpy.lib.stride_tricks import sliding_window_view
 
+from geovideo.audio_cache import AudioCache
 from geovideo.schemas import AudioConfig
 
+CHANNELS = 2
+# Ducking decisions are made on 10 ms hops of the voiceover, then interpolated per sample.
+ENVELOPE_HOP_S = 0.01
+
 
 @dataclass
 class AudioTracks:
-    music: Optional[AudioFileClip]
-    voiceover: Optional[AudioFileClip]
+    music: Optional[np.ndarray]
+    voiceover: Optional[np.ndarray]
+    sample_rate: int
+
+
+def decode_audio(path: str, sample_rate: int, duration: Optional[float] = None) -> np.ndarray:
+    """Decode any ffmpeg-readable file to float32 PCM shaped (samples, CHANNELS)."""
+    cmd = [get_setting("FFMPEG_BINARY"), "-v", "error", "-i", path]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.6f}"]
+    cmd += ["-f", "f32le", "-acodec", "pcm_f32le", "-ac", str(CHANNELS), "-ar", str(sample_rate), "-"]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to decode audio {path}: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, CHANNELS)
+
+
+def decode_cached(path: str, sample_rate: int, duration: float, cache: Optional[AudioCache]) -> np.ndarray:
+    length = int(round(duration * sample_rate))
+    if cache is None:
+        return decode_audio(path, sample_rate, duration)[:length]
+    key = cache.key(path, sample_rate, CHANNELS)
+    pcm = cache.load(key)
+    if pcm is None:
+        # Cache the whole track so other durations reuse the same entry.
+        pcm = cache.store(key, decode_audio(path, sample_rate))
+    return pcm[:length]
 
 
-def load_audio(config: AudioConfig, duration: float) -> AudioTracks:
-    music = AudioFileClip(config.music_path).volumex(config.music_volume) if config.music_path else None
+def audio_cache_for(config: AudioConfig) -> Optional[AudioCache]:
+    if not config.cache_dir:
+        return None
+    return AudioCache(Path(config.cache_dir), max_bytes=int(config.cache_max_mb * 2**20))
+
+
+def load_audio(config: AudioConfig, duration: float, cache: Optional[AudioCache] = None) -> AudioTracks:
+    sample_rate = config.sample_rate
+    if cache is None:
+        cache = audio_cache_for(config)
+    music = (
+        decode_cached(config.music_path, sample_rate, duration, cache) * config.music_volume
+        if config.music_path
+        else None
+    )
     voice = (
-        AudioFileClip(config.voiceover_path).volumex(config.voiceover_volume)
+        decode_cached(config.voiceover_path, sample_rate, duration, cache) * config.voiceover_volume
         if config.voiceover_path
         else None
     )
-    if music:
-        music = music.subclip(0, min(duration, music.duration)).audio_fadein(config.fade_in).audio_fadeout(
-            config.fade_out
-        )
-    if voice:
-        voice = voice.subclip(0, min(duration, voice.duration))
-    return AudioTracks(music=music, voiceover=voice)
-
-
-def mix_audio(tracks: AudioTracks, config: AudioConfig) -> Optional[CompositeAudioClip]:
-    clips = []
-    if tracks.music:
-        clips.append(tracks.music)
-    if tracks.voiceover:
-        clips.append(tracks.voiceover)
-    if not clips:
+    if music is not None:
+        music = music * fade_envelope(len(music), sample_rate, config.fade_in, config.fade_out)[:, None]
+    return AudioTracks(music=music, voiceover=voice, sample_rate=sample_rate)
+
+
+def fade_envelope(length: int, sample_rate: int, fade_in: float, fade_out: float) -> np.ndarray:
+    gain = np.ones(length, dtype=np.float32)
+    fade_in_n = min(int(round(fade_in * sample_rate)), length)
+    fade_out_n = min(int(round(fade_out * sample_rate)), length)
+    if fade_in_n > 0:
+        gain[:fade_in_n] = np.linspace(0.0, 1.0, fade_in_n, endpoint=False, dtype=np.float32)
+    if fade_out_n > 0:
+        gain[length - fade_out_n :] *= np.linspace(1.0, 0.0, fade_out_n, dtype=np.float32)
+    return gain
+
+
+def ducking_envelope(voice: np.ndarray, sample_rate: int, config: AudioConfig) -> np.ndarray:
+    """Per-sample music gain: 1.0 while the voice is silent, ducking_ratio while it speaks."""
+    hop = max(int(round(ENVELOPE_HOP_S * sample_rate)), 1)
+    mono = voice.mean(axis=1) if voice.ndim == 2 else voice
+    hops = math.ceil(len(mono) / hop)
+    padded = np.zeros(hops * hop, dtype=np.float32)
+    padded[: len(mono)] = mono
+    rms = np.sqrt(np.mean(padded.reshape(hops, hop) ** 2, axis=1))
+    speaking = (20.0 * np.log10(rms + 1e-10) > config.ducking_threshold_db).astype(np.float32)
+
+    # Linear ramps as a weighted sliding max: ducking reaches full depth when the voice
+    # starts (attack looks ahead, the whole track is known) and recovers over the release.
+    attack_hops = max(int(math.ceil(config.ducking_attack / ENVELOPE_HOP_S)), 0)
+    release_hops = max(int(math.ceil(config.ducking_release / ENVELOPE_HOP_S)), 0)
+    release_weights = 1.0 - np.arange(release_hops + 1, dtype=np.float32) / (release_hops + 1)
+    attack_weights = 1.0 - np.arange(attack_hops + 1, dtype=np.float32) / (attack_hops + 1)
+    past = np.concatenate([np.zeros(release_hops, dtype=np.float32), speaking])
+    future = np.concatenate([speaking, np.zeros(attack_hops, dtype=np.float32)])
+    released = (sliding_window_view(past, release_hops + 1)[:, ::-1] * release_weights).max(axis=1)
+    attacked = (sliding_window_view(future, attack_hops + 1) * attack_weights).max(axis=1)
+    amount = np.maximum(released, attacked)
+
+    hop_gain = 1.0 - (1.0 - config.ducking_ratio) * amount
+    hop_centers = (np.arange(hops) + 0.5) * hop
+    return np.interp(np.arange(len(mono)), hop_centers, hop_gain).astype(np.float32)
+
+
+def mix_audio(tracks: AudioTracks, config: AudioConfig) -> Optional[np.ndarray]:
+    if tracks.music is None and tracks.voiceover is None:
         return None
-    if tracks.music and tracks.voiceover:
-        music = tracks.music.volumex(config.ducking_ratio)
-        return CompositeAudioClip([music, tracks.voiceover])
-    return CompositeAudioClip(clips)
+    length = max(len(track) for track in (tracks.music, tracks.voiceover) if track is not None)
+    mix = np.zeros((length, CHANNELS), dtype=np.float32)
+    if tracks.music is not None:
+        music = tracks.music
+        if tracks.voiceover is not None:
+            voice = np.zeros((len(music), CHANNELS), dtype=np.float32)
+            overlap = min(len(music), len(tracks.voiceover))
+            voice[:overlap] = tracks.voiceover[:overlap]
+            music = music * ducking_envelope(voice, tracks.sample_rate, config)[:, None]
+        mix[: len(music)] += music
+    if tracks.voiceover is not None:
+        mix[: len(tracks.voiceover)] += tracks.voiceover
+    return np.clip(mix, -1.0, 1.0, out=mix)
+
+
+def write_wav(path: Path, pcm: np.ndarray, sample_rate: int) -> None:
+    samples = (np.clip(pcm, -1.0, 1.0) * 32767.0).round().astype("<i2")
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(samples.shape[1])
+        handle.setsampwidth(2)
+        handle.setframerate(sample_rate)
+        handle.writeframes(samples.tobytes())
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+_DIGEST_CHUNK = 1 << 20
+# Digests of unchanged files, shared by every cache in the process so batch runs hash each track once.
+_SOURCE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_DIGEST_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_digest(source: str | Path) -> str:
+    """file_digest, skipped for files whose path, size and mtime have not changed since the last call."""
+    stat = os.stat(source)
+    memo_key = (str(Path(source).resolve()), stat.st_size, stat.st_mtime_ns)
+    digest = _SOURCE_DIGESTS.get(memo_key)
+    if digest is None:
+        digest = _SOURCE_DIGESTS[memo_key] = file_digest(source)
+    return digest
+
+
+@dataclass
+class AudioCache:
+    """Decoded PCM keyed by source content, sample rate and channel layout, stored as .npy files."""
+
+    root: Path
+    max_bytes: int
+
+    def key(self, source: str, sample_rate: int, channels: int) -> str:
+        return f"{source_digest(source)[:32]}-{sample_rate}hz-{channels}ch"
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}.npy"
+
+    def load(self, key: str) -> Optional[np.ndarray]:
+        path = self.path(key)
+        try:
+            pcm = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        os.utime(path)
+        return pcm
+
+    def store(self, key: str, pcm: np.ndarray) -> np.ndarray:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=f".{key}.", suffix=".npy")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.save(handle, np.ascontiguousarray(pcm))
+            os.replace(tmp_name, self.path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict(keep=key)
+        return np.load(self.path(key), mmap_mode="r")
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        entries = []
+        for path in self.root.glob("*.npy"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == self.path(keep):
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Literal, Sequence
+
+from geovideo.camera import CameraState, auto_camera
+from geovideo.compositor import Compositor, FrameContext
+from geovideo.providers.base import TileProvider
+from geovideo.providers.osm import build_osm_provider
+from geovideo.providers.synthetic import SyntheticTileProvider
+from geovideo.schemas import InputConfig
+
+TileSource = Literal["synthetic", "offline"]
+
+BENCH_CENTER = (21.028511, 105.804817)
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    preset: Literal["classic", "social_map"]
+    width: int
+    height: int
+    poi_count: int
+    polygon_vertices: int
+    # keyframed pans and zooms the camera every frame, so no static layer is ever reused.
+    camera: Literal["static", "keyframed"] = "static"
+
+    @property
+    def name(self) -> str:
+        name = f"{self.preset}-{self.width}x{self.height}-poi{self.poi_count}-poly{self.polygon_vertices}"
+        return name if self.camera == "static" else f"{name}-{self.camera}"
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    fps: float
+    first_frame_ms: float
+    peak_mem_mb: float
+
+
+def default_cases(quick: bool = False) -> List[BenchCase]:
+    presets = ("classic", "social_map")
+    sizes = ((540, 960),) if quick else ((540, 960), (1080, 1920))
+    poi_counts = (4,) if quick else (4, 30)
+    polygons = (4, 2048)
+    cases = [
+        BenchCase(preset, width, height, pois, vertices)
+        for preset in presets
+        for width, height in sizes
+        for pois in poi_counts
+        for vertices in polygons
+    ]
+    cases.extend(BenchCase(preset, 540, 960, 4, 4, camera="keyframed") for preset in presets)
+    return cases
+
+
+def build_case_config(case: BenchCase, duration: float = 10.0) -> InputConfig:
+    lat, lon = BENCH_CENTER
+    pois = []
+    for idx in range(case.poi_count):
+        angle = 2 * math.pi * idx / max(case.poi_count, 1)
+        radius = 0.002 + 0.0015 * (idx % 3)
+        kind = ("school", "market", "food", "other")[idx % 4]
+        pois.append(
+            {"name": f"POI {idx + 1}", "lat": lat + radius * math.sin(angle), "lon": lon + radius * math.cos(angle), "type": kind}
+        )
+    polygon = []
+    for idx in range(case.polygon_vertices):
+        angle = 2 * math.pi * idx / case.polygon_vertices
+        wobble = 1.0 + 0.08 * math.sin(angle * 7)
+        polygon.append(
+            {"name": f"P{idx}", "lat": lat + 0.0035 * wobble * math.sin(angle), "lon": lon + 0.0035 * wobble * math.cos(angle)}
+        )
+    timeline: dict = {"duration": duration}
+    if case.camera == "keyframed":
+        timeline["camera_keyframes"] = [
+            {"time": 0.0, "zoom": 15},
+            {"time": duration, "lat": lat + 0.004, "lon": lon + 0.004, "zoom": 16},
+        ]
+    return InputConfig.model_validate(
+        {
+            "center": {"name": "Center", "lat": lat, "lon": lon},
+            "pois": pois,
+            "max_pois": max(case.poi_count, 30),
+            "style": {
+                "width": case.width,
+                "height": case.height,
+                "ui_preset": case.preset,
+                "show_polygon": True,
+                "polygon_points": polygon,
+                "subtitle": "Benchmark subtitle",
+                "social_zoom_factor": 1.28 if case.preset == "social_map" else 1.0,
+            },
+            "timeline": timeline,
+        }
+    )
+
+
+def bench_provider(source: TileSource, cache_dir: Path) -> TileProvider:
+    if source == "synthetic":
+        return SyntheticTileProvider()
+    return build_osm_provider(str(cache_dir), max_retries=1, throttle_s=0.0)
+
+
+@contextmanager
+def _tile_environment(source: TileSource) -> Iterator[None]:
+    # The offline source relies on GEOVIDEO_OFFLINE placeholder tiles; restore the caller's setting afterwards.
+    previous = os.environ.get("GEOVIDEO_OFFLINE")
+    if source == "offline":
+        os.environ["GEOVIDEO_OFFLINE"] = "1"
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("GEOVIDEO_OFFLINE", None)
+        else:
+            os.environ["GEOVIDEO_OFFLINE"] = previous
+
+
+def run_case(case: BenchCase, frames: int, source: TileSource = "synthetic", repeats: int = 3) -> BenchResult:
+    config = build_case_config(case)
+    with tempfile.TemporaryDirectory() as cache_dir, _tile_environment(source):
+        provider = bench_provider(source, Path(cache_dir))
+        camera = _case_camera(config)
+        times = [config.timeline.duration * idx / frames for idx in range(frames)]
+
+        start = time.perf_counter()
+        compositor = Compositor(config, provider)
+        compositor.render_frame(FrameContext(time_s=times[0], camera=camera))
+        first_frame_s = time.perf_counter() - start
+
+        # Best of several passes, as timeit does: slower passes measure machine noise, not the renderer.
+        best_s = math.inf
+        for _ in range(max(repeats, 1)):
+            start = time.perf_counter()
+            for t in times:
+                compositor.render_frame(FrameContext(time_s=t, camera=camera))
+            best_s = min(best_s, time.perf_counter() - start)
+        fps = frames / best_s
+
+        # Separate pass: tracemalloc slows allocation-heavy code, so it must not skew fps.
+        tracemalloc.start()
+        try:
+            compositor = Compositor(config, provider)
+            for t in times[: max(3, frames // 4)]:
+                compositor.render_frame(FrameContext(time_s=t, camera=camera))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return BenchResult(fps=round(fps, 2), first_frame_ms=round(first_frame_s * 1000, 2), peak_mem_mb=round(peak / 2**20, 2))
+
+
+def run_benchmark(
+    cases: Sequence[BenchCase], frames: int, source: TileSource = "synthetic", repeats: int = 3
+) -> Dict[str, BenchResult]:
+    return {case.name: run_case(case, frames, source, repeats) for case in cases}
+
+
+def compare_to_baseline(
+    results: Dict[str, BenchResult], baseline: Dict[str, Dict[str, float]], tolerance: float
+) -> List[str]:
+    regressions: List[str] = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        min_fps = expected["fps"] * (1 - tolerance)
+        if result.fps < min_fps:
+            regressions.append(f"{name}: {result.fps:.1f} fps < {min_fps:.1f} (baseline {expected['fps']:.1f})")
+        # 1 MB of slack keeps tiny cases from flapping on allocator noise.
+        max_mem = expected["peak_mem_mb"] * (1 + tolerance) + 1.0
+        if result.peak_mem_mb > max_mem:
+            regressions.append(
+                f"{name}: peak {result.peak_mem_mb:.1f} MB > {max_mem:.1f} MB (baseline {expected['peak_mem_mb']:.1f})"
+            )
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, float]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("cases", {})
+
+
+def write_results(path: Path, results: Dict[str, BenchResult], frames: int, source: TileSource) -> None:
+    payload = {
+        "meta": {
+            "frames": frames,
+            "tiles": source,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor() or None,
+        },
+        "cases": {name: asdict(result) for name, result in results.items()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def _case_camera(config: InputConfig) -> CameraState:
+    return auto_camera(
+        (config.center.lat, config.center.lon),
+        [(poi.lat, poi.lon) for poi in config.pois],
+        config.style.width,
+        config.style.height,
+        config.style.margin_ratio,
+    )
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from geovideo.geometry import SIMPLIFY_TOLERANCE_PX, clip_ring, project_mercator, simplify_mask, world_scale
+from geovideo.schemas import Location, Rgba
+
+# Masks are drawn at 4x and box-filtered down, which anti-aliases edges without per-frame cost.
+BOUNDARY_SUPERSAMPLE = 4
+
+
+@dataclass
+class Boundary:
+    """Polygon rings as open (n, 2) normalized mercator arrays; holes are cut from the union of outers."""
+
+    outers: List[np.ndarray]
+    holes: List[np.ndarray] = field(default_factory=list)
+    _levels: Dict[int, Tuple[List[np.ndarray], List[np.ndarray]]] = field(default_factory=dict, repr=False)
+
+    @property
+    def vertex_count(self) -> int:
+        return sum(len(ring) for ring in self.outers + self.holes)
+
+    def at_zoom(self, zoom: int) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        level = self._levels.get(zoom)
+        if level is None:
+            tolerance = SIMPLIFY_TOLERANCE_PX / world_scale(zoom)
+            level = self._levels[zoom] = (_simplify_rings(self.outers, tolerance), _simplify_rings(self.holes, tolerance))
+        return level
+
+
+def _simplify_rings(rings: List[np.ndarray], tolerance: float) -> List[np.ndarray]:
+    simplified = []
+    for ring in rings:
+        extent = ring.max(axis=0) - ring.min(axis=0)
+        if extent.max() < tolerance:
+            continue
+        ring = ring[simplify_mask(ring, tolerance)]
+        if len(ring) >= 3:
+            simplified.append(ring)
+    return simplified
+
+
+def _open_ring(lats: np.ndarray, lons: np.ndarray) -> Optional[np.ndarray]:
+    ring = project_mercator(lats, lons)
+    if len(ring) >= 2 and np.array_equal(ring[0], ring[-1]):
+        ring = ring[:-1]
+    return ring if len(ring) >= 3 else None
+
+
+def boundary_from_points(points: Sequence[Location]) -> Optional[Boundary]:
+    ring = _open_ring(np.array([p.lat for p in points]), np.array([p.lon for p in points]))
+    return Boundary(outers=[ring]) if ring is not None else None
+
+
+def load_geojson(source: str | Dict[str, Any]) -> Boundary:
+    """Polygons from a GeoJSON file path or object: (Multi)Polygon geometries, Features and collections."""
+    data = json.loads(Path(source).read_text(encoding="utf-8")) if isinstance(source, str) else source
+    outers: List[np.ndarray] = []
+    holes: List[np.ndarray] = []
+    for polygon in _geojson_polygons(data):
+        for index, coordinates in enumerate(polygon):
+            # Positions may carry an altitude; only lon/lat matter here.
+            coords = np.asarray([position[:2] for position in coordinates], dtype=np.float64).reshape(-1, 2)
+            ring = _open_ring(coords[:, 1], coords[:, 0])
+            if ring is not None:
+                (outers if index == 0 else holes).append(ring)
+    if not outers:
+        raise ValueError("GeoJSON contains no Polygon or MultiPolygon geometry")
+    return Boundary(outers=outers, holes=holes)
+
+
+def _geojson_polygons(obj: Dict[str, Any]) -> Iterator[list]:
+    kind = obj.get("type")
+    if kind == "FeatureCollection":
+        for feature in obj.get("features", []):
+            yield from _geojson_polygons(feature)
+    elif kind == "Feature":
+        if obj.get("geometry"):
+            yield from _geojson_polygons(obj["geometry"])
+    elif kind == "GeometryCollection":
+        for geometry in obj.get("geometries", []):
+            yield from _geojson_polygons(geometry)
+    elif kind == "Polygon":
+        yield obj["coordinates"]
+    elif kind == "MultiPolygon":
+        yield from obj["coordinates"]
+
+
+def render_boundary(
+    boundary: Boundary,
+    zoom: int,
+    origin: Tuple[float, float],
+    pixels_per_unit: float,
+    size: Tuple[int, int],
+    fill: Optional[Rgba],
+    outline: Rgba,
+    outline_width: int,
+) -> Optional[Tuple[Image.Image, Tuple[int, int]]]:
+    """Anti-aliased RGBA patch covering the visible boundary and its top-left offset, or None if off screen."""
+    width, height = size
+    pad = outline_width + 2
+    rect = (-pad, -pad, width + pad, height + pad)
+    origin_arr = np.asarray(origin)
+    outers, holes = boundary.at_zoom(zoom)
+    clipped_outers = _clip_rings(outers, origin_arr, pixels_per_unit, rect)
+    if not clipped_outers:
+        return None
+    clipped_holes = _clip_rings(holes, origin_arr, pixels_per_unit, rect)
+
+    # Only supersample the part of the frame the boundary actually covers.
+    all_points = np.concatenate(clipped_outers)
+    x0 = max(int(math.floor(all_points[:, 0].min())) - outline_width, 0)
+    y0 = max(int(math.floor(all_points[:, 1].min())) - outline_width, 0)
+    x1 = min(int(math.ceil(all_points[:, 0].max())) + outline_width + 1, width)
+    y1 = min(int(math.ceil(all_points[:, 1].max())) + outline_width + 1, height)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    region = (x1 - x0, y1 - y0)
+    ss = BOUNDARY_SUPERSAMPLE
+    offset = np.array([x0, y0], dtype=np.float64)
+
+    def flat(ring: np.ndarray) -> list:
+        return ((ring - offset) * ss).ravel().tolist()
+
+    patch = Image.new("RGBA", region, (0, 0, 0, 0))
+    if fill is not None:
+        mask = Image.new("L", (region[0] * ss, region[1] * ss), 0)
+        draw = ImageDraw.Draw(mask)
+        for ring in clipped_outers:
+            draw.polygon(flat(ring), fill=255)
+        for ring in clipped_holes:
+            draw.polygon(flat(ring), fill=0)
+        patch.alpha_composite(_tinted(mask.resize(region, Image.Resampling.BOX), fill))
+    mask = Image.new("L", (region[0] * ss, region[1] * ss), 0)
+    draw = ImageDraw.Draw(mask)
+    for ring in clipped_outers + clipped_holes:
+        draw.line(flat(np.vstack([ring, ring[:1]])), fill=255, width=outline_width * ss, joint="curve")
+    patch.alpha_composite(_tinted(mask.resize(region, Image.Resampling.BOX), outline))
+    return patch, (x0, y0)
+
+
+def _clip_rings(
+    rings: List[np.ndarray], origin: np.ndarray, pixels_per_unit: float, rect: Tuple[float, float, float, float]
+) -> List[np.ndarray]:
+    clipped = []
+    for ring in rings:
+        screen = (ring - origin) * pixels_per_unit
+        low, high = screen.min(axis=0), screen.max(axis=0)
+        if high[0] < rect[0] or low[0] > rect[2] or high[1] < rect[1] or low[1] > rect[3]:
+            continue
+        if low[0] < rect[0] or high[0] > rect[2] or low[1] < rect[1] or high[1] > rect[3]:
+            screen = clip_ring(screen, rect)
+        if len(screen) >= 3:
+            clipped.append(screen)
+    return clipped
+
+
+def _tinted(mask: Image.Image, color: Rgba) -> Image.Image:
+    layer = Image.new("RGBA", mask.size, tuple(color[:3]) + (0,))
+    layer.putalpha(mask.point(lambda value: value * color[3] // 255))
+    return layer
@@ -11,6 +11,7 @@ class CameraState:
     center_lat: float
     center_lon: float
     zoom: int
+    bearing: float = 0.0
 
 
 def compute_bounds(center: Tuple[float, float], points: Iterable[Tuple[float, float]]) -> Bounds:
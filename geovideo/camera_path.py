@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List, Set, Tuple
+
+import numpy as np
+
+from geovideo.camera import CameraState
+from geovideo.geometry import project_mercator
+from geovideo.schemas import CameraKeyframe, InputConfig
+
+TileKey = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class CameraPath:
+    """Camera parameters for every frame of a render, as parallel arrays indexed by frame."""
+
+    fps: float
+    lat: np.ndarray
+    lon: np.ndarray
+    zoom: np.ndarray
+    bearing: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.zoom)
+
+    def index_at(self, time_s: float) -> int:
+        return min(max(int(round(time_s * self.fps)), 0), len(self) - 1)
+
+    def state(self, index: int) -> CameraState:
+        return CameraState(
+            center_lat=float(self.lat[index]),
+            center_lon=float(self.lon[index]),
+            zoom=int(round(float(self.zoom[index]))),
+            bearing=float(self.bearing[index]),
+        )
+
+    def state_at(self, time_s: float) -> CameraState:
+        return self.state(self.index_at(time_s))
+
+
+def frame_count(duration: float, fps: float) -> int:
+    return max(int(round(duration * fps)), 1)
+
+
+def resolve_keyframes(config: InputConfig, base: CameraState) -> List[CameraKeyframe]:
+    """Keyframes sorted by time with every field filled in; the legacy zoom ramp if none are configured."""
+    timeline = config.timeline
+    start_zoom = timeline.camera_start_zoom or base.zoom
+    if not timeline.camera_keyframes:
+        end_zoom = timeline.camera_end_zoom or base.zoom
+        start = CameraKeyframe(time=0.0, lat=base.center_lat, lon=base.center_lon, zoom=start_zoom, bearing=0.0)
+        if timeline.duration <= 0:
+            return [start.model_copy(update={"zoom": base.zoom})]
+        return [start, start.model_copy(update={"time": timeline.duration, "zoom": end_zoom, "ease": timeline.ease})]
+
+    resolved: List[CameraKeyframe] = []
+    lat, lon, zoom, bearing = base.center_lat, base.center_lon, float(start_zoom), base.bearing
+    for keyframe in sorted(timeline.camera_keyframes, key=lambda item: item.time):
+        if keyframe.focus_poi is not None:
+            poi = config.pois[keyframe.focus_poi]
+            lat, lon = poi.lat, poi.lon
+        elif keyframe.lat is not None:
+            lat, lon = keyframe.lat, keyframe.lon
+        zoom = keyframe.zoom if keyframe.zoom is not None else zoom
+        bearing = keyframe.bearing if keyframe.bearing is not None else bearing
+        resolved.append(
+            CameraKeyframe(time=keyframe.time, lat=lat, lon=lon, zoom=zoom, bearing=bearing, ease=keyframe.ease)
+        )
+    return resolved
+
+
+def compile_camera_path(config: InputConfig, base: CameraState) -> CameraPath:
+    fps = float(config.style.fps)
+    keyframes = resolve_keyframes(config, base)
+    times = np.arange(frame_count(config.timeline.duration, fps)) / fps
+    key_times = np.array([keyframe.time for keyframe in keyframes])
+    lats = np.array([keyframe.lat for keyframe in keyframes])
+    lons = np.array([keyframe.lon for keyframe in keyframes])
+    zooms = np.array([keyframe.zoom for keyframe in keyframes], dtype=np.float64)
+    bearings = np.array([keyframe.bearing for keyframe in keyframes], dtype=np.float64)
+    if len(keyframes) == 1:
+        constant = np.ones_like(times)
+        return CameraPath(fps, lats[0] * constant, lons[0] * constant, zooms[0] * constant, bearings[0] * constant)
+
+    # Segment i runs from keyframe i to i + 1; times outside the track hold the first/last keyframe.
+    seg = np.clip(np.searchsorted(key_times, times, side="right") - 1, 0, len(keyframes) - 2)
+    t0, t1 = key_times[seg], key_times[seg + 1]
+    local = np.clip((times - t0) / np.maximum(t1 - t0, 1e-9), 0.0, 1.0)
+    smooth = np.array([keyframe.ease == "ease_in_out" for keyframe in keyframes])[seg + 1]
+    eased = np.where(smooth, local * local * (3 - 2 * local), local)
+
+    def lerp(values: np.ndarray) -> np.ndarray:
+        return values[seg] + (values[seg + 1] - values[seg]) * eased
+
+    # Pan in mercator space so moves look straight on screen; frames at or between equal keyframes
+    # take the keyframe latitude as is rather than a projection round trip.
+    merc_y = lerp(project_mercator(lats, lons)[:, 1])
+    lat = np.degrees(np.arctan(np.sinh(math.pi * (1 - 2 * merc_y))))
+    lat = np.where((eased <= 0) | (lats[seg] == lats[seg + 1]), lats[seg], lat)
+    lat = np.where(eased >= 1, lats[seg + 1], lat)
+    # Turn the short way round.
+    turns = (np.diff(bearings) + 180.0) % 360.0 - 180.0
+    unwrapped = np.concatenate([bearings[:1], bearings[0] + np.cumsum(turns)])
+    bearing = lerp(unwrapped) % 360.0
+    return CameraPath(fps, lat, lerp(lons), lerp(zooms), bearing)
+
+
+def path_tiles(
+    path: CameraPath,
+    span: Tuple[float, float],
+    rotated_span: float,
+    render_scale: float,
+    tile_px: int,
+) -> Set[TileKey]:
+    """Every tile the basemap of any frame needs, computed for all frames at once.
+
+    span is the unscaled frame size; frames with a bearing cover a rotated_span square instead.
+    Mirrors the tile window in Compositor._render_basemap.
+    """
+    rotated = (path.bearing % 360.0) != 0.0
+    width = np.where(rotated, rotated_span, span[0])
+    height = np.where(rotated, rotated_span, span[1])
+    camera_zoom = np.round(path.zoom).astype(np.int64)
+    offset = int(round(math.log2(render_scale))) - int(round(math.log2(tile_px / 256)))
+    zoom = camera_zoom + np.maximum(offset, -camera_zoom)
+    tile_scale = 2.0 ** (zoom - camera_zoom) * tile_px / 256
+    canvas_w = np.ceil(width * tile_scale)
+    canvas_h = np.ceil(height * tile_scale)
+    world = project_mercator(path.lat, path.lon) * (tile_px * 2.0**zoom)[:, None]
+    left = world[:, 0] - canvas_w / 2
+    top = world[:, 1] - canvas_h / 2
+    x0, y0 = np.floor(left / tile_px), np.floor(top / tile_px)
+    x1, y1 = np.floor((left + canvas_w) / tile_px), np.floor((top + canvas_h) / tile_px)
+    windows = np.unique(np.column_stack([zoom, x0, y0, x1, y1]).astype(np.int64), axis=0)
+    tiles: Set[TileKey] = set()
+    for z, wx0, wy0, wx1, wy1 in windows.tolist():
+        tiles.update((z, x, y) for x in range(wx0, wx1 + 1) for y in range(wy0, wy1 + 1))
+    return tiles
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class FrameCanvas:
+    """Hands out (height, width, 3) uint8 frame buffers and counts every full-frame allocation or copy."""
+
+    width: int
+    height: int
+    copies: int = 0
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return (self.height, self.width, 3)
+
+    def allocate(self) -> np.ndarray:
+        self.copies += 1
+        return np.empty(self.shape, dtype=np.uint8)
+
+    def copy_into(self, dst: np.ndarray, src: np.ndarray) -> None:
+        self.copies += 1
+        np.copyto(dst, src)
+
+
+def _clip(
+    frame: np.ndarray, sprite_shape: Sequence[int], x: int, y: int
+) -> Optional[Tuple[Tuple[slice, slice], Tuple[slice, slice]]]:
+    height, width = frame.shape[:2]
+    sprite_h, sprite_w = sprite_shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + sprite_w, width), min(y + sprite_h, height)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return (slice(y0, y1), slice(x0, x1)), (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+
+
+def _blend(dst: np.ndarray, src: np.ndarray, alpha: np.ndarray) -> None:
+    # PIL's fixed-point BLEND/DIV255, so mask blends match what ImageDraw would have produced.
+    value = dst * (255 - alpha) + src * alpha + 128
+    dst[...] = (value + (value >> 8)) >> 8
+
+
+def blend_mask(frame: np.ndarray, mask: np.ndarray, color: Sequence[int], x: int, y: int) -> None:
+    """Blend a solid color through an 8-bit coverage mask into the frame, in place and clipped."""
+    clipped = _clip(frame, mask.shape, x, y)
+    if clipped is None:
+        return
+    target, source = clipped
+    alpha = mask[source][..., None].astype(np.int32)
+    if not alpha.any():
+        return
+    _blend(frame[target], np.asarray(color, dtype=np.int32), alpha)
+
+
+def blend_mask_under(
+    frame: np.ndarray,
+    mask: np.ndarray,
+    color: Sequence[int],
+    x: int,
+    y: int,
+    under: np.ndarray,
+    over_black: np.ndarray,
+    over_gain: np.ndarray,
+) -> None:
+    """Like blend_mask, but into `under` and beneath the layers drawn over it.
+
+    Those layers are given as their rendering on black (over_black) and on white minus that (over_gain),
+    which is exact for any stack of fills, masks and alpha blends.
+    """
+    clipped = _clip(frame, mask.shape, x, y)
+    if clipped is None:
+        return
+    target, source = clipped
+    alpha = mask[source][..., None].astype(np.int32)
+    if not alpha.any():
+        return
+    patch = under[target].astype(np.int32)
+    _blend(patch, np.asarray(color, dtype=np.int32), alpha)
+    frame[target] = over_black[target] + (over_gain[target] * patch + 127) // 255
+
+
+def apply_over(region: np.ndarray, over_black: np.ndarray, over_gain: np.ndarray) -> None:
+    """Put layers given as their rendering on black and on white minus black back on top of region, in place."""
+    region[...] = over_black + (over_gain * region.astype(np.int32) + 127) // 255
+
+
+def blend_rgba(frame: np.ndarray, sprite: np.ndarray, x: int, y: int, swap_rb: bool = False) -> None:
+    """Alpha-blend an RGBA sprite onto an opaque frame in place; swap_rb writes into BGR frames."""
+    clipped = _clip(frame, sprite.shape, x, y)
+    if clipped is None:
+        return
+    target, source = clipped
+    patch = sprite[source]
+    color = patch[..., 2::-1] if swap_rb else patch[..., :3]
+    _blend(frame[target], color, patch[..., 3:4].astype(np.int32))
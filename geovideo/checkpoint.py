@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from moviepy.config import get_setting
+
+from geovideo.audio_cache import source_digest
+from geovideo.schemas import AudioConfig, InputConfig, OutputConfig
+
+# Output fields that only decide where results land; they never change a frame.
+_LOCATION_FIELDS = ("path", "work_dir", "keep_segments", "cache_dir", "cache_max_mb")
+
+
+@dataclass(frozen=True)
+class Segment:
+    index: int
+    start_frame: int
+    frame_count: int
+
+    def frame_indices(self) -> range:
+        return range(self.start_frame, self.start_frame + self.frame_count)
+
+
+def config_digest(config: InputConfig, seed: Optional[int], fit: str) -> str:
+    data = config.model_dump(mode="json")
+    for field in _LOCATION_FIELDS:
+        data["output"].pop(field, None)
+    payload = json.dumps({"config": data, "seed": seed, "fit": fit}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def audio_digest(audio: AudioConfig) -> Optional[str]:
+    """Digest of the audio files a mix is made from, so editing one in place invalidates the mix."""
+    sources = {"music": audio.music_path, "voiceover": audio.voiceover_path}
+    parts = [f"{role}={source_digest(path)}" for role, path in sources.items() if path]
+    if not parts:
+        return None
+    return hashlib.sha256(";".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def plan_segments(duration: float, fps: int, segment_seconds: float) -> List[Segment]:
+    total_frames = max(int(round(duration * fps)), 1)
+    per_segment = max(int(round(segment_seconds * fps)), 1)
+    segments: List[Segment] = []
+    for index, start in enumerate(range(0, total_frames, per_segment)):
+        segments.append(Segment(index=index, start_frame=start, frame_count=min(per_segment, total_frames - start)))
+    return segments
+
+
+def segment_ffmpeg_params(output: OutputConfig, segment: Segment) -> List[str]:
+    # One closed GOP per segment so every segment starts on an IDR frame and
+    # the concat demuxer can stitch them with a stream copy.
+    gop = str(segment.frame_count)
+    return [
+        "-crf",
+        str(output.crf),
+        "-g",
+        gop,
+        "-keyint_min",
+        gop,
+        "-sc_threshold",
+        "0",
+        "-flags",
+        "+cgop",
+    ]
+
+
+@dataclass
+class RenderCheckpoint:
+    work_dir: Path
+    segments: List[Segment]
+    # The mix is named after its inputs' digest; the audio settings are already part of the work dir name.
+    audio_digest: Optional[str] = None
+
+    def prepare(self) -> None:
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+
+    def clear(self) -> None:
+        if self.work_dir.exists():
+            shutil.rmtree(self.work_dir)
+
+    def segment_path(self, segment: Segment) -> Path:
+        return self.work_dir / f"segment_{segment.index:05d}.mp4"
+
+    def partial_path(self, segment: Segment) -> Path:
+        return self.work_dir / f"segment_{segment.index:05d}.partial.mp4"
+
+    @property
+    def audio_path(self) -> Path:
+        return self.work_dir / f"audio.{self.audio_digest}.wav"
+
+    @property
+    def partial_audio_path(self) -> Path:
+        return self.work_dir / f"audio.{self.audio_digest}.partial.wav"
+
+    def is_done(self, segment: Segment) -> bool:
+        return self.segment_path(segment).exists()
+
+    def pending(self) -> List[Segment]:
+        return [segment for segment in self.segments if not self.is_done(segment)]
+
+    def commit(self, segment: Segment) -> None:
+        os.replace(self.partial_path(segment), self.segment_path(segment))
+
+    def commit_audio(self) -> None:
+        os.replace(self.partial_audio_path, self.audio_path)
+        # Mixes of earlier versions of the audio files are never read again.
+        for stale in self.work_dir.glob("audio.*.wav"):
+            if stale != self.audio_path:
+                stale.unlink(missing_ok=True)
+
+    def concat_and_mux(self, output: Path, audio_path: Optional[Path], faststart: bool) -> None:
+        list_path = self.work_dir / "segments.txt"
+        lines = [f"file '{_escape_concat_path(self.segment_path(segment))}'" for segment in self.segments]
+        list_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        partial_output = output.with_name(f".{output.stem}.partial{output.suffix}")
+        cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", str(list_path)]
+        if audio_path is not None:
+            cmd += ["-i", str(audio_path), "-map", "0:v:0", "-map", "1:a:0", "-c:v", "copy", "-c:a", "aac", "-shortest"]
+        else:
+            cmd += ["-c", "copy"]
+        if faststart:
+            cmd += ["-movflags", "+faststart"]
+        cmd.append(str(partial_output))
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to concat segments: {result.stderr.decode('utf-8', 'replace').strip()}")
+        os.replace(partial_output, output)
+
+
+def _escape_concat_path(path: Path) -> str:
+    return str(path.resolve()).replace("'", "'\\''")
@@ -3,18 +3,34 @@ from __future__ import annotations
 import json
 import random
 import shutil
+import time
+from contextlib import closing
+from dataclasses import asdict
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import numpy as np
 import typer
-from moviepy.video.VideoClip import VideoClip
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
 
-from geovideo.audio import load_audio, mix_audio
+from geovideo.audio import load_audio, mix_audio, write_wav
+from geovideo.benchmark import compare_to_baseline, default_cases, load_baseline, run_benchmark, write_results
 from geovideo.camera import CameraState, auto_camera
+from geovideo.checkpoint import RenderCheckpoint, audio_digest, config_digest, plan_segments, segment_ffmpeg_params
 from geovideo.compositor import Compositor, FrameContext
+from geovideo.draft import compare_to_full_quality, draft_config
+from geovideo.events import NULL_EVENTS, NullEvents, open_events
+from geovideo.load_benchmark import run_load_benchmark
+from geovideo.osm_import import build_import_config, import_overpass
+from geovideo.output_cache import output_cache_for, output_cache_key, tile_fingerprint
+from geovideo.prefetch import prefetch_tiles
+from geovideo.preview import contact_sheet as build_contact_sheet
+from geovideo.preview import frame_paths, preview_times, render_frames, save_gif
+from geovideo.profiling import NULL_PROFILER, Profiler, profile_paths
 from geovideo.providers import build_provider
-from geovideo.schemas import InputConfig
+from geovideo.schemas import InputConfig, Location
+from geovideo.tileserver import FaultProfile, TileServer
+from geovideo.verify import DEFAULT_MAX_DIFF, DEFAULT_MAX_MEAN_DIFF, DEFAULT_MIN_SSIM, verify_backend
 
 app = typer.Typer(help="Generate vertical real-estate map videos from geographic inputs.")
 
@@ -45,44 +61,174 @@ def _build_camera(config: InputConfig, fit: str) -> CameraState:
     )
 
 
-def _render_video(config: InputConfig, seed: Optional[int], fit: str, verbose: bool) -> None:
+def _sample_times(duration: float) -> list[float]:
+    return [duration * fraction for fraction in (0.25, 0.5, 0.75)]
+
+
+def _render_video(
+    config: InputConfig,
+    seed: Optional[int],
+    fit: str,
+    verbose: bool,
+    resume: bool = True,
+    draft_scale: Optional[float] = None,
+    compare: bool = False,
+    profile: bool = False,
+    use_cache: bool = True,
+    events: NullEvents = NULL_EVENTS,
+) -> None:
+    full_config = config
+    # With --events stdout, stdout carries nothing but the JSON lines.
+    err = events.on_stdout
+    if draft_scale is not None:
+        config = draft_config(config, draft_scale)
+    started = time.perf_counter()
     if seed is not None:
         random.seed(seed)
         np.random.seed(seed)
+    profiler = Profiler() if profile else NULL_PROFILER
     provider = build_provider(config.provider)
-    camera = _build_camera(config, fit)
-    compositor = Compositor(config, provider)
-
-    def make_frame(t: float) -> np.ndarray:
-        ctx = FrameContext(time_s=t, camera=camera)
-        return compositor.render_frame(ctx)
-
-    clip = VideoClip(make_frame, duration=config.timeline.duration)
-    if verbose:
-        typer.echo("Rendering video frames...")
-
-    tracks = load_audio(config.audio, config.timeline.duration)
-    audio = mix_audio(tracks, config.audio)
-    if audio:
-        clip = clip.with_audio(audio)
-
-    output = Path(config.output.path)
-    output.parent.mkdir(parents=True, exist_ok=True)
-    ffmpeg_params = []
-    if config.output.faststart:
-        ffmpeg_params += ["-movflags", "+faststart"]
-    ffmpeg_params += ["-pix_fmt", "yuv420p", "-crf", str(config.output.crf)]
-    codec_params = {"codec": "libx264", "audio_codec": "aac", "fps": config.style.fps}
-    if config.output.bitrate:
-        codec_params["bitrate"] = config.output.bitrate
-    clip.write_videofile(
-        str(output),
-        **codec_params,
-        preset=config.output.preset,
-        ffmpeg_params=ffmpeg_params,
-        threads=4,
-        logger="bar" if verbose else None,
-    )
+    try:
+        provider.profiler = profiler
+        output = Path(config.output.path)
+        # A profile of a cache hit would be empty, so profiling always renders.
+        output_cache = output_cache_for(config) if use_cache and not profile else None
+        cache_key: Optional[str] = None
+        if output_cache is not None:
+            cache_key = output_cache_key(config, seed, fit, provider)
+            if output_cache.fetch(cache_key, output):
+                if verbose:
+                    typer.echo(f"Reused cached render {cache_key[:12]} -> {output}", err=err)
+                events.emit("done", output=str(output), cached=True, bytes_written=output.stat().st_size)
+                return
+            provider.tile_log = {}
+        camera = _build_camera(config, fit)
+        compositor = Compositor(config, provider, profiler=profiler)
+        fps = config.style.fps
+        # The camera track is known up front, so every tile is pulled in parallel before the first frame.
+        tiles = compositor.path_tiles(camera)
+        events.phase("prefetch", tiles=len(tiles))
+        with profiler.span("prefetch_tiles", "tiles"):
+            prefetch = prefetch_tiles(provider, tiles)
+        tile_hit_ratio = round(prefetch.cached / len(tiles), 4) if tiles else None
+        events.emit(
+            "tiles",
+            cached=prefetch.cached,
+            fetched=prefetch.fetched,
+            failed=len(prefetch.failed),
+            hit_ratio=tile_hit_ratio,
+        )
+        if verbose and prefetch.fetched + len(prefetch.failed):
+            typer.echo(f"Prefetched tiles: {prefetch.describe()}", err=err)
+
+        segments = plan_segments(config.timeline.duration, fps, config.output.segment_seconds)
+        checkpoint = RenderCheckpoint(
+            Path(config.output.work_dir) / config_digest(config, seed, fit),
+            segments,
+            audio_digest(config.audio),
+        )
+        if not resume:
+            checkpoint.clear()
+        checkpoint.prepare()
+        pending = checkpoint.pending()
+        if verbose and len(pending) < len(segments):
+            done = len(segments) - len(pending)
+            typer.echo(f"Resuming render: {done}/{len(segments)} segments already done", err=err)
+        if verbose:
+            typer.echo("Rendering video frames...", err=err)
+        total_frames = sum(segment.frame_count for segment in segments)
+        if events.enabled:
+            done_segments = [segment for segment in segments if segment not in pending]
+            events.start_frames(
+                total_frames,
+                sum(segment.frame_count for segment in done_segments),
+                sum(checkpoint.segment_path(segment).stat().st_size for segment in done_segments),
+            )
+
+        # One frame buffer for the whole render; the writer consumes each frame before the next is drawn.
+        frame_buffer = compositor.canvas.allocate()
+        for segment in pending:
+            writer = FFMPEG_VideoWriter(
+                str(checkpoint.partial_path(segment)),
+                (compositor.frame_width, compositor.frame_height),
+                fps,
+                codec="libx264",
+                preset=config.output.preset,
+                bitrate=config.output.bitrate,
+                threads=4,
+                ffmpeg_params=segment_ffmpeg_params(config.output, segment),
+            )
+            events.phase("render", segment=segment.index, segments=len(segments), total_frames=total_frames)
+            events.writing(checkpoint.partial_path(segment))
+            try:
+                for frame_index in segment.frame_indices():
+                    ctx = FrameContext(time_s=frame_index / fps, camera=camera)
+                    with profiler.span("render_frame", frame=frame_index):
+                        frame = compositor.render_frame(ctx, out=frame_buffer)
+                    with profiler.span("encode_write", "encode"):
+                        writer.write_frame(frame)
+                    events.frame_done()
+            finally:
+                events.phase("encode", segment=segment.index)
+                with profiler.span("encode_flush", "encode", segment=segment.index):
+                    writer.close()
+            checkpoint.commit(segment)
+            events.wrote(checkpoint.segment_path(segment))
+            events.emit("segment", index=segment.index, done=segment.index + 1, total=len(segments))
+            if verbose:
+                typer.echo(f"Segment {segment.index + 1}/{len(segments)} done", err=err)
+
+        audio_path: Optional[Path] = None
+        if config.audio.music_path or config.audio.voiceover_path:
+            if not checkpoint.audio_path.exists():
+                events.phase("audio")
+                with profiler.span("audio_mix", "audio"):
+                    tracks = load_audio(config.audio, config.timeline.duration)
+                    mix = mix_audio(tracks, config.audio)
+                    if mix is not None:
+                        write_wav(checkpoint.partial_audio_path, mix, tracks.sample_rate)
+                        checkpoint.commit_audio()
+            if checkpoint.audio_path.exists():
+                audio_path = checkpoint.audio_path
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        events.phase("mux")
+        with profiler.span("concat_mux", "mux"):
+            checkpoint.concat_and_mux(output, audio_path, config.output.faststart)
+        events.emit(
+            "done",
+            output=str(output),
+            cached=False,
+            frames=total_frames,
+            tile_hit_ratio=tile_hit_ratio,
+            bytes_written=output.stat().st_size,
+            render_s=round(time.perf_counter() - started, 3),
+        )
+        if not config.output.keep_segments:
+            checkpoint.clear()
+        if output_cache is not None and cache_key is not None:
+            # Segments resumed from an earlier run used tiles this run never touched;
+            # only cache when every frame was rendered here with real tiles.
+            tiles = tile_fingerprint(provider) if len(pending) == len(segments) else None
+            if tiles is not None:
+                output_cache.store(cache_key, output, tiles)
+        if isinstance(profiler, Profiler):
+            summary_path, trace_path = profile_paths(output)
+            profiler.write(summary_path, trace_path)
+            if verbose:
+                typer.echo(f"Profile written to {summary_path} and {trace_path}", err=err)
+        if draft_scale is not None:
+            elapsed = time.perf_counter() - started
+            message = f"Draft render finished in {elapsed:.1f}s."
+            if compare:
+                # Renders full-quality frames, which fetches full-zoom tiles on a cold cache.
+                report = compare_to_full_quality(
+                    full_config, config, provider, camera, _sample_times(config.timeline.duration)
+                )
+                message = f"{message} {report.describe()}"
+            typer.echo(message, err=err)
+    finally:
+        provider.close()
 
 
 @app.command()
@@ -99,6 +245,14 @@ def render(
     user_agent: Optional[str] = typer.Option(None, "--user-agent"),
     seed: Optional[int] = typer.Option(None, "--seed"),
     fit: str = typer.Option("all", "--fit"),
+    work_dir: Optional[str] = typer.Option(None, "--work-dir", help="Directory for resumable segment checkpoints."),
+    resume: bool = typer.Option(True, "--resume/--no-resume", help="Reuse finished segments from an interrupted render."),
+    draft: bool = typer.Option(False, "--draft", help="Render scaled down with a fast encoder preset."),
+    draft_scale: float = typer.Option(0.5, "--draft-scale", help="Render scale used by --draft."),
+    compare: bool = typer.Option(False, "--compare", help="With --draft, also time full-quality frames."),
+    profile: bool = typer.Option(False, "--profile", help="Write a stage timing summary and a Chrome trace."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always render, even if an identical output is cached."),
+    events: Optional[str] = typer.Option(None, "--events", help="JSON-lines progress to stdout, fd:N or a file."),
     verbose: bool = typer.Option(False, "--verbose"),
 ) -> None:
     config = _load_config(input)
@@ -120,26 +274,209 @@ def render(
         config.provider.cache_dir = cache_dir
     if user_agent:
         config.provider.user_agent = user_agent
+    if work_dir:
+        config.output.work_dir = work_dir
     config = InputConfig.model_validate(config.model_dump())
-    _render_video(config, seed, fit, verbose)
+    emitter = _open_events(events)
+    try:
+        _render_video(
+            config,
+            seed,
+            fit,
+            verbose,
+            resume=resume,
+            draft_scale=draft_scale if draft else None,
+            compare=compare,
+            profile=profile,
+            use_cache=not no_cache,
+            events=emitter,
+        )
+    finally:
+        emitter.close()
+
+
+@app.command()
+def batch(
+    inputs: List[Path] = typer.Argument(..., exists=True, help="Project configs, rendered one after another."),
+    seed: Optional[int] = typer.Option(None, "--seed"),
+    fit: str = typer.Option("all", "--fit"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always render, even if an identical output is cached."),
+    events: Optional[str] = typer.Option(None, "--events", help="JSON-lines progress to stdout, fd:N or a file."),
+    verbose: bool = typer.Option(False, "--verbose"),
+) -> None:
+    """Render each config to its own output.path; a failed job is reported and the rest still run."""
+    emitter = _open_events(events)
+    failed = 0
+    try:
+        for index, path in enumerate(inputs):
+            emitter.set_context(job=index, jobs=len(inputs), input=str(path))
+            emitter.emit("job")
+            try:
+                _render_video(_load_config(path), seed, fit, verbose, use_cache=not no_cache, events=emitter)
+            except Exception as exc:  # noqa: BLE001 - one bad job must not stop the batch
+                failed += 1
+                emitter.emit("error", message=str(exc))
+                typer.echo(f"{path}: {exc}", err=True)
+        emitter.set_context()
+        emitter.emit("batch_done", jobs=len(inputs), failed=failed)
+    finally:
+        emitter.close()
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def _open_events(target: Optional[str]) -> NullEvents:
+    try:
+        return open_events(target)
+    except (OSError, ValueError) as exc:
+        raise typer.BadParameter(str(exc), param_hint="--events") from exc
 
 
 @app.command()
 def preview(
     input: Path = typer.Option(..., "--input", exists=True),
-    frame_time: float = typer.Option(3.2, "--frame-time"),
-    out: Path = typer.Option(..., "--out"),
+    frame_time: Optional[List[float]] = typer.Option(None, "--frame-time", help="Frame time in seconds; repeatable."),
+    start: float = typer.Option(0.0, "--start", help="First frame time when using --step."),
+    end: Optional[float] = typer.Option(None, "--end", help="Last frame time when using --step (default: duration)."),
+    step: Optional[float] = typer.Option(None, "--step", help="Render a frame every STEP seconds."),
+    out: Path = typer.Option(..., "--out", help="Image path; a .gif suffix writes an animated GIF."),
+    contact_sheet: bool = typer.Option(False, "--contact-sheet", help="Combine all frames into one image."),
+    columns: int = typer.Option(4, "--columns", help="Contact sheet columns."),
+    thumb_width: int = typer.Option(270, "--thumb-width", help="Contact sheet thumbnail width."),
+    draft: bool = typer.Option(False, "--draft", help="Render scaled down for quick layout checks."),
+    draft_scale: float = typer.Option(0.5, "--draft-scale", help="Render scale used by --draft."),
+    compare: bool = typer.Option(False, "--compare", help="With --draft, also time full-quality frames."),
 ) -> None:
-    config = _load_config(input)
-    provider = build_provider(config.provider)
+    full_config = _load_config(input)
+    config = draft_config(full_config, draft_scale) if draft else full_config
+    try:
+        times = preview_times(frame_time, start, end, step, config.timeline.duration)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
     camera = _build_camera(config, fit="all")
-    compositor = Compositor(config, provider)
-    ctx = FrameContext(time_s=frame_time, camera=camera)
-    frame = compositor.render_frame(ctx)
+    with closing(build_provider(config.provider)) as provider:
+        frames = render_frames(Compositor(config, provider), camera, times)
+        report = None
+        if draft and compare:
+            report = compare_to_full_quality(full_config, config, provider, camera, times[:3])
     Path(out).parent.mkdir(parents=True, exist_ok=True)
     import cv2
 
-    cv2.imwrite(str(out), frame)
+    if out.suffix.lower() == ".gif":
+        save_gif(frames, out, step or 1.0 / config.style.fps)
+    elif contact_sheet:
+        build_contact_sheet(frames, times, columns=columns, thumb_width=thumb_width).save(out)
+    else:
+        for path, frame in zip(frame_paths(out, times), frames):
+            cv2.imwrite(str(path), frame)
+    if len(times) > 1:
+        typer.echo(f"Rendered {len(times)} frames")
+    if report is not None:
+        typer.echo(report.describe())
+
+
+@app.command()
+def bench(
+    quick: bool = typer.Option(False, "--quick", help="Run the reduced case matrix."),
+    frames: int = typer.Option(30, "--frames", help="Timed frames per case."),
+    repeats: int = typer.Option(3, "--repeats", help="Timed passes per case; the fastest is kept."),
+    tiles: str = typer.Option("synthetic", "--tiles", help="Tile source: synthetic or offline."),
+    baseline: Path = typer.Option(Path("tests/benchmarks/baseline.json"), "--baseline"),
+    tolerance: float = typer.Option(0.25, "--tolerance", help="Allowed relative fps/memory regression."),
+    update_baseline: bool = typer.Option(False, "--update-baseline", help="Store these results as the baseline."),
+    out: Optional[Path] = typer.Option(None, "--out", help="Also write results to this JSON file."),
+) -> None:
+    if tiles not in {"synthetic", "offline"}:
+        raise typer.BadParameter("--tiles must be one of: synthetic, offline")
+    results = run_benchmark(default_cases(quick), frames, tiles, repeats)
+    for name, result in results.items():
+        typer.echo(
+            f"{name:<48} {result.fps:8.1f} fps  first {result.first_frame_ms:8.1f} ms  peak {result.peak_mem_mb:7.1f} MB"
+        )
+    if out:
+        write_results(out, results, frames, tiles)
+    if update_baseline:
+        write_results(baseline, results, frames, tiles)
+        typer.echo(f"Baseline updated: {baseline}")
+        return
+    regressions = compare_to_baseline(results, load_baseline(baseline), tolerance)
+    for message in regressions:
+        typer.echo(f"REGRESSION {message}", err=True)
+    if regressions:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def tile_server(
+    port: int = typer.Option(8765, "--port"),
+    host: str = typer.Option("127.0.0.1", "--host"),
+    latency_ms: float = typer.Option(0.0, "--latency-ms", help="Median response latency."),
+    latency_sigma: float = typer.Option(0.0, "--latency-sigma", help="Log-normal spread of the latency."),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Share of requests answered 500."),
+    throttle_rate: float = typer.Option(0.0, "--throttle-rate", help="Share of requests answered 429."),
+    bandwidth_kbps: float = typer.Option(0.0, "--bandwidth-kbps", help="Per-response bandwidth cap; 0 is unlimited."),
+    fault_seed: int = typer.Option(0, "--fault-seed"),
+) -> None:
+    """Serve synthetic tiles locally with injected faults, for testing the network path."""
+    faults = FaultProfile(latency_ms, latency_sigma, error_rate, throttle_rate, bandwidth_kbps=bandwidth_kbps, seed=fault_seed)
+    server = TileServer(faults, host=host, port=port)
+    typer.echo(f"Serving synthetic tiles at {server.url_template}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command()
+def bench_provider(
+    mode: str = typer.Option("bulk", "--mode", help="bulk (parallel prefetch) or render (cold-cache frames)."),
+    frames: int = typer.Option(30, "--frames", help="Frames drawn in render mode."),
+    workers: int = typer.Option(8, "--workers", help="Parallel fetches in bulk mode."),
+    max_retries: int = typer.Option(3, "--max-retries"),
+    mirrors: int = typer.Option(1, "--mirrors", help="Templates for the same server, to exercise sharding and hedging."),
+    latency_ms: float = typer.Option(50.0, "--latency-ms", help="Median response latency."),
+    latency_sigma: float = typer.Option(0.5, "--latency-sigma", help="Log-normal spread of the latency."),
+    error_rate: float = typer.Option(0.02, "--error-rate", help="Share of requests answered 500."),
+    throttle_rate: float = typer.Option(0.01, "--throttle-rate", help="Share of requests answered 429."),
+    bandwidth_kbps: float = typer.Option(0.0, "--bandwidth-kbps", help="Per-response bandwidth cap; 0 is unlimited."),
+    fault_seed: int = typer.Option(0, "--fault-seed"),
+    out: Optional[Path] = typer.Option(None, "--out", help="Also write the result to this JSON file."),
+) -> None:
+    if mode not in {"bulk", "render"}:
+        raise typer.BadParameter("--mode must be one of: bulk, render")
+    faults = FaultProfile(latency_ms, latency_sigma, error_rate, throttle_rate, bandwidth_kbps=bandwidth_kbps, seed=fault_seed)
+    result = run_load_benchmark(faults, mode, frames=frames, workers=workers, max_retries=max_retries, mirrors=mirrors)
+    for line in result.describe():
+        typer.echo(line)
+    if out:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps({"faults": asdict(faults), "result": asdict(result)}, indent=2) + "\n", encoding="utf-8")
+
+
+@app.command()
+def verify(
+    input: Path = typer.Option(..., "--input", exists=True),
+    fit: str = typer.Option("all", "--fit"),
+    frame_time: Optional[List[float]] = typer.Option(None, "--frame-time", help="Frame time in seconds; repeatable."),
+    backend: str = typer.Option("numpy", "--backend", help="Compositing backend checked against the PIL reference."),
+    max_mean_diff: float = typer.Option(DEFAULT_MAX_MEAN_DIFF, "--max-mean-diff", help="Allowed mean abs difference."),
+    min_ssim: float = typer.Option(DEFAULT_MIN_SSIM, "--min-ssim", help="Required structural similarity."),
+    max_diff: int = typer.Option(DEFAULT_MAX_DIFF, "--max-diff", help="Allowed largest single-channel difference."),
+    out_dir: Optional[Path] = typer.Option(None, "--out-dir", help="Write failing frames and diffs here."),
+) -> None:
+    config = _load_config(input)
+    duration = config.timeline.duration
+    times = frame_time or [0.0, *_sample_times(duration), duration - 1 / config.style.fps]
+    try:
+        report = verify_backend(
+            config, _build_camera(config, fit), times, backend, max_mean_diff, min_ssim, max_diff, out_dir
+        )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    for line in report.describe():
+        typer.echo(line)
+    if report.failures:
+        raise typer.Exit(code=1)
 
 
 @app.command()
@@ -148,15 +485,52 @@ def validate(input: Path = typer.Option(..., "--input", exists=True)) -> None:
     typer.echo("Valid configuration")
 
 
+@app.command()
+def import_osm(
+    input: Path = typer.Option(..., "--input", exists=True, help="Overpass JSON export."),
+    base: Optional[Path] = typer.Option(None, "--base", exists=True, help="Config to merge the import into."),
+    lat: Optional[float] = typer.Option(None, "--lat"),
+    lon: Optional[float] = typer.Option(None, "--lon"),
+    center_name: str = typer.Option("Center", "--center-name"),
+    radius: float = typer.Option(1500.0, "--radius", help="Keep POIs within this many meters of the center."),
+    max_pois: int = typer.Option(30, "--max-pois"),
+    include_other: bool = typer.Option(False, "--include-other", help="Also keep untyped amenities, shops and leisure."),
+    boundary_way: Optional[int] = typer.Option(None, "--boundary-way", help="OSM way id to use as the polygon."),
+    out: Optional[Path] = typer.Option(None, "--out", help="Write the config here instead of stdout."),
+) -> None:
+    base_config = _load_config(base) if base else None
+    if lat is not None and lon is not None:
+        center = Location(name=center_name, lat=lat, lon=lon)
+    elif base_config is not None:
+        center = base_config.center
+    else:
+        raise typer.BadParameter("Pass --lat and --lon, or --base with a center")
+
+    try:
+        result = import_overpass(input, center, radius, max_pois, include_other, boundary_way)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    config = build_import_config(base_config, center, result)
+    payload = json.dumps(config.model_dump(mode="json"), indent=2, ensure_ascii=False) + "\n"
+    if out is None:
+        typer.echo(payload, nl=False)
+        return
+    out.write_text(payload, encoding="utf-8")
+    typer.echo(
+        f"Imported {len(result.pois)} POIs from {result.candidates} candidates "
+        f"({result.nodes_indexed} nodes indexed) -> {out}"
+    )
+
+
 @app.command()
 def clear_cache(
-    provider: str = typer.Option("osm", "--provider", help="Cache namespace: osm, mapbox, custom, or all."),
+    provider: str = typer.Option("osm", "--provider", help="Cache namespace: osm, mapbox, custom, local_raster, or all."),
     cache_dir: Path = typer.Option(Path(".cache/tiles"), "--cache-dir", help="Base cache directory."),
     yes: bool = typer.Option(False, "--yes", "-y", help="Skip confirmation prompt."),
 ) -> None:
     provider_name = provider.strip().lower()
-    if provider_name not in {"osm", "mapbox", "custom", "all"}:
-        raise typer.BadParameter("--provider must be one of: osm, mapbox, custom, all")
+    if provider_name not in {"osm", "mapbox", "custom", "local_raster", "all"}:
+        raise typer.BadParameter("--provider must be one of: osm, mapbox, custom, local_raster, all")
 
     targets = [cache_dir] if provider_name == "all" else [cache_dir / provider_name]
     existing_targets = [target for target in targets if target.exists()]
@@ -172,6 +546,27 @@ def clear_cache(
         typer.echo(f"Cleared cache: {target}")
 
 
+@app.command()
+def warm_cache(
+    input: Path = typer.Option(..., "--input", exists=True),
+    fit: str = typer.Option("all", "--fit"),
+    cache_dir: Optional[str] = typer.Option(None, "--cache-dir"),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", help="Parallel tile downloads; defaults to and is capped at the provider's max_connections."
+    ),
+) -> None:
+    """Download every tile a render of this config will use, without rendering."""
+    config = _load_config(input)
+    if cache_dir:
+        config.provider.cache_dir = cache_dir
+    with closing(build_provider(config.provider)) as provider:
+        tiles = Compositor(config, provider).path_tiles(_build_camera(config, fit))
+        report = prefetch_tiles(provider, tiles, workers=workers, derive=False)
+    typer.echo(f"{len(tiles)} tiles: {report.describe()}")
+    if report.failed:
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def demo(out: Path = typer.Option("demo.mp4", "--out"), verbose: bool = False) -> None:
     sample = Path("examples/project.sample.json")
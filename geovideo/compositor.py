@@ -1,18 +1,36 @@
 from __future__ import annotations
 
+import math
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageEnhance, ImageFont
 
+from geovideo.boundary import Boundary, boundary_from_points, load_geojson, render_boundary
 from geovideo.camera import CameraState
-from geovideo.draw import draw_pin, draw_ring, layout_labels, load_font
-from geovideo.geo import TILE_SIZE, latlon_to_screen_px, latlon_to_world_px, world_px_to_tile
+from geovideo.camera_path import CameraPath, TileKey, compile_camera_path, path_tiles
+from geovideo.canvas import FrameCanvas, apply_over, blend_mask_under, blend_rgba
+from geovideo.draw import LabelPlacement, draw_pin, draw_ring, layout_labels, load_font, ring_mask
+from geovideo.geo import TILE_SIZE, latlon_to_screen_px, latlon_to_world_px, tile_zoom_offset, world_px_to_tile
+from geovideo.geometry import project_mercator, world_scale
+from geovideo.overlay import PRESET_OVERLAY_POSITIONS, OverlayLayer, build_overlay_layer
+from geovideo.profiling import NULL_PROFILER, NullProfiler
 from geovideo.providers.base import TileProvider
 from geovideo.schemas import InputConfig, Poi
 from geovideo.timeline import timeline_state_at
+from geovideo.vector import VectorLayer, load_vector_layer, render_vector_layer
+
+BASEMAP_CACHE_SIZE = 8
+# Static layers change only with the camera and active POI. Renders walk forward in time, so only the
+# current layers are ever reused, and each extra entry would hold another full frame.
+STATIC_CACHE_SIZE = 1
+# Keyframed cameras move every frame, so label layouts are kept for recent cameras only.
+LABEL_CACHE_SIZE = 8
+# Largest pulsing ring radius before scaling, in either preset.
+RING_MAX_RADIUS = 64
 
 
 @dataclass
@@ -21,51 +39,353 @@ class FrameContext:
     camera: CameraState
 
 
+@dataclass
+class StaticFrame:
+    frame: np.ndarray
+    # The frame before the layers drawn above the ring, and those layers drawn on black and white minus black;
+    # only kept for the area the ring can reach, whose top-left corner in the frame is ring_origin.
+    under: Optional[np.ndarray] = None
+    over_black: Optional[np.ndarray] = None
+    over_gain: Optional[np.ndarray] = None
+    ring_origin: Tuple[int, int] = (0, 0)
+
+
+@dataclass
+class OverLayer:
+    """Layers drawn over a frame region, as their rendering on black and on white minus black."""
+
+    origin: Tuple[int, int]
+    black: np.ndarray
+    gain: np.ndarray
+
+
 class Compositor:
-    def __init__(self, config: InputConfig, provider: TileProvider) -> None:
+    def __init__(
+        self,
+        config: InputConfig,
+        provider: TileProvider,
+        profiler: NullProfiler = NULL_PROFILER,
+        backend: str = "numpy",
+    ) -> None:
+        if backend not in ("numpy", "pil"):
+            raise ValueError(f"Unknown compositing backend: {backend}")
         self.config = config
         self.provider = provider
-        self.font = load_font(config.style.font_path, size=32)
-        self.small_font = load_font(config.style.font_path, size=24)
-        self.large_font = load_font(config.style.font_path, size=44)
-        self.overlay: Optional[Image.Image] = None
+        self.profiler = profiler
+        self.backend = backend
+        self.scale = config.style.render_scale
+        self.frame_width = config.style.width
+        self.frame_height = config.style.height
+        if self.scale != 1.0:
+            self.frame_width = _even(config.style.width * self.scale)
+            self.frame_height = _even(config.style.height * self.scale)
+        self.font = load_font(config.style.font_path, size=self._px(32))
+        self.small_font = load_font(config.style.font_path, size=self._px(24))
+        self.large_font = load_font(config.style.font_path, size=self._px(44))
+        self.overlay: Optional[OverlayLayer] = None
         if config.style.overlay_path:
-            self.overlay = Image.open(config.style.overlay_path).convert("RGBA")
-
-    def render_frame(self, ctx: FrameContext) -> np.ndarray:
-        style = self.config.style
-        width, height = style.width, style.height
+            style = config.style
+            self.overlay = build_overlay_layer(
+                style.overlay_path,
+                (self.frame_width, self.frame_height),
+                style.overlay_position or PRESET_OVERLAY_POSITIONS[style.ui_preset],
+                margin=self._px(20),
+                scale=style.overlay_scale,
+                sequence_fps=style.overlay_fps,
+                loop=style.overlay_loop,
+                cache_dir=style.overlay_cache_dir,
+            )
+        self.boundary = _load_boundary(config)
+        self.vector_layer: Optional[VectorLayer] = None
+        vector = config.style.vector_overlay
+        if vector:
+            self.vector_layer = load_vector_layer(vector.path, roads=vector.roads, buildings=vector.buildings)
+        # Warm caches shared by every frame rendered through this instance.
+        self._basemap_cache: "OrderedDict[CameraState, Image.Image]" = OrderedDict()
+        self._label_cache: "OrderedDict[CameraState, List[LabelPlacement]]" = OrderedDict()
+        self._text_sizes: Dict[Tuple[int, str], Tuple[int, int]] = {}
+        self._camera_paths: Dict[CameraState, CameraPath] = {}
+        self._static_cache: "OrderedDict[Tuple[CameraState, int], StaticFrame]" = OrderedDict()
+        self._last_camera: Optional[CameraState] = None
+        self._attribution_layer: Optional[OverLayer] = None
+        self.canvas = FrameCanvas(self.frame_width, self.frame_height)
+
+    def render_frame(self, ctx: FrameContext, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Render one BGR frame, into out when given so video loops can reuse a single buffer."""
         timeline_state = timeline_state_at(
             ctx.time_s, len(self.config.pois), self.config.timeline, ctx.camera.zoom
         )
-        camera = CameraState(
-            center_lat=ctx.camera.center_lat,
-            center_lon=ctx.camera.center_lon,
-            zoom=int(round(timeline_state.camera_zoom)),
+        camera = self.camera_path(ctx.camera).state_at(ctx.time_s)
+        if self.backend == "pil":
+            return self._render_frame_pil(camera, timeline_state, ctx.time_s, out)
+        # A keyframed track moves the camera every frame, so static layers built for it would never be
+        # reused; such frames are drawn directly, which costs less than building the layers.
+        moving = (
+            self._last_camera is not None
+            and camera != self._last_camera
+            and (camera, timeline_state.active_index) not in self._static_cache
         )
-        base = self._render_basemap(camera, width, height).convert("RGBA")
-        if style.ui_preset == "social_map" and style.social_zoom_factor > 1.0:
-            base = self._apply_social_zoom(base, style.social_zoom_factor)
-        if style.ui_preset == "social_map":
-            self._draw_map_tint(base, width, height)
+        self._last_camera = camera
+        if moving:
+            self.profiler.count("direct_frames")
+            return self._render_frame_pil(camera, timeline_state, ctx.time_s, out)
+
+        span = self.profiler.span
+        static = self._static_frame(camera, timeline_state.active_index)
+        if out is None:
+            out = self.canvas.allocate()
+        with span("copy_static"):
+            self.canvas.copy_into(out, static.frame)
+        ring = self._ring_geometry(camera, timeline_state)
+        if ring is not None and static.under is not None:
+            with span("draw_rings"):
+                x, y, radius, alpha = ring
+                x0, y0 = static.ring_origin
+                height, width = static.under.shape[:2]
+                mask = np.asarray(ring_mask(radius, alpha, self._px(3)))
+                blend_mask_under(
+                    out[y0 : y0 + height, x0 : x0 + width],
+                    mask,
+                    (255, 255, 255),
+                    x - radius - x0,
+                    y - radius - y0,
+                    static.under,
+                    static.over_black,
+                    static.over_gain,
+                )
+        if self.overlay is not None and self._shows_overlay():
+            with span("draw_overlay"):
+                x, y = self.overlay.position
+                blend_rgba(out, self.overlay.frame_array(ctx.time_s), x, y, swap_rb=True)
+        # The attribution is the top layer, above the overlay, as in the PIL path.
+        with span("draw_attribution"):
+            layer = self._attribution()
+            x0, y0 = layer.origin
+            height, width = layer.black.shape[:2]
+            apply_over(out[y0 : y0 + height, x0 : x0 + width], layer.black, layer.gain)
+        return out
+
+    def camera_path(self, base: CameraState) -> CameraPath:
+        """The compiled per-frame camera track starting from base (the fitted camera), built once."""
+        path = self._camera_paths.get(base)
+        if path is None:
+            path = self._camera_paths[base] = compile_camera_path(self.config, base)
+        return path
+
+    def path_tiles(self, base: CameraState) -> Set[TileKey]:
+        """Every tile the basemaps of this render will request, for prefetching."""
+        style = self.config.style
+        return path_tiles(
+            self.camera_path(base),
+            (style.width, style.height),
+            self._bounding_square() / self.scale,
+            self.scale,
+            self.provider.tile_px,
+        )
+
+    def _shows_overlay(self) -> bool:
+        # In social_map preset, prioritize social chrome over the overlay to avoid visual conflicts.
+        style = self.config.style
+        return not (style.ui_preset == "social_map" and style.show_social_chrome)
+
+    def _static_frame(self, camera: CameraState, active_index: int) -> StaticFrame:
+        """Everything but the pulsing ring, the overlay and the attribution, as BGR arrays cached per camera
+        and active POI."""
+        key = (camera, active_index)
+        cached = self._static_cache.get(key)
+        if cached is not None:
+            self._static_cache.move_to_end(key)
+            return cached
+        self.profiler.count("static_frame_builds")
+        # Evict before building so the outgoing layers are not held alongside the new ones.
+        while len(self._static_cache) >= STATIC_CACHE_SIZE:
+            self._static_cache.popitem(last=False)
+        base = self._compose_under_ring(camera, active_index)
+        box = self._ring_box(camera, active_index)
+        under = _to_bgr(base.crop(box)) if box is not None else None
+        self._draw_over_ring(base, camera, attribution=False)
+        cached = StaticFrame(frame=_to_bgr(base), under=under)
+        if box is not None:
+            # Every layer above the ring maps each under-ring pixel u to black + (white - black) * u / 255,
+            # so drawing them on black and on white is enough to put them back on top of a blended ring.
+            size = (self.frame_width, self.frame_height)
+            black, white = Image.new("RGBA", size, (0, 0, 0, 255)), Image.new("RGBA", size, (255, 255, 255, 255))
+            self._draw_over_ring(black, camera, attribution=False)
+            self._draw_over_ring(white, camera, attribution=False)
+            cached.over_black = _to_bgr(black.crop(box))
+            cached.over_gain = cv2.subtract(_to_bgr(white.crop(box)), cached.over_black)
+            cached.ring_origin = box[:2]
+        self._static_cache[key] = cached
+        return cached
+
+    def _attribution(self) -> OverLayer:
+        """The attribution as an over layer cropped to its text, built once."""
+        if self._attribution_layer is None:
+            x, y, text, fill = self._attribution_text(self.frame_width, self.frame_height)
+            left, top, right, bottom = self.small_font.getbbox(text)
+            x0, y0 = max(x + left - 1, 0), max(y + top - 1, 0)
+            x1, y1 = min(x + right + 1, self.frame_width), min(y + bottom + 1, self.frame_height)
+            size = (max(x1 - x0, 1), max(y1 - y0, 1))
+            black, white = Image.new("RGBA", size, (0, 0, 0, 255)), Image.new("RGBA", size, (255, 255, 255, 255))
+            for layer in (black, white):
+                ImageDraw.Draw(layer).text((x - x0, y - y0), text, font=self.small_font, fill=fill)
+            over_black = _to_bgr(black)
+            self._attribution_layer = OverLayer((x0, y0), over_black, cv2.subtract(_to_bgr(white), over_black))
+        return self._attribution_layer
+
+    def _render_frame_pil(
+        self, camera: CameraState, timeline_state, time_s: float, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        base = self._compose_pil(camera, timeline_state.active_index, timeline_state, time_s)
+        with self.profiler.span("rgb_to_bgr"):
+            return cv2.cvtColor(np.asarray(base.convert("RGB")), cv2.COLOR_RGB2BGR, dst=out)
+
+    def _compose_pil(
+        self, camera: CameraState, active_index: int, timeline_state=None, time_s: Optional[float] = None
+    ) -> Image.Image:
+        """Draw every layer with PIL; without a timeline state the ring and overlay are left out."""
+        base = self._compose_under_ring(camera, active_index)
+        if timeline_state is not None:
+            with self.profiler.span("draw_rings"):
+                self._draw_rings(ImageDraw.Draw(base), camera, timeline_state)
+        self._draw_over_ring(base, camera, time_s)
+        return base
+
+    def _compose_under_ring(self, camera: CameraState, active_index: int) -> Image.Image:
+        style = self.config.style
+        span = self.profiler.span
+        with span("basemap"):
+            base = self._prepared_basemap(camera, self.frame_width, self.frame_height)
         draw = ImageDraw.Draw(base)
-        self._draw_polygon(draw, camera)
         if style.ui_preset == "classic":
-            self._draw_connectors(draw, camera)
-        self._draw_pois(draw, camera, timeline_state.active_index)
-        self._draw_rings(draw, camera, timeline_state)
-        self._draw_labels(draw, camera)
-        self._draw_center_marker(draw, camera)
+            with span("draw_connectors"):
+                self._draw_connectors(draw, camera)
+        with span("draw_pois"):
+            self._draw_pois(draw, camera, active_index)
+        return base
+
+    def _draw_over_ring(
+        self, base: Image.Image, camera: CameraState, time_s: Optional[float] = None, attribution: bool = True
+    ) -> None:
+        style = self.config.style
+        width, height = self.frame_width, self.frame_height
+        span = self.profiler.span
+        draw = ImageDraw.Draw(base)
+        with span("draw_labels"):
+            self._draw_labels(draw, camera)
+        with span("draw_center_marker"):
+            self._draw_center_marker(draw, camera)
         if style.ui_preset == "classic":
-            self._draw_subtitle(draw, width, height)
-        if style.ui_preset == "social_map" and style.show_social_chrome:
-            # In social_map preset, prioritize social chrome over the overlay to avoid visual conflicts.
-            self._draw_social_chrome(draw, width, height)
+            with span("draw_subtitle"):
+                self._draw_subtitle(draw, width, height)
+        if not self._shows_overlay():
+            with span("draw_social_chrome"):
+                self._draw_social_chrome(draw, width, height)
+        elif time_s is not None:
+            with span("draw_overlay"):
+                self._draw_overlay(base, time_s)
+        if attribution:
+            with span("draw_attribution"):
+                self._draw_attribution(draw, width, height)
+
+    def _prepared_basemap(self, camera: CameraState, width: int, height: int) -> Image.Image:
+        cached = self._basemap_cache.get(camera)
+        if cached is None:
+            style = self.config.style
+            span = self.profiler.span
+            self.profiler.count("basemap_cache_misses")
+            with span("render_basemap", zoom=camera.zoom):
+                cached = self._map_layer(camera, width, height, self._render_basemap).convert("RGBA")
+            if style.ui_preset == "social_map" and style.social_zoom_factor > 1.0:
+                with span("social_zoom"):
+                    cached = self._apply_social_zoom(cached, style.social_zoom_factor)
+            if style.ui_preset == "social_map":
+                with span("map_tint"):
+                    self._draw_map_tint(cached, width, height)
+            if self.vector_layer is not None:
+                with span("vector_layer"):
+                    cached.alpha_composite(self._map_layer(camera, width, height, self._render_vector_layer))
+            if self.boundary is not None:
+                with span("draw_polygon"):
+                    if camera.bearing:
+                        cached.alpha_composite(self._map_layer(camera, width, height, self._boundary_layer))
+                    else:
+                        self._draw_boundary(cached, camera, (style.width, style.height))
+            self._basemap_cache[camera] = cached
+            if len(self._basemap_cache) > BASEMAP_CACHE_SIZE:
+                self._basemap_cache.popitem(last=False)
         else:
-            self._draw_overlay(base, width, height)
-        self._draw_attribution(draw, width, height)
-        array = np.array(base.convert("RGB"))
-        return cv2.cvtColor(array, cv2.COLOR_RGB2BGR)
+            self.profiler.count("basemap_cache_hits")
+            self._basemap_cache.move_to_end(camera)
+        return cached.copy()
+
+    def _text_size(self, font: ImageFont.FreeTypeFont | ImageFont.ImageFont, text: str) -> Tuple[int, int]:
+        key = (id(font), text)
+        size = self._text_sizes.get(key)
+        if size is None:
+            size = self._text_sizes[key] = tuple(font.getbbox(text)[2:4])
+        return size
+
+    def _px(self, value: float) -> int:
+        return max(int(round(value * self.scale)), 1)
+
+    def _to_screen(self, lat: float, lon: float, camera: CameraState) -> Tuple[float, float]:
+        style = self.config.style
+        x, y = latlon_to_screen_px(
+            lat, lon, camera.zoom, camera.center_lat, camera.center_lon, style.width, style.height
+        )
+        if camera.bearing:
+            # Turn with the map (counter-clockwise by the bearing) about the frame center.
+            angle = math.radians(camera.bearing)
+            dx, dy = x - style.width / 2, y - style.height / 2
+            x = style.width / 2 + dx * math.cos(angle) + dy * math.sin(angle)
+            y = style.height / 2 - dx * math.sin(angle) + dy * math.cos(angle)
+        return x * self.scale, y * self.scale
+
+    def _bounding_square(self) -> int:
+        # Even, so the frame crops out of its center on whole pixels.
+        style = self.config.style
+        return _even(math.ceil(math.hypot(style.width, style.height) * self.scale)) + 2
+
+    def _map_layer(
+        self,
+        camera: CameraState,
+        width: int,
+        height: int,
+        render: Callable[[CameraState, int, int, Tuple[float, float]], Image.Image],
+    ) -> Image.Image:
+        """A map-aligned layer at frame size; with a bearing it is drawn over the frame's bounding
+        square, turned and cropped, so the corners are still covered."""
+        style = self.config.style
+        if not camera.bearing:
+            return render(camera, width, height, (style.width, style.height))
+        size = self._bounding_square()
+        layer = render(camera, size, size, (size / self.scale, size / self.scale))
+        layer = layer.rotate(camera.bearing, resample=Image.Resampling.BICUBIC)
+        left, top = (size - width) // 2, (size - height) // 2
+        return layer.crop((left, top, left + width, top + height))
+
+    def _render_vector_layer(
+        self, camera: CameraState, width: int, height: int, span: Optional[Tuple[float, float]] = None
+    ) -> Image.Image:
+        style = self.config.style
+        # Drawn after the social zoom and tint so highlights stay crisp and saturated;
+        # the zoom crop is folded into the projection instead.
+        zoom_factor = 1.0
+        if style.ui_preset == "social_map" and style.social_zoom_factor > 1.0:
+            zoom_factor = min(style.social_zoom_factor, 2.0)
+        pixels_per_unit = world_scale(camera.zoom) * self.scale * zoom_factor
+        center = project_mercator(camera.center_lat, camera.center_lon)[0]
+        origin = (center[0] - width / 2 / pixels_per_unit, center[1] - height / 2 / pixels_per_unit)
+        return render_vector_layer(
+            self.vector_layer,
+            style.vector_overlay,
+            camera.zoom,
+            origin,
+            pixels_per_unit,
+            (width, height),
+            line_scale=self.scale,
+        )
 
     def _apply_social_zoom(self, base: Image.Image, factor: float) -> Image.Image:
         factor = min(max(factor, 1.0), 2.0)
@@ -77,176 +397,178 @@ class Compositor:
         cropped = base.crop((left, top, left + crop_w, top + crop_h))
         return cropped.resize((width, height), resample=Image.Resampling.LANCZOS)
 
-    def _render_basemap(self, camera: CameraState, width: int, height: int) -> Image.Image:
-        center_x, center_y = latlon_to_world_px(camera.center_lat, camera.center_lon, camera.zoom)
-        top_left_x = center_x - width / 2
-        top_left_y = center_y - height / 2
-        start_tile_x, start_tile_y = world_px_to_tile(top_left_x, top_left_y)
-        end_tile_x, end_tile_y = world_px_to_tile(top_left_x + width, top_left_y + height)
-
-        canvas = Image.new("RGB", (width, height))
+    def _render_basemap(
+        self, camera: CameraState, width: int, height: int, span: Optional[Tuple[float, float]] = None
+    ) -> Image.Image:
+        # span is the area to cover in unscaled frame pixels (the frame itself unless rotated).
+        # Scaled renders fetch tiles from a lower zoom so the same area is
+        # covered with fewer pixels, then snap to the exact frame size.
+        # Large (512px, @2x) tiles carry the next zoom's detail, so they are fetched a level up.
+        tile_px = self.provider.tile_px
+        zoom_offset = max(int(round(math.log2(self.scale))) - tile_zoom_offset(tile_px), -camera.zoom)
+        zoom = camera.zoom + zoom_offset
+        tile_scale = 2.0**zoom_offset * tile_px / TILE_SIZE
+        span_w, span_h = span or (self.config.style.width, self.config.style.height)
+        canvas_w = math.ceil(span_w * tile_scale)
+        canvas_h = math.ceil(span_h * tile_scale)
+        center_x, center_y = latlon_to_world_px(camera.center_lat, camera.center_lon, zoom, tile_px)
+        top_left_x = center_x - canvas_w / 2
+        top_left_y = center_y - canvas_h / 2
+        start_tile_x, start_tile_y = world_px_to_tile(top_left_x, top_left_y, tile_px)
+        end_tile_x, end_tile_y = world_px_to_tile(top_left_x + canvas_w, top_left_y + canvas_h, tile_px)
+
+        canvas = Image.new("RGB", (canvas_w, canvas_h))
         for tile_x in range(start_tile_x, end_tile_x + 1):
             for tile_y in range(start_tile_y, end_tile_y + 1):
-                tile = self.provider.get_tile(camera.zoom, tile_x, tile_y)
-                px = int(tile_x * TILE_SIZE - top_left_x)
-                py = int(tile_y * TILE_SIZE - top_left_y)
+                tile = self.provider.get_tile(zoom, tile_x, tile_y)
+                # floor, not int(): truncating the negative offset of the first tile leaves a 1px seam.
+                px = math.floor(tile_x * tile_px - top_left_x)
+                py = math.floor(tile_y * tile_px - top_left_y)
                 canvas.paste(tile, (px, py))
+        if canvas.size != (width, height):
+            canvas = canvas.resize((width, height), resample=Image.Resampling.BILINEAR)
         return canvas
 
-    def _draw_polygon(self, draw: ImageDraw.ImageDraw, camera: CameraState) -> None:
+    def _boundary_layer(
+        self, camera: CameraState, width: int, height: int, span: Tuple[float, float]
+    ) -> Image.Image:
+        layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        self._draw_boundary(layer, camera, span)
+        return layer
+
+    def _draw_boundary(self, base: Image.Image, camera: CameraState, span: Tuple[float, float]) -> None:
         style = self.config.style
-        if not style.show_polygon or not style.polygon_points:
-            return
-        points: List[Tuple[float, float]] = []
-        for location in style.polygon_points:
-            x, y = latlon_to_screen_px(
-                location.lat,
-                location.lon,
-                camera.zoom,
-                camera.center_lat,
-                camera.center_lon,
-                style.width,
-                style.height,
-            )
-            points.append((x, y))
-        if len(points) < 3:
-            return
+        width, height = base.size
+        # Same projection as _to_screen so the boundary lines up with the POI markers.
+        scale = world_scale(camera.zoom)
+        center = project_mercator(camera.center_lat, camera.center_lon)[0]
+        origin = (center[0] - span[0] / 2 / scale, center[1] - span[1] / 2 / scale)
         if style.ui_preset == "social_map":
-            draw.polygon(points, outline=(245, 219, 72, 220), width=4)
-            return
-        draw.polygon(points, fill=(0, 128, 255, 70), outline=(0, 128, 255))
+            fill, outline, outline_width = None, (245, 219, 72, 220), self._px(4)
+        else:
+            fill, outline, outline_width = (0, 128, 255, 70), (0, 128, 255, 255), self._px(1)
+        rendered = render_boundary(
+            self.boundary, camera.zoom, origin, scale * self.scale, (width, height), fill, outline, outline_width
+        )
+        if rendered is not None:
+            patch, position = rendered
+            base.alpha_composite(patch, position)
 
     def _draw_connectors(self, draw: ImageDraw.ImageDraw, camera: CameraState) -> None:
         if not self.config.style.show_connectors:
             return
         center = self.config.center
         for poi in self.config.pois:
-            x1, y1 = latlon_to_screen_px(
-                center.lat,
-                center.lon,
-                camera.zoom,
-                camera.center_lat,
-                camera.center_lon,
-                self.config.style.width,
-                self.config.style.height,
-            )
-            x2, y2 = latlon_to_screen_px(
-                poi.lat,
-                poi.lon,
-                camera.zoom,
-                camera.center_lat,
-                camera.center_lon,
-                self.config.style.width,
-                self.config.style.height,
-            )
-            draw.line((x1, y1, x2, y2), fill=(255, 255, 255, 120), width=2)
+            x1, y1 = self._to_screen(center.lat, center.lon, camera)
+            x2, y2 = self._to_screen(poi.lat, poi.lon, camera)
+            draw.line((x1, y1, x2, y2), fill=(255, 255, 255, 120), width=self._px(2))
 
     def _draw_pois(self, draw: ImageDraw.ImageDraw, camera: CameraState, active_index: int) -> None:
+        dot = self._px(6)
         for idx, poi in enumerate(self.config.pois):
-            x, y = latlon_to_screen_px(
-                poi.lat,
-                poi.lon,
-                camera.zoom,
-                camera.center_lat,
-                camera.center_lon,
-                self.config.style.width,
-                self.config.style.height,
-            )
+            x, y = self._to_screen(poi.lat, poi.lon, camera)
             color = _poi_color(poi)
             if idx == active_index:
                 color = tuple(min(c + 40, 255) for c in color)
             if self.config.style.ui_preset == "social_map":
-                draw_pin(draw, int(x), int(y), (225, 35, 44))
-                draw.ellipse((x - 6, y - 6, x + 6, y + 6), fill=(255, 255, 255))
+                draw_pin(draw, int(x), int(y), (225, 35, 44), scale=self.scale)
+                draw.ellipse((x - dot, y - dot, x + dot, y + dot), fill=(255, 255, 255))
             else:
-                draw_pin(draw, int(x), int(y), color)
+                draw_pin(draw, int(x), int(y), color, scale=self.scale)
 
     def _draw_rings(self, draw: ImageDraw.ImageDraw, camera: CameraState, timeline_state) -> None:
+        ring = self._ring_geometry(camera, timeline_state)
+        if ring is not None:
+            draw_ring(draw, *ring, width=self._px(3))
+
+    def _ring_box(self, camera: CameraState, active_index: int) -> Optional[Tuple[int, int, int, int]]:
+        """The frame area any ring around the active POI can touch, clipped to the frame."""
         if not self.config.pois:
-            return
+            return None
+        poi = self.config.pois[min(active_index, len(self.config.pois) - 1)]
+        x, y = (int(value) for value in self._to_screen(poi.lat, poi.lon, camera))
+        reach = int(RING_MAX_RADIUS * self.scale)
+        # ring_mask is 2 * radius + 2 pixels square, placed at (x - radius, y - radius).
+        x0, y0 = max(x - reach, 0), max(y - reach, 0)
+        x1, y1 = min(x + reach + 2, self.frame_width), min(y + reach + 2, self.frame_height)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1, y1
+
+    def _ring_geometry(self, camera: CameraState, timeline_state) -> Optional[Tuple[int, int, int, int]]:
+        if not self.config.pois:
+            return None
         idx = min(timeline_state.active_index, len(self.config.pois) - 1)
         poi = self.config.pois[idx]
-        x, y = latlon_to_screen_px(
-            poi.lat,
-            poi.lon,
-            camera.zoom,
-            camera.center_lat,
-            camera.center_lon,
-            self.config.style.width,
-            self.config.style.height,
-        )
+        x, y = self._to_screen(poi.lat, poi.lon, camera)
         phase = (timeline_state.reveal_progress + (timeline_state.active_index * 0.3)) % 1.0
         if self.config.style.ui_preset == "social_map":
-            radius = int(28 + phase * 36)
+            radius = int((28 + phase * 36) * self.scale)
             alpha = int(190 * (1 - phase))
         else:
-            radius = int(24 + phase * 40)
+            radius = int((24 + phase * 40) * self.scale)
             alpha = int(200 * (1 - phase))
-        draw_ring(draw, int(x), int(y), radius, alpha)
+        return int(x), int(y), radius, alpha
 
     def _draw_labels(self, draw: ImageDraw.ImageDraw, camera: CameraState) -> None:
-        labels = []
-        for poi in self.config.pois:
-            x, y = latlon_to_screen_px(
-                poi.lat,
-                poi.lon,
-                camera.zoom,
-                camera.center_lat,
-                camera.center_lon,
-                self.config.style.width,
-                self.config.style.height,
-            )
-            labels.append((poi.name, (int(x), int(y))))
-        placements = layout_labels(self._dummy_canvas(), labels, self.small_font)
+        p = self._px
+        placements = self._label_cache.get(camera)
+        if placements is None:
+            labels = []
+            for poi in self.config.pois:
+                x, y = self._to_screen(poi.lat, poi.lon, camera)
+                labels.append((poi.name, (int(x), int(y))))
+            placements = layout_labels(self._dummy_canvas(), labels, self.small_font, scale=self.scale)
+            self._label_cache[camera] = placements
+            if len(self._label_cache) > LABEL_CACHE_SIZE:
+                self._label_cache.popitem(last=False)
+        else:
+            self._label_cache.move_to_end(camera)
         for placement in placements:
             if self.config.style.ui_preset == "social_map":
                 label_text = placement.text.upper()
-                text_w, text_h = self.small_font.getbbox(label_text)[2:4]
-                x1 = placement.position[0] - 10
-                y1 = placement.position[1] - 4
-                x2 = x1 + text_w + 20
-                y2 = y1 + text_h + 8
+                text_w, text_h = self._text_size(self.small_font, label_text)
+                x1 = placement.position[0] - p(10)
+                y1 = placement.position[1] - p(4)
+                x2 = x1 + text_w + p(20)
+                y2 = y1 + text_h + p(8)
                 draw.rectangle((x1, y1, x2, y2), fill=(180, 0, 8, 230))
-                draw.text((x1 + 10, y1 + 4), label_text, font=self.small_font, fill=(255, 255, 255))
+                draw.text((x1 + p(10), y1 + p(4)), label_text, font=self.small_font, fill=(255, 255, 255))
             else:
-                draw.rounded_rectangle(placement.box, radius=8, fill=(0, 0, 0, 180))
+                draw.rounded_rectangle(placement.box, radius=p(8), fill=(0, 0, 0, 180))
                 draw.text(placement.position, placement.text, font=self.small_font, fill=(255, 255, 255))
 
     def _draw_subtitle(self, draw: ImageDraw.ImageDraw, width: int, height: int) -> None:
         if not self.config.style.subtitle:
             return
+        p = self._px
         text = self.config.style.subtitle
-        text_w, text_h = self.font.getbbox(text)[2:4]
+        text_w, text_h = self._text_size(self.font, text)
         x = (width - text_w) // 2
-        y = height - text_h - self.config.style.safe_margin_px
+        y = height - text_h - p(self.config.style.safe_margin_px)
         draw.rounded_rectangle(
-            (x - 20, y - 12, x + text_w + 20, y + text_h + 12),
-            radius=12,
+            (x - p(20), y - p(12), x + text_w + p(20), y + text_h + p(12)),
+            radius=p(12),
             fill=(0, 0, 0, 160),
         )
         draw.text((x, y), text, font=self.font, fill=(255, 255, 255))
 
-    def _draw_overlay(self, base: Image.Image, width: int, height: int) -> None:
+    def _draw_overlay(self, base: Image.Image, time_s: float) -> None:
         if not self.overlay:
             return
-        overlay = self.overlay
-        ratio = min(width / overlay.width, height / overlay.height)
-        scaled = overlay.resize((int(overlay.width * ratio), int(overlay.height * ratio)))
-        x = width - scaled.width - 20
-        y = int(height * 0.2)
-        base.alpha_composite(scaled, (x, y))
+        base.alpha_composite(self.overlay.frame_at(time_s), self.overlay.position)
 
     def _draw_attribution(self, draw: ImageDraw.ImageDraw, width: int, height: int) -> None:
+        x, y, text, fill = self._attribution_text(width, height)
+        draw.text((x, y), text, font=self.small_font, fill=fill)
+
+    def _attribution_text(self, width: int, height: int) -> Tuple[int, int, str, Tuple[int, ...]]:
+        p = self._px
         text = self.config.style.watermark_text or self.provider.attribution
-        text_w, text_h = self.small_font.getbbox(text)[2:4]
+        text_w, text_h = self._text_size(self.small_font, text)
         if self.config.style.ui_preset == "social_map":
-            x = 24
-            y = height - text_h - 220
-            draw.text((x, y), text, font=self.small_font, fill=(255, 255, 255, 210))
-        else:
-            x = width - text_w - 12
-            y = height - text_h - 12
-            draw.text((x, y), text, font=self.small_font, fill=(255, 255, 255))
+            return p(24), height - text_h - p(220), text, (255, 255, 255, 210)
+        return width - text_w - p(12), height - text_h - p(12), text, (255, 255, 255)
 
     def _draw_map_tint(self, base: Image.Image, width: int, height: int) -> None:
         base_rgb = base.convert("RGB")
@@ -292,101 +614,116 @@ class Compositor:
     def _draw_center_marker(self, draw: ImageDraw.ImageDraw, camera: CameraState) -> None:
         if self.config.style.ui_preset != "social_map":
             return
-        x, y = latlon_to_screen_px(
-            self.config.center.lat,
-            self.config.center.lon,
-            camera.zoom,
-            camera.center_lat,
-            camera.center_lon,
-            self.config.style.width,
-            self.config.style.height,
+        p = self._px
+        x, y = self._to_screen(self.config.center.lat, self.config.center.lon, camera)
+        outer, inner = p(28), p(16)
+        draw.ellipse(
+            (x - outer, y - outer, x + outer, y + outer),
+            fill=(255, 255, 255, 235),
+            outline=(255, 255, 255, 255),
+            width=p(3),
         )
-        draw.ellipse((x - 28, y - 28, x + 28, y + 28), fill=(255, 255, 255, 235), outline=(255, 255, 255, 255), width=3)
-        draw.ellipse((x - 16, y - 16, x + 16, y + 16), fill=(230, 22, 30, 255))
+        draw.ellipse((x - inner, y - inner, x + inner, y + inner), fill=(230, 22, 30, 255))
         text = self.config.style.social_center_label
-        text_w, text_h = self.large_font.getbbox(text)[2:4]
+        text_w, text_h = self._text_size(self.large_font, text)
         draw.text(
-            (x - text_w / 2, y - 72 - text_h),
+            (x - text_w / 2, y - p(72) - text_h),
             text,
             font=self.large_font,
             fill=(255, 255, 255, 255),
-            stroke_width=4,
+            stroke_width=p(4),
             stroke_fill=(205, 22, 22, 255),
         )
 
     def _draw_social_chrome(self, draw: ImageDraw.ImageDraw, width: int, height: int) -> None:
-        bar_x1, bar_y1 = 28, 32
-        bar_x2, bar_y2 = width - 28, 126
+        p = self._px
+        bar_x1, bar_y1 = p(28), p(32)
+        bar_x2, bar_y2 = width - p(28), p(126)
         draw.rounded_rectangle(
             (bar_x1, bar_y1, bar_x2, bar_y2),
-            radius=20,
+            radius=p(20),
             outline=(255, 255, 255, 225),
-            width=3,
+            width=p(3),
             fill=(25, 25, 25, 65),
         )
-        draw.text((46, 48), "<", font=self.large_font, fill=(255, 255, 255, 240))
-        draw.ellipse((114, 58, 148, 92), outline=(255, 255, 255, 230), width=3)
-        draw.line((141, 87, 153, 99), fill=(255, 255, 255, 230), width=3)
-        draw.text((168, 58), self.config.style.social_search_left_text, font=self.font, fill=(255, 255, 255, 230))
+        draw.text((p(46), p(48)), "<", font=self.large_font, fill=(255, 255, 255, 240))
+        draw.ellipse((p(114), p(58), p(148), p(92)), outline=(255, 255, 255, 230), width=p(3))
+        draw.line((p(141), p(87), p(153), p(99)), fill=(255, 255, 255, 230), width=p(3))
+        draw.text((p(168), p(58)), self.config.style.social_search_left_text, font=self.font, fill=(255, 255, 255, 230))
         right_text = self.config.style.social_search_right_text
-        text_w, _ = self.font.getbbox(right_text)[2:4]
-        draw.text((width - 40 - text_w, 58), right_text, font=self.font, fill=(255, 255, 255, 230))
-
-        rail_x = width - 62
-        self._draw_profile_icon(draw, rail_x, height - 620)
-        self._draw_heart_icon(draw, rail_x, height - 495)
-        draw.text((rail_x - 20, height - 448), "991", font=self.small_font, fill=(255, 255, 255, 240))
-        self._draw_chat_icon(draw, rail_x, height - 365)
-        draw.text((rail_x - 20, height - 318), "145", font=self.small_font, fill=(255, 255, 255, 240))
-        self._draw_bookmark_icon(draw, rail_x, height - 235)
-        draw.text((rail_x - 20, height - 188), "539", font=self.small_font, fill=(255, 255, 255, 240))
-        self._draw_share_icon(draw, rail_x, height - 105)
-        draw.text((rail_x - 20, height - 58), "878", font=self.small_font, fill=(255, 255, 255, 240))
-
-        bottom_y = height - 210
+        text_w, _ = self._text_size(self.font, right_text)
+        draw.text((width - p(40) - text_w, p(58)), right_text, font=self.font, fill=(255, 255, 255, 230))
+
+        rail_x = width - p(62)
+        self._draw_profile_icon(draw, rail_x, height - p(620))
+        self._draw_heart_icon(draw, rail_x, height - p(495))
+        draw.text((rail_x - p(20), height - p(448)), "991", font=self.small_font, fill=(255, 255, 255, 240))
+        self._draw_chat_icon(draw, rail_x, height - p(365))
+        draw.text((rail_x - p(20), height - p(318)), "145", font=self.small_font, fill=(255, 255, 255, 240))
+        self._draw_bookmark_icon(draw, rail_x, height - p(235))
+        draw.text((rail_x - p(20), height - p(188)), "539", font=self.small_font, fill=(255, 255, 255, 240))
+        self._draw_share_icon(draw, rail_x, height - p(105))
+        draw.text((rail_x - p(20), height - p(58)), "878", font=self.small_font, fill=(255, 255, 255, 240))
+
+        bottom_y = height - p(210)
         draw.rectangle((0, bottom_y, width, height), fill=(0, 0, 0, 185))
         subtitle = self.config.style.subtitle or "A quick tour of local amenities"
-        draw.text((24, bottom_y + 18), self.config.style.social_account_label, font=self.small_font, fill=(255, 255, 255, 230))
-        draw.text((24, bottom_y + 56), subtitle, font=self.small_font, fill=(245, 245, 245, 220))
+        draw.text((p(24), bottom_y + p(18)), self.config.style.social_account_label, font=self.small_font, fill=(255, 255, 255, 230))
+        draw.text((p(24), bottom_y + p(56)), subtitle, font=self.small_font, fill=(245, 245, 245, 220))
 
-        comment_y = height - 102
-        draw.rounded_rectangle((24, comment_y, width - 24, comment_y + 72), radius=35, fill=(18, 18, 18, 240))
-        draw.text((52, comment_y + 19), "Add a comment...", font=self.small_font, fill=(205, 205, 205, 235))
+        comment_y = height - p(102)
+        draw.rounded_rectangle((p(24), comment_y, width - p(24), comment_y + p(72)), radius=p(35), fill=(18, 18, 18, 240))
+        draw.text((p(52), comment_y + p(19)), "Add a comment...", font=self.small_font, fill=(205, 205, 205, 235))
 
     def _draw_profile_icon(self, draw: ImageDraw.ImageDraw, x: int, y: int) -> None:
-        draw.ellipse((x - 34, y - 34, x + 34, y + 34), fill=(210, 240, 255, 225))
-        draw.ellipse((x - 14, y - 12, x + 14, y + 16), fill=(95, 145, 185, 255))
-        draw.ellipse((x - 16, y + 20, x + 16, y + 28), fill=(95, 145, 185, 255))
-        draw.ellipse((x - 16, y + 28, x + 16, y + 60), fill=(228, 26, 38, 255))
-        draw.text((x - 8, y + 31), "+", font=self.small_font, fill=(255, 255, 255, 255))
+        p = self._px
+        draw.ellipse((x - p(34), y - p(34), x + p(34), y + p(34)), fill=(210, 240, 255, 225))
+        draw.ellipse((x - p(14), y - p(12), x + p(14), y + p(16)), fill=(95, 145, 185, 255))
+        draw.ellipse((x - p(16), y + p(20), x + p(16), y + p(28)), fill=(95, 145, 185, 255))
+        draw.ellipse((x - p(16), y + p(28), x + p(16), y + p(60)), fill=(228, 26, 38, 255))
+        draw.text((x - p(8), y + p(31)), "+", font=self.small_font, fill=(255, 255, 255, 255))
 
     def _draw_heart_icon(self, draw: ImageDraw.ImageDraw, x: int, y: int) -> None:
-        draw.ellipse((x - 13, y - 8, x - 1, y + 5), fill=(255, 255, 255, 245))
-        draw.ellipse((x + 1, y - 8, x + 13, y + 5), fill=(255, 255, 255, 245))
-        draw.polygon([(x - 15, y + 0), (x + 15, y + 0), (x, y + 24)], fill=(255, 255, 255, 245))
+        p = self._px
+        draw.ellipse((x - p(13), y - p(8), x - p(1), y + p(5)), fill=(255, 255, 255, 245))
+        draw.ellipse((x + p(1), y - p(8), x + p(13), y + p(5)), fill=(255, 255, 255, 245))
+        draw.polygon([(x - p(15), y + 0), (x + p(15), y + 0), (x, y + p(24))], fill=(255, 255, 255, 245))
 
     def _draw_chat_icon(self, draw: ImageDraw.ImageDraw, x: int, y: int) -> None:
-        draw.rounded_rectangle((x - 18, y - 14, x + 18, y + 14), radius=8, outline=(255, 255, 255, 245), width=3)
-        draw.polygon([(x - 5, y + 14), (x + 3, y + 14), (x - 1, y + 22)], fill=(255, 255, 255, 245))
+        p = self._px
+        draw.rounded_rectangle(
+            (x - p(18), y - p(14), x + p(18), y + p(14)), radius=p(8), outline=(255, 255, 255, 245), width=p(3)
+        )
+        draw.polygon([(x - p(5), y + p(14)), (x + p(3), y + p(14)), (x - p(1), y + p(22))], fill=(255, 255, 255, 245))
 
     def _draw_bookmark_icon(self, draw: ImageDraw.ImageDraw, x: int, y: int) -> None:
+        p = self._px
         draw.polygon(
-            [(x - 13, y - 20), (x + 13, y - 20), (x + 13, y + 22), (x, y + 10), (x - 13, y + 22)],
+            [(x - p(13), y - p(20)), (x + p(13), y - p(20)), (x + p(13), y + p(22)), (x, y + p(10)), (x - p(13), y + p(22))],
             outline=(255, 255, 255, 245),
             fill=None,
-            width=3,
+            width=p(3),
         )
 
     def _draw_share_icon(self, draw: ImageDraw.ImageDraw, x: int, y: int) -> None:
+        p = self._px
         draw.polygon(
-            [(x - 16, y + 15), (x + 4, y + 15), (x + 4, y + 25), (x + 22, y + 0), (x + 4, y - 25), (x + 4, y - 15), (x - 16, y - 15)],
+            [
+                (x - p(16), y + p(15)),
+                (x + p(4), y + p(15)),
+                (x + p(4), y + p(25)),
+                (x + p(22), y + 0),
+                (x + p(4), y - p(25)),
+                (x + p(4), y - p(15)),
+                (x - p(16), y - p(15)),
+            ],
             outline=(255, 255, 255, 245),
             fill=None,
-            width=3,
+            width=p(3),
         )
 
     def _dummy_canvas(self) -> Image.Image:
-        return Image.new("RGB", (self.config.style.width, self.config.style.height))
+        return Image.new("RGB", (self.frame_width, self.frame_height))
 
 
 def _poi_color(poi: Poi) -> Tuple[int, int, int]:
@@ -397,3 +734,22 @@ def _poi_color(poi: Poi) -> Tuple[int, int, int]:
         "other": (80, 160, 255),
     }
     return colors.get(poi.type, (200, 200, 200))
+
+
+def _load_boundary(config: InputConfig) -> Optional[Boundary]:
+    style = config.style
+    if not style.show_polygon:
+        return None
+    if style.polygon_geojson is not None:
+        return load_geojson(style.polygon_geojson)
+    if style.polygon_points and len(style.polygon_points) >= 3:
+        return boundary_from_points(style.polygon_points)
+    return None
+
+
+def _to_bgr(image: Image.Image) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(image.convert("RGB"))[..., ::-1])
+
+
+def _even(value: float) -> int:
+    return max(int(round(value / 2)) * 2, 2)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Sequence
+
+from geovideo.camera import CameraState
+from geovideo.compositor import Compositor, FrameContext
+from geovideo.providers.base import TileProvider
+from geovideo.schemas import InputConfig
+
+DRAFT_PRESET = "ultrafast"
+DRAFT_CRF = 30
+
+
+@dataclass(frozen=True)
+class SpeedupReport:
+    draft_frame_s: float
+    full_frame_s: float
+
+    @property
+    def speedup(self) -> float:
+        return self.full_frame_s / max(self.draft_frame_s, 1e-9)
+
+    def describe(self) -> str:
+        return (
+            f"Draft frame {self.draft_frame_s * 1000:.1f} ms vs full quality {self.full_frame_s * 1000:.1f} ms "
+            f"(~{self.speedup:.1f}x faster frame rendering)"
+        )
+
+
+def draft_config(config: InputConfig, scale: float) -> InputConfig:
+    draft = config.model_copy(deep=True)
+    draft.style.render_scale = scale
+    draft.output.preset = DRAFT_PRESET
+    draft.output.crf = DRAFT_CRF
+    draft.output.bitrate = None
+    return InputConfig.model_validate(draft.model_dump())
+
+
+def measure_frame_seconds(compositor: Compositor, camera: CameraState, times: Sequence[float]) -> float:
+    # The first frame warms fonts and the tile cache; only the rest are timed.
+    compositor.render_frame(FrameContext(time_s=times[0], camera=camera))
+    start = time.perf_counter()
+    for t in times:
+        compositor.render_frame(FrameContext(time_s=t, camera=camera))
+    return (time.perf_counter() - start) / len(times)
+
+
+def compare_to_full_quality(
+    full: InputConfig,
+    draft: InputConfig,
+    provider: TileProvider,
+    camera: CameraState,
+    times: Sequence[float],
+) -> SpeedupReport:
+    draft_s = measure_frame_seconds(Compositor(draft, provider), camera, times)
+    full_s = measure_frame_seconds(Compositor(full, provider), camera, times)
+    return SpeedupReport(draft_frame_s=draft_s, full_frame_s=full_s)
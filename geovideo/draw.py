@@ -33,17 +33,25 @@ def load_font(font_path: Optional[str], size: int) -> ImageFont.FreeTypeFont | I
     return ImageFont.load_default()
 
 
-def draw_pin(draw: ImageDraw.ImageDraw, x: int, y: int, color: Tuple[int, int, int]) -> None:
-    radius = 12
+def draw_pin(
+    draw: ImageDraw.ImageDraw, x: int, y: int, color: Tuple[int, int, int], scale: float = 1.0
+) -> None:
+    radius = max(int(round(12 * scale)), 1)
+    tip = max(int(round(20 * scale)), 1)
+    half = max(int(round(10 * scale)), 1)
     draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color, outline=(255, 255, 255))
-    draw.polygon([(x, y + 20), (x - 10, y), (x + 10, y)], fill=color)
+    draw.polygon([(x, y + tip), (x - half, y), (x + half, y)], fill=color)
 
 
-def draw_ring(draw: ImageDraw.ImageDraw, x: int, y: int, radius: int, alpha: int) -> None:
-    ring = Image.new("RGBA", (radius * 2 + 2, radius * 2 + 2), (0, 0, 0, 0))
-    ring_draw = ImageDraw.Draw(ring)
-    ring_draw.ellipse((1, 1, radius * 2, radius * 2), outline=(255, 255, 255, alpha), width=3)
-    draw.bitmap((x - radius, y - radius), ring, fill=None)
+def ring_mask(radius: int, alpha: int, width: int = 3) -> Image.Image:
+    """Coverage mask of a ring outline, (2 * radius + 2) pixels square."""
+    mask = Image.new("L", (radius * 2 + 2, radius * 2 + 2), 0)
+    ImageDraw.Draw(mask).ellipse((1, 1, radius * 2, radius * 2), outline=alpha, width=width)
+    return mask
+
+
+def draw_ring(draw: ImageDraw.ImageDraw, x: int, y: int, radius: int, alpha: int, width: int = 3) -> None:
+    draw.bitmap((x - radius, y - radius), ring_mask(radius, alpha, width), fill=(255, 255, 255))
 
 
 def layout_labels(
@@ -52,19 +60,25 @@ def layout_labels(
     font: ImageFont.FreeTypeFont | ImageFont.ImageFont,
     padding: int = 8,
     max_shift: int = 80,
+    scale: float = 1.0,
 ) -> List[LabelPlacement]:
+    padding = int(round(padding * scale))
+    max_shift = int(round(max_shift * scale))
+    offset_x = int(round(16 * scale))
+    offset_y = int(round(8 * scale))
+    step = max(int(round(18 * scale)), 1)
     placements: List[LabelPlacement] = []
     for text, (x, y) in labels:
         width, height = font.getbbox(text)[2:4]
         shift = 0
         while shift <= max_shift:
-            left = x + 16
-            top = y - height - 8 + shift
+            left = x + offset_x
+            top = y - height - offset_y + shift
             box = (left - padding, top - padding, left + width + padding, top + height + padding)
             if not any(_overlaps(box, placement.box) for placement in placements):
                 placements.append(LabelPlacement(text=text, position=(left, top), box=box))
                 break
-            shift += 18
+            shift += step
     return placements
 
 
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, TextIO, Tuple
+
+# Progress lines are throttled to this interval, so the per-frame cost is one clock read.
+PROGRESS_INTERVAL_S = 0.5
+# Frames/s is measured over this trailing window.
+RATE_WINDOW_S = 5.0
+
+
+class NullEvents:
+    enabled = False
+    # True when events go to stdout, so human-readable messages must go to stderr instead.
+    on_stdout = False
+
+    def phase(self, name: str, **fields: Any) -> None:
+        return None
+
+    def emit(self, event: str, **fields: Any) -> None:
+        return None
+
+    def start_frames(self, total: int, done: int = 0, bytes_written: int = 0) -> None:
+        return None
+
+    def frame_done(self) -> None:
+        return None
+
+    def writing(self, path: Optional[Path]) -> None:
+        return None
+
+    def wrote(self, path: Path) -> None:
+        return None
+
+    def set_context(self, **fields: Any) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+NULL_EVENTS = NullEvents()
+
+
+class JsonEvents(NullEvents):
+    """Writes one JSON object per line: phase changes, throttled frame progress and summaries."""
+
+    enabled = True
+
+    def __init__(self, stream: TextIO, close_stream: bool = False, interval_s: float = PROGRESS_INTERVAL_S) -> None:
+        self.stream = stream
+        self.on_stdout = stream is sys.stdout
+        self.close_stream = close_stream
+        self.interval_s = interval_s
+        self.origin = time.perf_counter()
+        self.context: Dict[str, Any] = {}
+        self.total_frames = 0
+        self.frames_done = 0
+        # Bytes of finished outputs plus whatever file is being written now.
+        self.bytes_written = 0
+        self.current_file: Optional[Path] = None
+        self._next_progress = 0.0
+        self._samples: Deque[Tuple[float, int]] = deque()
+
+    def set_context(self, **fields: Any) -> None:
+        """Fields repeated on every following event, such as the batch job."""
+        self.context = dict(fields)
+
+    def emit(self, event: str, **fields: Any) -> None:
+        record = {"event": event, "elapsed_s": round(time.perf_counter() - self.origin, 3), **self.context, **fields}
+        self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.stream.flush()
+
+    def phase(self, name: str, **fields: Any) -> None:
+        self.emit("phase", phase=name, **fields)
+
+    def start_frames(self, total: int, done: int = 0, bytes_written: int = 0) -> None:
+        self.total_frames = total
+        self.frames_done = done
+        self.bytes_written = bytes_written
+        self._samples.clear()
+        self._next_progress = 0.0
+
+    def frame_done(self) -> None:
+        self.frames_done += 1
+        now = time.perf_counter()
+        if now >= self._next_progress or self.frames_done == self.total_frames:
+            self._next_progress = now + self.interval_s
+            self._progress(now)
+
+    def writing(self, path: Optional[Path]) -> None:
+        """The file frames are being encoded into, counted towards bytes_written while it grows."""
+        self.current_file = path
+
+    def wrote(self, path: Path) -> None:
+        self.current_file = None
+        self.bytes_written += path.stat().st_size
+
+    def _progress(self, now: float) -> None:
+        samples = self._samples
+        samples.append((now, self.frames_done))
+        while len(samples) > 2 and now - samples[1][0] >= RATE_WINDOW_S:
+            samples.popleft()
+        first_time, first_frames = samples[0]
+        rate = (self.frames_done - first_frames) / (now - first_time) if now > first_time else None
+        remaining = self.total_frames - self.frames_done
+        current = 0
+        if self.current_file is not None:
+            try:
+                current = self.current_file.stat().st_size
+            except FileNotFoundError:
+                pass
+        self.emit(
+            "progress",
+            frames_done=self.frames_done,
+            total_frames=self.total_frames,
+            fps=round(rate, 2) if rate else None,
+            eta_s=round(remaining / rate, 1) if rate else None,
+            bytes_written=self.bytes_written + current,
+        )
+
+    def close(self) -> None:
+        if self.close_stream:
+            self.stream.close()
+
+
+def open_events(target: Optional[str]) -> NullEvents:
+    """Events for --events: "stdout", "fd:N" (an inherited descriptor, left open) or a file path (appended)."""
+    if not target:
+        return NULL_EVENTS
+    if target == "stdout":
+        return JsonEvents(sys.stdout)
+    if target.startswith("fd:"):
+        try:
+            fd = int(target[3:])
+        except ValueError:
+            raise ValueError(f"Invalid events descriptor {target!r}; expected fd:N") from None
+        return JsonEvents(os.fdopen(fd, "w", buffering=1, closefd=False), close_stream=True)
+    path = Path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return JsonEvents(path.open("a", encoding="utf-8", buffering=1), close_stream=True)
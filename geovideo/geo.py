@@ -27,17 +27,22 @@ def clamp_lat(lat: float) -> float:
     return max(min(lat, 85.05112878), -85.05112878)
 
 
-def latlon_to_world_px(lat: float, lon: float, zoom: int) -> Tuple[float, float]:
+def latlon_to_world_px(lat: float, lon: float, zoom: int, tile_size: int = TILE_SIZE) -> Tuple[float, float]:
     lat = clamp_lat(lat)
-    scale = TILE_SIZE * (2**zoom)
+    scale = tile_size * (2**zoom)
     x = (lon + 180.0) / 360.0 * scale
     sin_lat = math.sin(math.radians(lat))
     y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
     return x, y
 
 
-def world_px_to_tile(x: float, y: float) -> Tuple[int, int]:
-    return int(x // TILE_SIZE), int(y // TILE_SIZE)
+def world_px_to_tile(x: float, y: float, tile_size: int = TILE_SIZE) -> Tuple[int, int]:
+    return int(x // tile_size), int(y // tile_size)
+
+
+def tile_zoom_offset(tile_px: int) -> int:
+    """Zoom levels a tile of tile_px pixels is ahead of a 256px tile covering the same XYZ cell."""
+    return int(round(math.log2(tile_px / TILE_SIZE)))
 
 
 def latlon_to_screen_px(
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+from geovideo.geo import TILE_SIZE
+
+MAX_MERCATOR_LAT = 85.05112878
+# Douglas-Peucker tolerance in screen pixels at the zoom being drawn.
+SIMPLIFY_TOLERANCE_PX = 0.5
+
+
+def project_mercator(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Web mercator coordinates normalized to [0, 1]; multiply by TILE_SIZE * 2**zoom for world pixels."""
+    lats = np.clip(np.asarray(lats, dtype=np.float64), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    lons = np.asarray(lons, dtype=np.float64)
+    x = (lons + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(lats))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return np.column_stack([x, y])
+
+
+def world_scale(zoom: int) -> float:
+    return float(TILE_SIZE * 2**zoom)
+
+
+def simplify_mask(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker: a boolean mask of the points to keep so no dropped point is farther than tolerance."""
+    count = len(points)
+    keep = np.zeros(count, dtype=bool)
+    if count < 3:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = points[start + 1 : end]
+        origin = points[start]
+        dx, dy = points[end] - origin
+        length = math.hypot(dx, dy)
+        if length == 0.0:
+            # Closed rings start and end on the same point; fall back to radial distance.
+            distances = np.hypot(inner[:, 0] - origin[0], inner[:, 1] - origin[1])
+        else:
+            distances = np.abs(dx * (inner[:, 1] - origin[1]) - dy * (inner[:, 0] - origin[0])) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+
+def path_bboxes(coords: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """(n, 4) min_x, min_y, max_x, max_y per path of a flat coords/offsets store."""
+    if len(offsets) < 2:
+        return np.empty((0, 4))
+    starts = offsets[:-1]
+    return np.column_stack(
+        [
+            np.minimum.reduceat(coords[:, 0], starts),
+            np.minimum.reduceat(coords[:, 1], starts),
+            np.maximum.reduceat(coords[:, 0], starts),
+            np.maximum.reduceat(coords[:, 1], starts),
+        ]
+    )
+
+
+def bbox_intersects(bboxes: np.ndarray, view: Tuple[float, float, float, float]) -> np.ndarray:
+    min_x, min_y, max_x, max_y = view
+    return (bboxes[:, 2] >= min_x) & (bboxes[:, 0] <= max_x) & (bboxes[:, 3] >= min_y) & (bboxes[:, 1] <= max_y)
+
+
+def clip_ring(points: np.ndarray, rect: Tuple[float, float, float, float]) -> np.ndarray:
+    """Sutherland-Hodgman clip of an open polygon ring to an axis-aligned rectangle.
+
+    Each pass handles one rectangle edge for all vertices at once. Parts cut away by the
+    rectangle leave edges running along its border, so callers pad rect past the visible area.
+    """
+    min_x, min_y, max_x, max_y = rect
+    for axis, bound, keep_above in ((0, min_x, True), (0, max_x, False), (1, min_y, True), (1, max_y, False)):
+        if not len(points):
+            break
+        following = np.roll(points, -1, axis=0)
+        inside = points[:, axis] >= bound if keep_above else points[:, axis] <= bound
+        crossing = inside != np.roll(inside, -1)
+        delta = following - points
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(crossing, (bound - points[:, axis]) / delta[:, axis], 0.0)
+        intersections = points + t[:, None] * delta
+        # Per edge: the start vertex if it is inside, then the crossing point if the edge crosses.
+        candidates = np.stack([points, intersections], axis=1).reshape(-1, 2)
+        points = candidates[np.stack([inside, crossing], axis=1).reshape(-1)]
+    return points
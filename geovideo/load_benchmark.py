@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Literal, Optional
+
+import numpy as np
+
+from geovideo.benchmark import BenchCase, _case_camera, build_case_config
+from geovideo.compositor import Compositor, FrameContext
+from geovideo.prefetch import prefetch_tiles
+from geovideo.profiling import Profiler
+from geovideo.providers import build_provider
+from geovideo.schemas import ProviderConfig
+from geovideo.tileserver import FaultProfile, TileServer
+
+LoadMode = Literal["bulk", "render"]
+
+LOAD_CASE = BenchCase("classic", 1080, 1920, poi_count=4, polygon_vertices=4)
+
+
+@dataclass(frozen=True)
+class LoadResult:
+    mode: LoadMode
+    tiles: int
+    failed: int
+    wall_s: float
+    tiles_per_s: float
+    mb_per_s: float
+    # Per tile, from the first request to a decoded image, retries included.
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    p99_ms: Optional[float]
+    retries: int
+    hedged: int
+    server_statuses: Dict[int, int] = field(default_factory=dict)
+
+    def describe(self) -> List[str]:
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.1f} ms"
+
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(self.server_statuses.items()))
+        return [
+            f"{self.mode}: {self.tiles} tiles ({self.failed} failed) in {self.wall_s:.2f}s, "
+            f"{self.tiles_per_s:.1f} tiles/s, {self.mb_per_s:.2f} MB/s",
+            f"latency p50 {ms(self.p50_ms)}  p95 {ms(self.p95_ms)}  p99 {ms(self.p99_ms)}",
+            f"retries {self.retries}, hedged requests {self.hedged}, server responses {{{statuses}}}",
+        ]
+
+
+@contextmanager
+def _online() -> Iterator[None]:
+    # The stand-in server is local, so GEOVIDEO_OFFLINE must not short-circuit the fetch path.
+    previous = os.environ.pop("GEOVIDEO_OFFLINE", None)
+    try:
+        yield
+    finally:
+        if previous is not None:
+            os.environ["GEOVIDEO_OFFLINE"] = previous
+
+
+def run_load_benchmark(
+    faults: FaultProfile,
+    mode: LoadMode = "bulk",
+    frames: int = 30,
+    workers: int = 8,
+    max_retries: int = 3,
+    mirrors: int = 1,
+    case: BenchCase = LOAD_CASE,
+) -> LoadResult:
+    """Cold-cache tile fetching through the custom provider against a local fault-injecting server.
+
+    bulk prefetches every tile of the camera track in parallel, as warm-cache does; render draws
+    frames with an empty cache so tiles are fetched one at a time from the frame loop.
+    """
+    config = build_case_config(case)
+    with tempfile.TemporaryDirectory() as cache_dir, TileServer(faults) as server, _online():
+        templates = [f"{server.url}/{index}/{{z}}/{{x}}/{{y}}.png" for index in range(max(mirrors, 1))]
+        config.provider = ProviderConfig(
+            name="custom",
+            url_template=templates[0],
+            mirrors=templates[1:],
+            cache_dir=cache_dir,
+            max_retries=max_retries,
+            throttle_s=0.0,
+            # The local server has no usage policy; let bulk mode use every worker asked for.
+            max_connections=workers,
+        )
+        profiler = Profiler()
+        provider = build_provider(config.provider)
+        provider.profiler = profiler
+        compositor = Compositor(config, provider)
+        camera = _case_camera(config)
+        start = time.perf_counter()
+        if mode == "bulk":
+            tiles = compositor.path_tiles(camera)
+            failed = len(prefetch_tiles(provider, tiles, workers=workers).failed)
+        else:
+            failed = 0
+            for index in range(frames):
+                try:
+                    compositor.render_frame(FrameContext(time_s=config.timeline.duration * index / frames, camera=camera))
+                except RuntimeError:
+                    failed += 1
+        wall_s = time.perf_counter() - start
+        provider.close()
+        statuses = dict(server.statuses)
+    fetches = [event for event in profiler.events if event.name == "get_tile" and event.args["source"] in ("network", "error")]
+    latencies = np.array([event.duration_s * 1000 for event in fetches])
+    size = sum(event.args["bytes"] for event in fetches)
+
+    def percentile(q: float) -> Optional[float]:
+        return round(float(np.percentile(latencies, q)), 2) if len(latencies) else None
+
+    return LoadResult(
+        mode=mode,
+        tiles=len(fetches),
+        failed=failed,
+        wall_s=round(wall_s, 3),
+        tiles_per_s=round(len(fetches) / wall_s, 2) if wall_s else 0.0,
+        mb_per_s=round(size / 2**20 / wall_s, 3) if wall_s else 0.0,
+        p50_ms=percentile(50),
+        p95_ms=percentile(95),
+        p99_ms=percentile(99),
+        retries=sum(event.args["retries"] for event in fetches),
+        hedged=int(profiler.counters.get("tile_hedged_requests", 0)),
+        server_statuses=statuses,
+    )
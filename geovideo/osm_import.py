@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import json
+import re
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from geovideo.schemas import InputConfig, Location, Poi, PoiType
+
+EARTH_RADIUS_M = 6_371_008.8
+
+_ELEMENTS_START = re.compile(r'"elements"\s*:\s*\[')
+_SEPARATOR = re.compile(r"[\s,]*")
+
+TAG_POI_TYPES: Dict[Tuple[str, str], PoiType] = {
+    ("amenity", "school"): "school",
+    ("amenity", "kindergarten"): "school",
+    ("amenity", "college"): "school",
+    ("amenity", "university"): "school",
+    ("amenity", "marketplace"): "market",
+    ("shop", "supermarket"): "market",
+    ("shop", "convenience"): "market",
+    ("shop", "mall"): "market",
+    ("shop", "department_store"): "market",
+    ("amenity", "restaurant"): "food",
+    ("amenity", "cafe"): "food",
+    ("amenity", "fast_food"): "food",
+    ("amenity", "food_court"): "food",
+}
+OTHER_POI_KEYS = ("amenity", "shop", "leisure", "tourism", "healthcare")
+
+
+def iter_elements(path: Path, chunk_size: int = 1 << 20) -> Iterator[dict]:
+    """Yield Overpass JSON elements one at a time without loading the whole document."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as handle:
+        buffer = ""
+        eof = False
+        while True:
+            match = _ELEMENTS_START.search(buffer)
+            if match:
+                buffer = buffer[match.end() :]
+                break
+            if eof:
+                raise ValueError(f"{path} has no 'elements' array")
+            chunk = handle.read(chunk_size)
+            eof = not chunk
+            # Keep a tail in case the key straddles two chunks.
+            buffer = buffer[-32:] + chunk
+
+        pos = 0
+        while True:
+            pos = _SEPARATOR.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            if pos < len(buffer):
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield element
+                    pos = end
+                    continue
+            elif eof:
+                raise ValueError(f"{path} ends inside the 'elements' array")
+            # Incomplete element at the end of the buffer: drop parsed text, read more.
+            chunk = handle.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+@dataclass
+class NodeIndex:
+    """Node coordinates in flat arrays (24 bytes per node), searchable by id once frozen."""
+
+    _ids: array = field(default_factory=lambda: array("q"))
+    _lats: array = field(default_factory=lambda: array("d"))
+    _lons: array = field(default_factory=lambda: array("d"))
+    ids: Optional[np.ndarray] = None
+    coords: Optional[np.ndarray] = None
+
+    def add(self, node_id: int, lat: float, lon: float) -> None:
+        self._ids.append(node_id)
+        self._lats.append(lat)
+        self._lons.append(lon)
+
+    def freeze(self) -> None:
+        ids = np.frombuffer(self._ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        self.ids = ids[order]
+        self.coords = np.column_stack(
+            [np.frombuffer(self._lats, dtype=np.float64)[order], np.frombuffer(self._lons, dtype=np.float64)[order]]
+        )
+        self._ids, self._lats, self._lons = array("q"), array("d"), array("d")
+
+    def __len__(self) -> int:
+        return len(self.ids) if self.ids is not None else len(self._ids)
+
+    def lookup(self, refs: Sequence[int]) -> np.ndarray:
+        """(n, 2) lat/lon rows for the refs that exist, in ref order."""
+        coords, found = self.resolve(refs)
+        return coords[found]
+
+    def resolve(self, refs: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """lat/lon rows for every ref plus a mask of the refs that exist; missing rows are undefined."""
+        if self.ids is None:
+            self.freeze()
+        refs_arr = np.asarray(refs, dtype=np.int64)
+        if self.ids.size == 0 or refs_arr.size == 0:
+            return np.zeros((refs_arr.size, 2)), np.zeros(refs_arr.size, dtype=bool)
+        slots = np.clip(np.searchsorted(self.ids, refs_arr), 0, self.ids.size - 1)
+        return self.coords[slots], self.ids[slots] == refs_arr
+
+
+@dataclass
+class WayStore:
+    """Node refs of the ways we keep, stored as one flat id array plus offsets."""
+
+    refs: array = field(default_factory=lambda: array("q"))
+    offsets: List[int] = field(default_factory=lambda: [0])
+    ids: List[int] = field(default_factory=list)
+    tags: List[dict] = field(default_factory=list)
+
+    def add(self, way_id: int, refs: Sequence[int], tags: dict) -> None:
+        self.refs.extend(refs)
+        self.offsets.append(len(self.refs))
+        self.ids.append(way_id)
+        self.tags.append(tags)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def way_refs(self, index: int) -> memoryview:
+        return memoryview(self.refs)[self.offsets[index] : self.offsets[index + 1]]
+
+
+def poi_type_for(tags: dict, include_other: bool = False) -> Optional[PoiType]:
+    for key in ("amenity", "shop"):
+        poi_type = TAG_POI_TYPES.get((key, tags.get(key, "")))
+        if poi_type:
+            return poi_type
+    if include_other and any(key in tags for key in OTHER_POI_KEYS):
+        return "other"
+    return None
+
+
+def distance_m(lat: np.ndarray | float, lon: np.ndarray | float, center_lat: float, center_lon: float) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat, lon, center_lat, center_lon))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def _element_name(tags: dict) -> Optional[str]:
+    for key in ("name", "name:vi", "name:en", "brand"):
+        value = tags.get(key, "").strip()
+        if value:
+            return value
+    return None
+
+
+@dataclass(frozen=True)
+class ImportResult:
+    pois: List[Poi]
+    polygon: Optional[List[Location]]
+    nodes_indexed: int
+    candidates: int
+
+
+def import_overpass(
+    path: Path,
+    center: Location,
+    radius_m: float,
+    max_pois: int = 30,
+    include_other: bool = False,
+    boundary_way: Optional[int] = None,
+) -> ImportResult:
+    nodes = NodeIndex()
+    ways = WayStore()
+    candidates: List[Tuple[float, float, str, PoiType]] = []
+    boundary_refs: Optional[List[int]] = None
+
+    for element in iter_elements(path):
+        kind = element.get("type")
+        tags = element.get("tags") or {}
+        if kind == "node":
+            nodes.add(element["id"], element["lat"], element["lon"])
+            poi_type = poi_type_for(tags, include_other) if tags else None
+            name = _element_name(tags) if poi_type else None
+            if name:
+                candidates.append((element["lat"], element["lon"], name, poi_type))
+        elif kind in ("way", "relation"):
+            if kind == "way" and boundary_way is not None and element["id"] == boundary_way:
+                boundary_refs = list(element.get("nodes", []))
+            poi_type = poi_type_for(tags, include_other) if tags else None
+            name = _element_name(tags) if poi_type else None
+            if not name:
+                continue
+            if "center" in element:
+                # "out center" output already carries a representative point.
+                candidates.append((element["center"]["lat"], element["center"]["lon"], name, poi_type))
+            elif kind == "way":
+                ways.add(element["id"], element.get("nodes", []), tags)
+
+    nodes.freeze()
+    for index in range(len(ways)):
+        coords = nodes.lookup(ways.way_refs(index))
+        if len(coords):
+            lat, lon = coords.mean(axis=0)
+            tags = ways.tags[index]
+            candidates.append((float(lat), float(lon), _element_name(tags), poi_type_for(tags, include_other)))
+
+    pois = _nearest_unique(candidates, center, radius_m, max_pois)
+
+    polygon = None
+    if boundary_way is not None:
+        if boundary_refs is None:
+            raise ValueError(f"Way {boundary_way} not found in {path}")
+        coords = nodes.lookup(boundary_refs)
+        if len(coords) >= 2 and np.allclose(coords[0], coords[-1]):
+            coords = coords[:-1]
+        if len(coords) < 3:
+            raise ValueError(f"Way {boundary_way} has fewer than 3 resolvable nodes")
+        polygon = [Location(name=f"P{idx + 1}", lat=float(lat), lon=float(lon)) for idx, (lat, lon) in enumerate(coords)]
+
+    return ImportResult(pois=pois, polygon=polygon, nodes_indexed=len(nodes), candidates=len(candidates))
+
+
+def _nearest_unique(
+    candidates: List[Tuple[float, float, str, PoiType]], center: Location, radius_m: float, max_pois: int
+) -> List[Poi]:
+    if not candidates:
+        return []
+    lats = np.fromiter((item[0] for item in candidates), dtype=np.float64, count=len(candidates))
+    lons = np.fromiter((item[1] for item in candidates), dtype=np.float64, count=len(candidates))
+    distances = distance_m(lats, lons, center.lat, center.lon)
+    pois: List[Poi] = []
+    seen: set[Tuple[str, str]] = set()
+    for idx in np.argsort(distances, kind="stable"):
+        if distances[idx] > radius_m or len(pois) >= max_pois:
+            break
+        lat, lon, name, poi_type = candidates[idx]
+        # The same place is often mapped both as a node and as a building outline.
+        if (name.casefold(), poi_type) in seen:
+            continue
+        seen.add((name.casefold(), poi_type))
+        pois.append(Poi(name=name, lat=lat, lon=lon, type=poi_type))
+    return pois
+
+
+def build_import_config(base: Optional[InputConfig], center: Location, result: ImportResult) -> InputConfig:
+    data = base.model_dump(mode="json") if base else {}
+    data["center"] = center.model_dump()
+    data["pois"] = [poi.model_dump() for poi in result.pois]
+    data["max_pois"] = max(data.get("max_pois", 30), len(result.pois))
+    if result.polygon:
+        style = data.setdefault("style", {})
+        style["polygon_points"] = [location.model_dump() for location in result.polygon]
+        style["show_polygon"] = True
+    return InputConfig.model_validate(data)
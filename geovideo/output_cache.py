@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from geovideo.audio_cache import file_digest
+from geovideo.overlay import overlay_digest
+from geovideo.providers.base import TileProvider
+from geovideo.schemas import InputConfig
+
+# Bump when the key payload changes shape so old entries stop matching.
+OUTPUT_CACHE_FORMAT = 1
+
+# Settings that only affect where files land or how tiles are fetched, never the pixels or audio.
+_IGNORED_FIELDS = {
+    "output": ("path", "work_dir", "keep_segments", "cache_dir", "cache_max_mb"),
+    "provider": (
+        "api_key",
+        "user_agent",
+        "cache_dir",
+        "max_retries",
+        "throttle_s",
+        "mirrors",
+        "subdomains",
+        "hedge_percentile",
+        # Renders that used derived tiles are never cached.
+        "derive_tiles",
+        "upscale_parents",
+    ),
+    "audio": ("cache_dir", "cache_max_mb"),
+}
+
+TileFingerprint = Dict[str, Tuple[int, int]]
+
+
+def renderer_version() -> str:
+    try:
+        return version("geovideo")
+    except PackageNotFoundError:
+        return "0+unknown"
+
+
+def input_files(config: InputConfig) -> Dict[str, str]:
+    """Single files the render reads besides tiles and overlay frames, by config field."""
+    style = config.style
+    files = {
+        "audio.music_path": config.audio.music_path,
+        "audio.voiceover_path": config.audio.voiceover_path,
+        "style.font_path": style.font_path,
+        "style.vector_overlay.path": style.vector_overlay.path if style.vector_overlay else None,
+        "style.polygon_geojson": style.polygon_geojson if isinstance(style.polygon_geojson, str) else None,
+    }
+    return {name: path for name, path in files.items() if path}
+
+
+def output_cache_key(config: InputConfig, seed: Optional[int], fit: str, provider: TileProvider) -> str:
+    data = config.model_dump(mode="json")
+    for section, fields in _IGNORED_FIELDS.items():
+        for name in fields:
+            data[section].pop(name, None)
+    payload = {
+        "format": OUTPUT_CACHE_FORMAT,
+        "renderer": renderer_version(),
+        "config": data,
+        "seed": seed,
+        "fit": fit,
+        "container": Path(config.output.path).suffix.lower(),
+        "tiles": {
+            "provider": provider.name,
+            "url_template": provider.url_template,
+            "tile_size": provider.tile_size,
+            "tile_scale": provider.tile_scale,
+        },
+        # Content, not paths: re-exported music with the same name must miss.
+        "inputs": {name: file_digest(path) for name, path in sorted(input_files(config).items())},
+        "overlay": overlay_digest(config.style.overlay_path) if config.style.overlay_path else None,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def tile_fingerprint(provider: TileProvider) -> Optional[TileFingerprint]:
+    """Size and mtime of every cached tile the render used, or None if any tile was not real map data."""
+    if provider.tile_log is None:
+        return {}
+    fingerprint: TileFingerprint = {}
+    for (z, x, y), source in sorted(provider.tile_log.items()):
+        if source not in ("cache", "network", "generated"):
+            # Offline placeholders or failed fetches must not be served once real tiles exist.
+            return None
+        path = provider._cache_path(z, x, y)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        fingerprint[str(path)] = (stat.st_size, stat.st_mtime_ns)
+    return fingerprint
+
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    """Place source at destination atomically, sharing the inode when both are on one filesystem."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    # rename() onto another link of the same inode is a silent no-op that would strand the temp file.
+    if destination.exists() and os.path.samefile(source, destination):
+        return
+    fd, tmp_name = tempfile.mkstemp(dir=destination.parent, prefix=f".{destination.name}.")
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        tmp.unlink()
+        try:
+            os.link(source, tmp)
+        except OSError:
+            shutil.copy2(source, tmp)
+        os.replace(tmp, destination)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+@dataclass
+class OutputCache:
+    """Finished videos stored as {key}{suffix} with a {key}.json manifest of the tiles they used."""
+
+    root: Path
+    max_bytes: int
+
+    def media_path(self, key: str, suffix: str) -> Path:
+        return self.root / f"{key}{suffix}"
+
+    def manifest_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def fetch(self, key: str, destination: Path) -> bool:
+        media = self.media_path(key, destination.suffix)
+        try:
+            manifest = json.loads(self.manifest_path(key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return False
+        if not media.exists() or not _tiles_unchanged(manifest.get("tiles", {})):
+            self.discard(key, destination.suffix)
+            return False
+        link_or_copy(media, destination)
+        os.utime(media)
+        return True
+
+    def store(self, key: str, source: Path, tiles: TileFingerprint) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        link_or_copy(source, self.media_path(key, source.suffix))
+        manifest = {"format": OUTPUT_CACHE_FORMAT, "renderer": renderer_version(), "tiles": tiles}
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=f".{key}.", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle)
+        os.replace(tmp_name, self.manifest_path(key))
+        self.evict(keep=key)
+
+    def discard(self, key: str, suffix: str) -> None:
+        self.media_path(key, suffix).unlink(missing_ok=True)
+        self.manifest_path(key).unlink(missing_ok=True)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        entries: List[Tuple[float, int, Path]] = []
+        for path in self.root.iterdir():
+            if path.name.startswith(".") or path.suffix == ".json":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path.stem == keep:
+                continue
+            self.discard(path.stem, path.suffix)
+            total -= size
+
+
+def _tiles_unchanged(tiles: Dict[str, List[int]]) -> bool:
+    for path, (size, mtime_ns) in tiles.items():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+            return False
+    return True
+
+
+def output_cache_for(config: InputConfig) -> Optional[OutputCache]:
+    if not config.output.cache_dir:
+        return None
+    return OutputCache(Path(config.output.cache_dir), max_bytes=int(config.output.cache_max_mb * 2**20))
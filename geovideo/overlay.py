@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from geovideo.audio_cache import file_digest
+from geovideo.schemas import OverlayPosition
+
+# Where an overlay sits when style.overlay_position is not set.
+PRESET_OVERLAY_POSITIONS = {"classic": "right", "social_map": "top_right"}
+# Frames shorter than this are treated as "no delay" by browsers; GIF/APNG players clamp them too.
+MIN_FRAME_DURATION_S = 0.02
+
+
+def overlay_sources(path: str) -> List[Path]:
+    """The image files behind an overlay path: one file, every PNG in a directory, or a glob."""
+    source = Path(path)
+    if source.is_dir():
+        files = sorted(source.glob("*.png"))
+    elif any(char in path for char in "*?["):
+        files = sorted(Path(match) for match in glob.glob(path))
+    else:
+        files = [source]
+    if not files:
+        raise ValueError(f"No overlay frames found at {path}")
+    return files
+
+
+def overlay_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    for source in overlay_sources(path):
+        digest.update(file_digest(source).encode("ascii"))
+    return digest.hexdigest()
+
+
+def decode_overlay(path: str, sequence_fps: float) -> Tuple[List[Image.Image], List[float]]:
+    """All RGBA frames and their durations in seconds; a static image is a single frame."""
+    sources = overlay_sources(path)
+    if len(sources) > 1:
+        frames = [Image.open(source).convert("RGBA") for source in sources]
+        return frames, [1.0 / sequence_fps] * len(frames)
+    frames: List[Image.Image] = []
+    durations: List[float] = []
+    with Image.open(sources[0]) as image:
+        for frame in ImageSequence.Iterator(image):
+            frames.append(frame.convert("RGBA"))
+            durations.append(max(frame.info.get("duration", 0) / 1000.0, MIN_FRAME_DURATION_S))
+    return frames, durations
+
+
+@dataclass
+class OverlayLayer:
+    """Pre-scaled overlay frames cropped to their shared visible box, stored as one (n, h, w, 4) array."""
+
+    frames: np.ndarray
+    frame_ends: np.ndarray
+    position: Tuple[int, int]
+    loop: bool = True
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def frame_index(self, time_s: float) -> int:
+        total = float(self.frame_ends[-1])
+        if self.loop:
+            time_s = time_s % total
+        elif time_s >= total:
+            return len(self.frames) - 1
+        return min(int(np.searchsorted(self.frame_ends, time_s, side="right")), len(self.frames) - 1)
+
+    def frame_array(self, time_s: float) -> np.ndarray:
+        return self.frames[self.frame_index(time_s)]
+
+    def frame_at(self, time_s: float) -> Image.Image:
+        # fromarray shares the mapped buffer, so this is a view, not a copy.
+        return Image.fromarray(self.frame_array(time_s))
+
+
+def fit_size(source: Tuple[int, int], frame: Tuple[int, int], scale: float) -> Tuple[int, int]:
+    ratio = min(frame[0] / source[0], frame[1] / source[1]) * scale
+    return max(int(source[0] * ratio), 1), max(int(source[1] * ratio), 1)
+
+
+def overlay_origin(
+    position: OverlayPosition, frame: Tuple[int, int], size: Tuple[int, int], margin: int
+) -> Tuple[int, int]:
+    width, height = frame
+    overlay_w, overlay_h = size
+    if position == "right":
+        return width - overlay_w - margin, int(height * 0.2)
+    if position == "center":
+        return (width - overlay_w) // 2, (height - overlay_h) // 2
+    vertical, horizontal = position.split("_")
+    x = margin if horizontal == "left" else width - overlay_w - margin
+    y = margin if vertical == "top" else height - overlay_h - margin
+    return x, y
+
+
+def build_overlay_layer(
+    path: str,
+    frame_size: Tuple[int, int],
+    position: OverlayPosition,
+    margin: int,
+    scale: float = 1.0,
+    sequence_fps: float = 12.0,
+    loop: bool = True,
+    cache_dir: Optional[str] = None,
+) -> OverlayLayer:
+    cache_path: Optional[Path] = None
+    if cache_dir:
+        key = hashlib.sha256(
+            f"{overlay_digest(path)}:{frame_size}:{scale}:{sequence_fps}".encode("utf-8")
+        ).hexdigest()[:32]
+        cache_path = Path(cache_dir) / f"{key}.npy"
+        cached = _load_cached(cache_path)
+        if cached is not None:
+            frames, frame_ends, size, offset = cached
+            return _layer(frames, frame_ends, size, offset, frame_size, position, margin, loop)
+
+    images, durations = decode_overlay(path, sequence_fps)
+    size = fit_size(images[0].size, frame_size, scale)
+    scaled = [image if image.size == size else image.resize(size) for image in images]
+    # Crop every frame to the union of visible pixels; fully transparent borders would be blitted for nothing.
+    boxes = np.array([bbox for bbox in (image.getchannel("A").getbbox() for image in scaled) if bbox])
+    box = (*boxes[:, :2].min(axis=0), *boxes[:, 2:].max(axis=0)) if len(boxes) else (0, 0, 1, 1)
+    box = tuple(int(value) for value in box)
+    frame_ends = np.cumsum(np.asarray(durations, dtype=np.float64))
+    if cache_path is not None:
+        frames = _store(cache_path, scaled, box, frame_ends, size)
+    else:
+        frames = np.stack([np.asarray(image.crop(box)) for image in scaled])
+    return _layer(frames, frame_ends, size, box[:2], frame_size, position, margin, loop)
+
+
+def _layer(
+    frames: np.ndarray,
+    frame_ends: np.ndarray,
+    size: Tuple[int, int],
+    offset: Tuple[int, int],
+    frame_size: Tuple[int, int],
+    position: OverlayPosition,
+    margin: int,
+    loop: bool,
+) -> OverlayLayer:
+    x, y = overlay_origin(position, frame_size, size, margin)
+    return OverlayLayer(frames=frames, frame_ends=frame_ends, position=(x + offset[0], y + offset[1]), loop=loop)
+
+
+def _load_cached(path: Path) -> Optional[Tuple[np.ndarray, np.ndarray, Tuple[int, int], Tuple[int, int]]]:
+    try:
+        meta = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        frames = np.load(path, mmap_mode="r")
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+    return frames, np.asarray(meta["frame_ends"]), tuple(meta["size"]), tuple(meta["offset"])
+
+
+def _store(
+    path: Path, images: List[Image.Image], box: Tuple[int, int, int, int], frame_ends: np.ndarray, size: Tuple[int, int]
+) -> np.ndarray:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    shape = (len(images), box[3] - box[1], box[2] - box[0], 4)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".npy")
+    os.close(fd)
+    try:
+        # Frames are written straight into the mapped file, one at a time.
+        store = np.lib.format.open_memmap(tmp_name, mode="w+", dtype=np.uint8, shape=shape)
+        for index, image in enumerate(images):
+            store[index] = np.asarray(image.crop(box))
+        store.flush()
+        del store
+        meta = {"frame_ends": frame_ends.tolist(), "size": list(size), "offset": list(box[:2])}
+        path.with_suffix(".json").write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return np.load(path, mmap_mode="r")
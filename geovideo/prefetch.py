@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+from geovideo.camera_path import TileKey
+from geovideo.providers.base import TileProvider
+
+
+@dataclass
+class PrefetchReport:
+    cached: int = 0
+    fetched: int = 0
+    failed: List[TileKey] = field(default_factory=list)
+
+    def describe(self) -> str:
+        return f"{self.fetched} fetched, {self.cached} already cached, {len(self.failed)} failed"
+
+
+def prefetch_tiles(
+    provider: TileProvider, tiles: Iterable[TileKey], workers: Optional[int] = None, derive: bool = True
+) -> PrefetchReport:
+    """Pull every missing tile into the provider cache in parallel; failures are reported, not raised.
+
+    workers defaults to, and never exceeds, the provider's max_connections.
+    With derive=False, derived stand-ins are not accepted and get replaced by real tiles.
+    """
+    workers = min(workers or provider.max_connections, provider.max_connections)
+    report = PrefetchReport()
+    missing = []
+    for tile in sorted(tiles):
+        if provider._cache_path(*tile).exists():
+            report.cached += 1
+        else:
+            missing.append(tile)
+    if not missing or provider._offline_mode():
+        return report
+
+    def fetch(tile: TileKey) -> bool:
+        try:
+            provider.get_tile(*tile, derive=derive)
+        except RuntimeError:
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="geovideo-prefetch") as pool:
+        for tile, ok in zip(missing, pool.map(fetch, missing)):
+            if ok:
+                report.fetched += 1
+            else:
+                report.failed.append(tile)
+    return report
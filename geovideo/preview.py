@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from geovideo.camera import CameraState
+from geovideo.compositor import Compositor, FrameContext
+from geovideo.draw import load_font
+
+
+def preview_times(
+    frame_times: Optional[Sequence[float]],
+    start: float,
+    end: Optional[float],
+    step: Optional[float],
+    duration: float,
+) -> List[float]:
+    times = list(frame_times or [])
+    if step is not None:
+        if step <= 0:
+            raise ValueError("step must be positive")
+        stop = duration if end is None else end
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        times.extend(start + idx * step for idx in range(max(count, 0)))
+    return times or [3.2]
+
+
+def render_frames(compositor: Compositor, camera: CameraState, times: Sequence[float]) -> List[np.ndarray]:
+    return [compositor.render_frame(FrameContext(time_s=t, camera=camera)) for t in times]
+
+
+def frame_paths(out: Path, times: Sequence[float]) -> List[Path]:
+    if len(times) == 1:
+        return [out]
+    return [out.with_name(f"{out.stem}_{idx:03d}_{t:.2f}s{out.suffix}") for idx, t in enumerate(times)]
+
+
+def contact_sheet(
+    frames: Sequence[np.ndarray],
+    times: Sequence[float],
+    columns: int = 4,
+    thumb_width: int = 270,
+    gap: int = 8,
+) -> Image.Image:
+    height, width = frames[0].shape[:2]
+    thumb_height = int(round(height * thumb_width / width))
+    columns = max(1, min(columns, len(frames)))
+    rows = math.ceil(len(frames) / columns)
+    sheet = Image.new(
+        "RGB",
+        (columns * thumb_width + (columns + 1) * gap, rows * thumb_height + (rows + 1) * gap),
+        (24, 24, 24),
+    )
+    draw = ImageDraw.Draw(sheet)
+    font = load_font(None, size=18)
+    for idx, (frame, t) in enumerate(zip(frames, times)):
+        thumb = _to_image(frame).resize((thumb_width, thumb_height), resample=Image.Resampling.LANCZOS)
+        x = gap + (idx % columns) * (thumb_width + gap)
+        y = gap + (idx // columns) * (thumb_height + gap)
+        sheet.paste(thumb, (x, y))
+        draw.text((x + 8, y + 6), f"{t:.2f}s", font=font, fill=(255, 255, 255), stroke_width=2, stroke_fill=(0, 0, 0))
+    return sheet
+
+
+def save_gif(frames: Sequence[np.ndarray], path: Path, frame_duration_s: float) -> None:
+    images = [_to_image(frame) for frame in frames]
+    images[0].save(
+        path,
+        save_all=True,
+        append_images=images[1:],
+        duration=max(int(round(frame_duration_s * 1000)), 20),
+        loop=0,
+    )
+
+
+def _to_image(frame: np.ndarray) -> Image.Image:
+    # Compositor frames are BGR, like everything handed to cv2.imwrite.
+    return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
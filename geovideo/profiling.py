@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SpanEvent:
+    name: str
+    category: str
+    start_s: float
+    duration_s: float
+    thread_id: int
+    args: Dict[str, Any]
+
+
+class NullProfiler:
+    enabled = False
+
+    def span(self, name: str, category: str = "render", **args: Any) -> ContextManager[None]:
+        return nullcontext()
+
+    def record(self, name: str, start_s: float, duration_s: float, category: str = "render", **args: Any) -> None:
+        return None
+
+    def count(self, name: str, value: float = 1) -> None:
+        return None
+
+
+class Profiler(NullProfiler):
+    enabled = True
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.events: List[SpanEvent] = []
+        self.counters: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str = "render", **args: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, category, **args)
+
+    def record(self, name: str, start_s: float, duration_s: float, category: str = "render", **args: Any) -> None:
+        event = SpanEvent(name, category, start_s - self.origin, duration_s, threading.get_ident(), args)
+        with self._lock:
+            self.events.append(event)
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def summary(self) -> Dict[str, Any]:
+        durations: Dict[str, List[float]] = defaultdict(list)
+        categories: Dict[str, str] = {}
+        for event in self.events:
+            durations[event.name].append(event.duration_s)
+            categories[event.name] = event.category
+        wall_s = time.perf_counter() - self.origin
+        stages = {}
+        for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+            ms = np.asarray(values) * 1000.0
+            stages[name] = {
+                "category": categories[name],
+                "count": int(ms.size),
+                "total_ms": round(float(ms.sum()), 3),
+                "mean_ms": round(float(ms.mean()), 3),
+                "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                "max_ms": round(float(ms.max()), 3),
+                "share_of_wall": round(float(ms.sum()) / 1000.0 / max(wall_s, 1e-9), 4),
+            }
+        counters = dict(self.counters)
+        lookups = counters.get("tile_cache_hits", 0) + counters.get("tile_cache_misses", 0)
+        return {
+            "wall_s": round(wall_s, 3),
+            "stages": stages,
+            "counters": counters,
+            "tile_cache_hit_ratio": round(counters.get("tile_cache_hits", 0) / lookups, 4) if lookups else None,
+        }
+
+    def trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": event.name,
+                "cat": event.category,
+                "ph": "X",
+                "ts": round(event.start_s * 1e6, 3),
+                "dur": round(event.duration_s * 1e6, 3),
+                "pid": pid,
+                "tid": event.thread_id,
+                "args": event.args,
+            }
+            for event in self.events
+        ]
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write(self, summary_path: Path, trace_path: Path) -> None:
+        summary_path.write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+        trace_path.write_text(json.dumps(self.trace()), encoding="utf-8")
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def profile_paths(output: Path) -> tuple[Path, Path]:
+    return output.with_suffix(".profile.json"), output.with_suffix(".trace.json")
@@ -2,13 +2,27 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from geovideo.geo import TILE_SIZE
 from geovideo.providers.base import TileProvider
 from geovideo.providers.mapbox import build_mapbox_provider
 from geovideo.providers.osm import build_osm_provider
+from geovideo.providers.raster import build_local_raster_provider
 from geovideo.schemas import ProviderConfig
 
 
 def build_provider(config: ProviderConfig) -> TileProvider:
+    provider = _build_provider(config)
+    provider.mirrors = tuple(config.mirrors)
+    provider.subdomains = tuple(config.subdomains) if config.subdomains else None
+    provider.hedge_percentile = config.hedge_percentile
+    provider.derive_tiles = config.derive_tiles
+    provider.upscale_parents = config.upscale_parents
+    if config.max_connections is not None:
+        provider.max_connections = config.max_connections
+    return provider
+
+
+def _build_provider(config: ProviderConfig) -> TileProvider:
     if config.name == "osm":
         return build_osm_provider(
             config.cache_dir,
@@ -25,6 +39,8 @@ def build_provider(config: ProviderConfig) -> TileProvider:
             config.max_retries,
             config.throttle_s,
             config.user_agent,
+            tile_size=config.tile_size or 512,
+            tile_scale=config.tile_scale,
         )
     if config.name == "custom":
         return TileProvider(
@@ -36,5 +52,16 @@ def build_provider(config: ProviderConfig) -> TileProvider:
             cache_dir=Path(config.cache_dir),
             max_retries=config.max_retries,
             throttle_s=config.throttle_s,
+            tile_size=config.tile_size or TILE_SIZE,
+            tile_scale=config.tile_scale,
+        )
+    if config.name == "local_raster":
+        return build_local_raster_provider(
+            config.cache_dir,
+            config.raster_path or "",
+            config.raster_crs,
+            config.raster_shape,
+            tile_size=config.tile_size or TILE_SIZE,
+            tile_scale=config.tile_scale,
         )
     raise ValueError(f"Unknown provider {config.name}")
@@ -2,14 +2,21 @@ from __future__ import annotations
 
 import io
 import os
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from PIL import Image, ImageDraw
 
+from geovideo.geo import TILE_SIZE
+from geovideo.profiling import NULL_PROFILER, NullProfiler
+from geovideo.providers.cache import CorruptTileError, TileCache
+from geovideo.providers.derive import DERIVE_DEPTH, derived_path, downsample_children, upscale_ancestor
+from geovideo.providers.mirrors import HedgedFetcher, LatencyTracker, expand_templates, shard_index
+
 
 @dataclass
 class TileProvider:
@@ -21,9 +28,39 @@ class TileProvider:
     cache_dir: Path = Path(".cache/tiles")
     max_retries: int = 3
     throttle_s: float = 0.1
+    # Tiles are tile_size * tile_scale pixels square but always address the standard XYZ grid,
+    # so a 512px or @2x tile replaces four 256px tiles one zoom level deeper.
+    tile_size: int = TILE_SIZE
+    tile_scale: int = 1
+    # Extra templates serving the same tiles; {s} in any template expands over subdomains.
+    mirrors: Tuple[str, ...] = ()
+    subdomains: Optional[Tuple[str, ...]] = None
+    # Race a second mirror once a request is slower than this percentile of recent ones; None disables.
+    hedge_percentile: Optional[float] = 95.0
+    # Parallel downloads the tile server's usage policy allows; prefetching never goes above it.
+    max_connections: int = 8
+    # Stand in for missing tiles with ones built from cached neighbours in zoom: "offline" when the
+    # network is unavailable, "always" before fetching, or "never".
+    derive_tiles: str = "offline"
+    # Zoom levels to look up for a cached ancestor to upscale when the children are not cached; 0 disables.
+    upscale_parents: int = 0
+    profiler: NullProfiler = field(default=NULL_PROFILER, repr=False, compare=False)
+    # When set, get_tile records where each tile came from (cache, network, generated, derived, placeholder, error).
+    tile_log: Optional[Dict[Tuple[int, int, int], str]] = field(default=None, repr=False, compare=False)
+    tile_cache: TileCache = field(default_factory=TileCache, repr=False, compare=False)
+    _hedger: Optional[HedgedFetcher] = field(default=None, init=False, repr=False, compare=False)
+    _hedger_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    @property
+    def tile_px(self) -> int:
+        return self.tile_size * self.tile_scale
 
     def _cache_path(self, z: int, x: int, y: int) -> Path:
-        return self.cache_dir / self.name / str(z) / str(x) / f"{y}.png"
+        root = self.cache_dir / self.name
+        if self.tile_px != TILE_SIZE:
+            # 256px tiles keep the original layout so existing caches stay valid.
+            root = root / f"{self.tile_size}@{self.tile_scale}x"
+        return root / str(z) / str(x) / f"{y}.png"
 
     def _throttle(self) -> None:
         if self.throttle_s > 0:
@@ -34,9 +71,10 @@ class TileProvider:
         return value in {"1", "true", "yes", "on"}
 
     def _placeholder_tile(self, z: int, x: int, y: int) -> Image.Image:
-        image = Image.new("RGB", (256, 256), color=(230, 233, 238))
+        size = self.tile_px
+        image = Image.new("RGB", (size, size), color=(230, 233, 238))
         draw = ImageDraw.Draw(image)
-        draw.rectangle((0, 0, 255, 255), outline=(200, 205, 213))
+        draw.rectangle((0, 0, size - 1, size - 1), outline=(200, 205, 213))
         draw.text((12, 12), f"{z}/{x}/{y}", fill=(90, 95, 105))
         return image
 
@@ -45,23 +83,157 @@ class TileProvider:
             return {"User-Agent": self.user_agent}
         return {"User-Agent": "geovideo/0.1 (+https://github.com/congvm/satellite-video-generation)"}
 
-    def get_tile(self, z: int, x: int, y: int) -> Image.Image:
+    def get_tile(self, z: int, x: int, y: int, derive: bool = True) -> Image.Image:
+        """The tile from cache or network; derive=False never substitutes a derived tile for a real one."""
+        start = time.perf_counter()
         path = self._cache_path(z, x, y)
-        if path.exists():
-            return Image.open(path).convert("RGB")
-        if self._offline_mode():
+        image = self._read_cached(path)
+        if image is not None:
+            self._record_tile(start, z, x, y, "cache", path.stat().st_size if self.profiler.enabled else 0)
+            return image
+        self.profiler.count("tile_cache_misses")
+        offline = self._offline_mode()
+        derive = derive and self.derive_tiles != "never"
+        if derive and (offline or self.derive_tiles == "always"):
+            image = self._derived_tile(z, x, y)
+            if image is not None:
+                self._record_tile(start, z, x, y, "derived", 0)
+                return image
+        if offline:
+            self._record_tile(start, z, x, y, "placeholder", 0)
             return self._placeholder_tile(z, x, y)
-        url = self.url_template.format(z=z, x=x, y=y, api_key=self.api_key or "")
-        path.parent.mkdir(parents=True, exist_ok=True)
-        last_error: Optional[Exception] = None
-        for _ in range(self.max_retries):
-            try:
-                self._throttle()
-                response = requests.get(url, timeout=10, headers=self._request_headers())
-                response.raise_for_status()
-                image = Image.open(io.BytesIO(response.content)).convert("RGB")
-                image.save(path)
+        urls = self._tile_urls(z, x, y)
+        with self.tile_cache.locked(path) as waited:
+            if waited:
+                self.profiler.count("tile_lock_waits")
+            # Another process may have fetched the tile since the first lookup.
+            image = self._read_cached(path)
+            if image is not None:
+                self._record_tile(start, z, x, y, "cache", path.stat().st_size if self.profiler.enabled else 0)
                 return image
-            except Exception as exc:  # noqa: BLE001 - propagate after retries
-                last_error = exc
+            last_error: Optional[Exception] = None
+            for attempt in range(self.max_retries):
+                try:
+                    self._throttle()
+                    # Retries move on to the next mirror.
+                    content = self._fetch(urls, shard_index(x, y, len(urls)) + attempt)
+                    image = Image.open(io.BytesIO(content)).convert("RGB")
+                    self.tile_cache.write(path, content)
+                    derived_path(path).unlink(missing_ok=True)
+                    self._record_tile(start, z, x, y, "network", len(content), attempt)
+                    return image
+                except Exception as exc:  # noqa: BLE001 - propagate after retries
+                    last_error = exc
+                    self.profiler.count("tile_fetch_errors")
+        image = self._derived_tile(z, x, y) if derive else None
+        if image is not None:
+            self._record_tile(start, z, x, y, "derived", 0, self.max_retries)
+            return image
+        self._record_tile(start, z, x, y, "error", 0, self.max_retries)
         raise RuntimeError(f"Failed to fetch tile {z}/{x}/{y}: {last_error}")
+
+    def _read_cached(self, path: Path) -> Optional[Image.Image]:
+        try:
+            return self.tile_cache.read(path)
+        except CorruptTileError:
+            self.profiler.count("tile_cache_corrupt")
+            return None
+
+    def _derived_tile(self, z: int, x: int, y: int) -> Optional[Image.Image]:
+        """A stand-in from cached children (stored, marked as derived) or a cached ancestor (not stored)."""
+        path = derived_path(self._cache_path(z, x, y))
+        image = self._read_cached(path)
+        if image is not None:
+            return image
+        image = self._from_children(z, x, y, DERIVE_DEPTH)
+        if image is not None:
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            self.tile_cache.write(path, buffer.getvalue())
+            self.profiler.count("tile_derived_from_children")
+            return image
+        for levels in range(1, min(self.upscale_parents, z) + 1):
+            ancestor = self._cached_tile(z - levels, x >> levels, y >> levels)
+            if ancestor is not None:
+                self.profiler.count("tile_derived_from_parent")
+                return upscale_ancestor(ancestor, levels, x, y, self.tile_px)
+        return None
+
+    def _from_children(self, z: int, x: int, y: int, depth: int) -> Optional[Image.Image]:
+        children = []
+        for dy in (0, 1):
+            for dx in (0, 1):
+                child = self._cached_tile(z + 1, 2 * x + dx, 2 * y + dy)
+                if child is None and depth > 1:
+                    child = self._from_children(z + 1, 2 * x + dx, 2 * y + dy, depth - 1)
+                if child is None:
+                    return None
+                children.append(child)
+        return downsample_children(children, self.tile_px)
+
+    def _cached_tile(self, z: int, x: int, y: int) -> Optional[Image.Image]:
+        path = self._cache_path(z, x, y)
+        image = self._read_cached(path)
+        return image if image is not None else self._read_cached(derived_path(path))
+
+    def _tile_urls(self, z: int, x: int, y: int) -> List[str]:
+        templates = expand_templates([self.url_template, *self.mirrors], self.subdomains)
+        return [
+            template.format(
+                z=z,
+                x=x,
+                y=y,
+                api_key=self.api_key or "",
+                tile_size=self.tile_size,
+                r="@2x" if self.tile_scale == 2 else "",
+            )
+            for template in templates
+        ]
+
+    def _download(self, url: str) -> bytes:
+        response = requests.get(url, timeout=10, headers=self._request_headers())
+        response.raise_for_status()
+        return response.content
+
+    def _fetch(self, urls: List[str], shard: int) -> bytes:
+        if len(urls) == 1 or self.hedge_percentile is None:
+            return self._download(urls[shard % len(urls)])
+        result = self._hedged_fetcher().fetch(self._download, urls, shard)
+        if result.hedged:
+            self.profiler.count("tile_hedged_requests")
+        if result.hedge_won:
+            self.profiler.count("tile_hedge_wins")
+        return result.content
+
+    def _hedged_fetcher(self) -> HedgedFetcher:
+        # Prefetch calls get_tile from several threads; they must share one fetcher and its pools.
+        with self._hedger_lock:
+            if self._hedger is None:
+                self._hedger = HedgedFetcher(LatencyTracker(percentile=self.hedge_percentile), self.max_connections)
+            return self._hedger
+
+    def close(self) -> None:
+        """Stop the hedged fetcher's threads; a later fetch starts new ones."""
+        with self._hedger_lock:
+            if self._hedger is not None:
+                self._hedger.close()
+                self._hedger = None
+
+    def _record_tile(self, start: float, z: int, x: int, y: int, source: str, size: int, retries: int = 0) -> None:
+        if self.tile_log is not None:
+            self.tile_log[(z, x, y)] = source
+        if not self.profiler.enabled:
+            return
+        if source == "cache":
+            self.profiler.count("tile_cache_hits")
+        self.profiler.count(f"tile_{source}_bytes", size)
+        self.profiler.record(
+            "get_tile",
+            start,
+            time.perf_counter() - start,
+            "tiles",
+            tile=f"{z}/{x}/{y}",
+            source=source,
+            bytes=size,
+            retries=retries,
+        )
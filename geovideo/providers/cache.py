@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from PIL import Image
+
+
+class CorruptTileError(OSError):
+    def __init__(self, path: Path) -> None:
+        super().__init__(f"Corrupt cached tile {path}")
+        self.path = path
+
+
+@dataclass
+class TileCache:
+    """Tile files shared by any number of render processes.
+
+    Entries only ever appear through an atomic rename, fetches of the same tile are serialized
+    through a lock file next to it, and entries that fail to decode are deleted so they are fetched again.
+    """
+
+    # A lock older than this belongs to a process that died mid-fetch and is taken over.
+    stale_lock_s: float = 60.0
+    poll_s: float = 0.05
+
+    def read(self, path: Path) -> Optional[Image.Image]:
+        """The decoded tile, or None if it is missing or unreadable (unreadable entries are removed)."""
+        try:
+            with Image.open(path) as image:
+                return image.convert("RGB")
+        except FileNotFoundError:
+            return None
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            path.unlink(missing_ok=True)
+            raise CorruptTileError(path) from None
+
+    def write(self, path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(content)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    @contextmanager
+    def locked(self, path: Path) -> Iterator[bool]:
+        """Hold the fetch lock for path; yields True if another process held it first."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock = path.with_name(f"{path.name}.lock")
+        # The pid says who holds the lock; the random part tells apart threads and reused pids.
+        owner = f"{os.getpid()} {uuid.uuid4().hex}"
+        waited = False
+        while True:
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                waited = True
+                try:
+                    if time.time() - lock.stat().st_mtime > self.stale_lock_s:
+                        self._break_stale_lock(lock)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(self.poll_s)
+                continue
+            os.write(fd, owner.encode("ascii"))
+            os.close(fd)
+            break
+        try:
+            yield waited
+        finally:
+            # A lock taken over while we were stalled belongs to someone else now.
+            try:
+                if lock.read_text(encoding="ascii") == owner:
+                    lock.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _break_stale_lock(self, lock: Path) -> None:
+        """Remove a stale lock; raises FileNotFoundError if another process got to it first.
+
+        Several waiters can see the same stale lock, so it is renamed aside before unlinking: only one
+        rename succeeds. If the lock was replaced by a fresh one in between, that one is put back.
+        """
+        aside = lock.with_name(f"{lock.name}.{uuid.uuid4().hex}.stale")
+        os.rename(lock, aside)
+        try:
+            if time.time() - aside.stat().st_mtime <= self.stale_lock_s:
+                try:
+                    os.link(aside, lock)
+                except FileExistsError:
+                    pass
+        finally:
+            aside.unlink(missing_ok=True)
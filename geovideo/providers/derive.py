@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Sequence
+
+from PIL import Image
+
+# How many zoom levels of cached descendants may be merged into one missing tile (z from z+2 at most).
+DERIVE_DEPTH = 2
+
+
+def derived_path(path: Path) -> Path:
+    """Where a locally derived stand-in for the cached tile at path lives; the real tile path stays free."""
+    return path.with_name(f"{path.stem}.derived{path.suffix}")
+
+
+def downsample_children(children: Sequence[Image.Image], size: int) -> Image.Image:
+    """One tile from its four children, ordered (0, 0), (1, 0), (0, 1), (1, 1) as (dx, dy)."""
+    mosaic = Image.new("RGB", (size * 2, size * 2))
+    for index, child in enumerate(children):
+        if child.size != (size, size):
+            child = child.resize((size, size), Image.Resampling.BOX)
+        mosaic.paste(child, ((index % 2) * size, (index // 2) * size))
+    return mosaic.reduce(2)
+
+
+def upscale_ancestor(ancestor: Image.Image, levels: int, x: int, y: int, size: int) -> Image.Image:
+    """The part of a tile `levels` zooms up that covers tile x, y, stretched back to full size."""
+    span = size / 2**levels
+    left, top = (x % 2**levels) * span, (y % 2**levels) * span
+    return ancestor.resize((size, size), Image.Resampling.BICUBIC, box=(left, top, left + span, top + span))
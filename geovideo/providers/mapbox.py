@@ -11,11 +11,13 @@ def build_mapbox_provider(
     max_retries: int,
     throttle_s: float,
     user_agent: str | None = None,
+    tile_size: int = 512,
+    tile_scale: int = 1,
 ) -> TileProvider:
     return TileProvider(
         name="mapbox",
         url_template=(
-            "https://api.mapbox.com/styles/v1/mapbox/satellite-v9/tiles/256/{z}/{x}/{y}?access_token={api_key}"
+            "https://api.mapbox.com/styles/v1/mapbox/satellite-v9/tiles/{tile_size}/{z}/{x}/{y}{r}?access_token={api_key}"
         ),
         attribution="© Mapbox © OpenStreetMap",
         api_key=api_key,
@@ -23,4 +25,6 @@ def build_mapbox_provider(
         cache_dir=Path(cache_dir),
         max_retries=max_retries,
         throttle_s=throttle_s,
+        tile_size=tile_size,
+        tile_scale=tile_scale,
     )
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Leaflet's convention for {s} when a template does not say which subdomains exist.
+DEFAULT_SUBDOMAINS = ("a", "b", "c")
+
+
+def expand_templates(templates: Sequence[str], subdomains: Optional[Sequence[str]] = None) -> List[str]:
+    """One template per host: every {s} template is repeated once per subdomain."""
+    expanded: List[str] = []
+    for template in templates:
+        if "{s}" in template:
+            expanded.extend(template.replace("{s}", sub) for sub in (subdomains or DEFAULT_SUBDOMAINS))
+        else:
+            expanded.append(template)
+    return list(dict.fromkeys(expanded))
+
+
+def shard_index(x: int, y: int, count: int) -> int:
+    # Same tile, same host, so HTTP caches and CDNs see a stable mapping.
+    return (x + y) % count
+
+
+@dataclass
+class LatencyTracker:
+    """Rolling window of response times; the hedge delay is a percentile of it."""
+
+    percentile: float = 95.0
+    initial_s: float = 1.0
+    min_samples: int = 20
+    window: int = 256
+    _samples: Deque[float] = field(default_factory=deque, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            if len(self._samples) > self.window:
+                self._samples.popleft()
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.initial_s
+            return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), self.percentile))
+
+
+@dataclass
+class HedgedResult:
+    content: bytes
+    url: str
+    hedged: bool
+    hedge_won: bool
+
+
+class HedgedFetcher:
+    """Fetch from the tile's shard and, once it is slower than the tracked percentile, race another mirror."""
+
+    def __init__(self, tracker: LatencyTracker, max_workers: int = 8) -> None:
+        self.tracker = tracker
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="geovideo-tile")
+        # Hedges get a pool of their own: queued behind busy primaries they would start too late to help.
+        self._hedge_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="geovideo-hedge")
+
+    def fetch(self, get: Callable[[str], bytes], urls: Sequence[str], primary: int) -> HedgedResult:
+        first = urls[primary % len(urls)]
+        futures = {self._submit(self._executor, get, first): first}
+        if len(urls) > 1:
+            done, _ = wait(futures, timeout=self.tracker.hedge_delay())
+            if not done:
+                backup = urls[(primary + 1) % len(urls)]
+                futures[self._submit(self._hedge_executor, get, backup)] = backup
+        return self._first_success(futures, first)
+
+    def _submit(self, executor: ThreadPoolExecutor, get: Callable[[str], bytes], url: str) -> Future:
+        return executor.submit(self._timed, get, url)
+
+    def _timed(self, get: Callable[[str], bytes], url: str) -> bytes:
+        start = time.perf_counter()
+        content = get(url)
+        self.tracker.observe(time.perf_counter() - start)
+        return content
+
+    def _first_success(self, futures: Dict[Future, str], primary_url: str) -> HedgedResult:
+        hedged = len(futures) > 1
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The loser keeps running in the pool; its result is simply dropped.
+                    url = futures[future]
+                    return HedgedResult(future.result(), url, hedged, hedged and url != primary_url)
+                error = future.exception()
+        assert error is not None
+        raise error
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._hedge_executor.shutdown(wait=False, cancel_futures=True)
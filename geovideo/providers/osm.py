@@ -19,4 +19,6 @@ def build_osm_provider(
         cache_dir=Path(cache_dir),
         max_retries=max_retries,
         throttle_s=throttle_s,
+        # The OSM tile usage policy allows at most two connections.
+        max_connections=2,
     )
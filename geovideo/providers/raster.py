@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import math
+import os
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from geovideo.providers.base import TileProvider
+
+EARTH_HALF_CIRCUMFERENCE_M = math.pi * 6378137.0
+# Out-of-raster pixels, matching the offline placeholder tiles.
+NO_DATA_RGB = (230, 233, 238)
+DECODED_TILE_CACHE = 64
+
+# TIFF field type -> struct code; rationals are read as pairs.
+_TIFF_TYPES = {1: "B", 2: "s", 3: "H", 4: "I", 5: "II", 7: "B", 11: "f", 12: "d", 16: "Q", 17: "q", 18: "Q"}
+_COMPRESSION_NONE = 1
+_COMPRESSION_DEFLATE = (8, 32946)
+
+
+@dataclass(frozen=True)
+class GeoTransform:
+    """Pixel corner (col, row) -> CRS coordinates for north-up rasters: x = x0 + col * dx, y = y0 + row * dy."""
+
+    x0: float
+    y0: float
+    dx: float
+    dy: float
+
+    def to_pixel(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return (x - self.x0) / self.dx, (y - self.y0) / self.dy
+
+
+def world_file_for(path: Path) -> Optional[Path]:
+    """The sidecar next to path: .tfw style (first and last letter + w), extension + w, or .wld."""
+    suffix = path.suffix.lstrip(".")
+    candidates = [f"{suffix[0]}{suffix[-1]}w", f"{suffix}w", "wld"] if suffix else ["wld"]
+    for candidate in candidates:
+        for name in (candidate, candidate.upper()):
+            sidecar = path.with_suffix(f".{name}")
+            if sidecar.exists():
+                return sidecar
+    return None
+
+
+def read_world_file(path: Path) -> GeoTransform:
+    values = [float(line) for line in path.read_text(encoding="utf-8").split() if line.strip()]
+    if len(values) != 6:
+        raise ValueError(f"World file {path} must have 6 lines")
+    dx, rot_y, rot_x, dy, cx, cy = values
+    if rot_x or rot_y:
+        raise ValueError(f"Rotated rasters are not supported: {path}")
+    # World files give the center of the top-left pixel.
+    return GeoTransform(cx - dx / 2, cy - dy / 2, dx, dy)
+
+
+class ArrayRaster:
+    """A (height, width, bands) uint8 array, usually memory-mapped from .npy or raw bytes."""
+
+    def __init__(self, array: np.ndarray) -> None:
+        if array.ndim == 2:
+            array = array[:, :, None]
+        self.array = array
+        self.height, self.width, self.bands = array.shape
+
+    def gather(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        # Fancy indexing on a memmap only touches the pages holding the requested pixels.
+        return np.asarray(self.array[rows[:, None], cols[None, :]])
+
+
+class TiledTiff:
+    """Windowed reads from an 8-bit chunky TIFF or BigTIFF, tiled or stripped, raw or Deflate.
+
+    The file is memory-mapped and only the tiles (or strips) holding requested pixels are decoded.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode="r")
+        self.tags = self._read_first_ifd()
+        self.width = int(self.tags[256][0])
+        self.height = int(self.tags[257][0])
+        self.bands = int(self.tags.get(277, (1,))[0])
+        if any(bits != 8 for bits in self.tags.get(258, (8,))):
+            raise ValueError(f"{path}: only 8-bit samples are supported")
+        if self.tags.get(284, (1,))[0] != 1:
+            raise ValueError(f"{path}: only chunky (interleaved) samples are supported")
+        self.compression = int(self.tags.get(259, (1,))[0])
+        if self.compression != _COMPRESSION_NONE and self.compression not in _COMPRESSION_DEFLATE:
+            raise ValueError(f"{path}: compression {self.compression} is not supported (use none or deflate)")
+        self.predictor = int(self.tags.get(317, (1,))[0])
+        if 322 in self.tags:
+            self.tile_w, self.tile_h = int(self.tags[322][0]), int(self.tags[323][0])
+            self.offsets, self.byte_counts = self.tags[324], self.tags[325]
+        else:
+            # Strips are tiles as wide as the image.
+            self.tile_w, self.tile_h = self.width, int(self.tags.get(278, (self.height,))[0])
+            self.offsets, self.byte_counts = self.tags[273], self.tags[279]
+        self.tiles_across = -(-self.width // self.tile_w)
+        self._decoded: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    def geo_transform(self) -> Optional[GeoTransform]:
+        # GeoTIFF ModelPixelScale + ModelTiepoint, tying a pixel corner to a CRS coordinate.
+        if 33550 not in self.tags or 33922 not in self.tags:
+            return None
+        scale_x, scale_y = self.tags[33550][:2]
+        col, row, _, x, y, _ = self.tags[33922][:6]
+        return GeoTransform(x - col * scale_x, y + row * scale_y, scale_x, -scale_y)
+
+    def gather(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        out = np.empty((len(rows), len(cols), self.bands), dtype=np.uint8)
+        tile_rows, tile_cols = rows // self.tile_h, cols // self.tile_w
+        for tile_row in np.unique(tile_rows):
+            row_sel = np.flatnonzero(tile_rows == tile_row)
+            for tile_col in np.unique(tile_cols):
+                col_sel = np.flatnonzero(tile_cols == tile_col)
+                tile = self._tile(int(tile_row) * self.tiles_across + int(tile_col))
+                local_rows = rows[row_sel] - tile_row * self.tile_h
+                local_cols = cols[col_sel] - tile_col * self.tile_w
+                out[row_sel[:, None], col_sel[None, :]] = tile[local_rows[:, None], local_cols[None, :]]
+        return out
+
+    def _tile(self, index: int) -> np.ndarray:
+        tile = self._decoded.get(index)
+        if tile is not None:
+            self._decoded.move_to_end(index)
+            return tile
+        offset, count = int(self.offsets[index]), int(self.byte_counts[index])
+        raw = self._data[offset : offset + count]
+        if self.compression != _COMPRESSION_NONE:
+            raw = np.frombuffer(zlib.decompress(raw.tobytes()), dtype=np.uint8)
+        tile_w = self.tile_w
+        rows = len(raw) // (tile_w * self.bands)
+        tile = np.asarray(raw[: rows * tile_w * self.bands]).reshape(rows, tile_w, self.bands)
+        if self.predictor == 2:
+            # Horizontal differencing: each sample is stored as the delta from its left neighbour.
+            tile = np.cumsum(tile, axis=1, dtype=np.uint8)
+        if rows < self.tile_h:
+            # Last strip of the image, or a truncated edge tile.
+            tile = np.concatenate([tile, np.zeros((self.tile_h - rows, tile_w, self.bands), dtype=np.uint8)])
+        self._decoded[index] = tile
+        if len(self._decoded) > DECODED_TILE_CACHE:
+            self._decoded.popitem(last=False)
+        return tile
+
+    def _read_first_ifd(self) -> Dict[int, Sequence]:
+        data = self._data
+        order = {b"II": "<", b"MM": ">"}.get(bytes(data[:2]))
+        if order is None:
+            raise ValueError(f"{self.path} is not a TIFF file")
+        magic = struct.unpack(f"{order}H", bytes(data[2:4]))[0]
+        big = magic == 43
+        if big:
+            offset_fmt, count_fmt, entry_size, inline = "Q", "Q", 20, 8
+            ifd = struct.unpack(f"{order}Q", bytes(data[8:16]))[0]
+        elif magic == 42:
+            offset_fmt, count_fmt, entry_size, inline = "I", "H", 12, 4
+            ifd = struct.unpack(f"{order}I", bytes(data[4:8]))[0]
+        else:
+            raise ValueError(f"{self.path} is not a TIFF file")
+        count_size = struct.calcsize(count_fmt)
+        (entries,) = struct.unpack(f"{order}{count_fmt}", bytes(data[ifd : ifd + count_size]))
+        tags: Dict[int, Sequence] = {}
+        for index in range(entries):
+            start = ifd + count_size + index * entry_size
+            entry = bytes(data[start : start + entry_size])
+            tag, kind = struct.unpack(f"{order}HH", entry[:4])
+            if kind not in _TIFF_TYPES:
+                continue
+            (count,) = struct.unpack(f"{order}{offset_fmt}", entry[4 : 4 + inline])
+            code = _TIFF_TYPES[kind]
+            size = struct.calcsize(code) * count
+            if size <= inline:
+                payload = entry[4 + inline : 4 + inline + size]
+            else:
+                (where,) = struct.unpack(f"{order}{offset_fmt}", entry[4 + inline :])
+                payload = bytes(data[where : where + size])
+            if kind == 2:
+                tags[tag] = (payload.rstrip(b"\0").decode("latin-1"),)
+                continue
+            values = struct.unpack(f"{order}{code * count}", payload)
+            if kind == 5:
+                values = tuple(num / den if den else 0.0 for num, den in zip(values[::2], values[1::2]))
+            tags[tag] = values
+        return tags
+
+
+def open_raster(path: Path, shape: Optional[Sequence[int]] = None):
+    """A raster source and its georeferencing; a world file sidecar wins over embedded GeoTIFF tags."""
+    sidecar = world_file_for(path)
+    transform = read_world_file(sidecar) if sidecar else None
+    suffix = path.suffix.lower()
+    if suffix in (".tif", ".tiff"):
+        source = TiledTiff(path)
+        transform = transform or source.geo_transform()
+    elif suffix == ".npy":
+        source = ArrayRaster(np.load(path, mmap_mode="r"))
+    else:
+        if not shape:
+            raise ValueError(f"Raw raster {path} needs provider.raster_shape (height, width, bands)")
+        source = ArrayRaster(np.memmap(path, dtype=np.uint8, mode="r", shape=tuple(shape)))
+    if transform is None:
+        raise ValueError(f"No georeferencing for {path}: add a world file next to it")
+    if source.bands not in (1, 3, 4):
+        raise ValueError(f"{path}: expected 1 (gray), 3 (RGB) or 4 (RGBA) bands, got {source.bands}")
+    return source, transform
+
+
+def raster_fingerprint(path: Path) -> str:
+    """Changes when the raster or its world file changes, since either moves the imagery."""
+    stat = path.stat()
+    key = f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    sidecar = world_file_for(path)
+    if sidecar is not None:
+        # World files are a few lines, so their content is hashed rather than trusting mtime.
+        key += f":{sidecar.name}:{hashlib.sha256(sidecar.read_bytes()).hexdigest()}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class LocalRasterProvider(TileProvider):
+    """Web-mercator tiles cut on demand from a local georeferenced raster, then cached like fetched tiles."""
+
+    name: str = "local_raster"
+    url_template: str = ""
+    attribution: str = ""
+    raster_path: Path = Path("ortho.tif")
+    crs: str = "EPSG:3857"
+    raster_shape: Optional[Tuple[int, int, int]] = None
+    _source: object = field(default=None, init=False, repr=False, compare=False)
+    _transform: Optional[GeoTransform] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.raster_path = Path(self.raster_path)
+        self._fingerprint = raster_fingerprint(self.raster_path)
+        # Keys the output cache: another file, or the same file edited in place, is another tile source.
+        self.url_template = f"local_raster:{self.raster_path.resolve()}#{self._fingerprint}"
+
+    def _offline_mode(self) -> bool:
+        # Tiles come from disk, so offline renders still get real imagery.
+        return False
+
+    def _cache_path(self, z: int, x: int, y: int) -> Path:
+        path = super()._cache_path(z, x, y)
+        relative = path.relative_to(self.cache_dir / self.name)
+        return self.cache_dir / self.name / self._fingerprint / relative
+
+    def get_tile(self, z: int, x: int, y: int, derive: bool = True) -> Image.Image:
+        start = time.perf_counter()
+        path = self._cache_path(z, x, y)
+        image = self._read_cached(path)
+        if image is not None:
+            self._record_tile(start, z, x, y, "cache", path.stat().st_size if self.profiler.enabled else 0)
+            return image
+        self.profiler.count("tile_cache_misses")
+        with self.tile_cache.locked(path):
+            image = self._read_cached(path)
+            if image is not None:
+                self._record_tile(start, z, x, y, "cache", path.stat().st_size if self.profiler.enabled else 0)
+                return image
+            image = Image.fromarray(self.render_tile(z, x, y))
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            self.tile_cache.write(path, buffer.getvalue())
+        self._record_tile(start, z, x, y, "generated", len(buffer.getvalue()))
+        return image
+
+    def render_tile(self, z: int, x: int, y: int) -> np.ndarray:
+        """Bilinear resample of the raster onto one tile; rows and columns are separable for north-up rasters."""
+        if self._source is None:
+            self._source, self._transform = open_raster(self.raster_path, self.raster_shape)
+        source, transform = self._source, self._transform
+        size = self.tile_px
+        # Mercator coordinates of output pixel centers, normalized to [0, 1].
+        u = (x + (np.arange(size) + 0.5) / size) / 2**z
+        v = (y + (np.arange(size) + 0.5) / size) / 2**z
+        if self.crs == "EPSG:4326":
+            world_x = u * 360.0 - 180.0
+            world_y = np.degrees(np.arctan(np.sinh(math.pi * (1 - 2 * v))))
+        else:
+            world_x = (u - 0.5) * 2 * EARTH_HALF_CIRCUMFERENCE_M
+            world_y = (0.5 - v) * 2 * EARTH_HALF_CIRCUMFERENCE_M
+        cols, rows = transform.to_pixel(world_x, world_y)
+        # Pixel centers sit at +0.5.
+        cols, rows = cols - 0.5, rows - 0.5
+        inside = (
+            ((rows >= -0.5) & (rows <= source.height - 0.5))[:, None]
+            & ((cols >= -0.5) & (cols <= source.width - 0.5))[None, :]
+        )
+        tile = np.empty((size, size, 3), dtype=np.uint8)
+        tile[:] = NO_DATA_RGB
+        if not inside.any():
+            return tile
+        row_lo, row_w = _bilinear_axis(rows, source.height)
+        col_lo, col_w = _bilinear_axis(cols, source.width)
+        needed_rows = np.unique(np.concatenate([row_lo, row_lo + 1]).clip(0, source.height - 1))
+        needed_cols = np.unique(np.concatenate([col_lo, col_lo + 1]).clip(0, source.width - 1))
+        window = source.gather(needed_rows, needed_cols).astype(np.float32)
+        r0 = np.searchsorted(needed_rows, row_lo.clip(0, source.height - 1))
+        r1 = np.searchsorted(needed_rows, (row_lo + 1).clip(0, source.height - 1))
+        c0 = np.searchsorted(needed_cols, col_lo.clip(0, source.width - 1))
+        c1 = np.searchsorted(needed_cols, (col_lo + 1).clip(0, source.width - 1))
+        top = window[r0][:, c0] * (1 - col_w)[None, :, None] + window[r0][:, c1] * col_w[None, :, None]
+        bottom = window[r1][:, c0] * (1 - col_w)[None, :, None] + window[r1][:, c1] * col_w[None, :, None]
+        pixels = top * (1 - row_w)[:, None, None] + bottom * row_w[:, None, None]
+        if source.bands == 1:
+            pixels = np.repeat(pixels, 3, axis=2)
+        elif source.bands == 4:
+            alpha = pixels[..., 3:4] / 255.0
+            pixels = pixels[..., :3] * alpha + np.asarray(NO_DATA_RGB, dtype=np.float32) * (1 - alpha)
+        tile[inside] = np.clip(pixels[inside] + 0.5, 0, 255).astype(np.uint8)
+        return tile
+
+
+def _bilinear_axis(coords: np.ndarray, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    coords = np.clip(coords, 0, length - 1)
+    low = np.floor(coords).astype(np.int64)
+    return low, (coords - low).astype(np.float32)
+
+
+def build_local_raster_provider(
+    cache_dir: str,
+    raster_path: str,
+    crs: str,
+    raster_shape: Optional[Sequence[int]] = None,
+    tile_size: int = 256,
+    tile_scale: int = 1,
+) -> LocalRasterProvider:
+    if not os.path.exists(raster_path):
+        raise ValueError(f"Raster not found: {raster_path}")
+    return LocalRasterProvider(
+        cache_dir=Path(cache_dir),
+        raster_path=Path(raster_path),
+        crs=crs,
+        raster_shape=tuple(raster_shape) if raster_shape else None,
+        attribution="Local imagery",
+        tile_size=tile_size,
+        tile_scale=tile_scale,
+        throttle_s=0.0,
+    )
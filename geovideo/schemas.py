@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Literal, Optional
+from typing import Any, Dict, Literal, Optional, Tuple, Union
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -32,6 +32,20 @@ class Poi(Location):
     type: PoiType = "other"
 
 
+Rgba = Tuple[int, int, int, int]
+OverlayPosition = Literal["right", "top_left", "top_right", "bottom_left", "bottom_right", "center"]
+
+
+class VectorOverlayConfig(BaseModel):
+    path: str
+    roads: bool = True
+    buildings: bool = True
+    road_color: Rgba = (255, 210, 64, 200)
+    road_width: float = 4.0
+    building_fill: Rgba = (255, 255, 255, 40)
+    building_outline: Rgba = (255, 255, 255, 140)
+
+
 class StyleConfig(BaseModel):
     width: int = 1080
     height: int = 1920
@@ -42,7 +56,15 @@ class StyleConfig(BaseModel):
     show_connectors: bool = True
     show_polygon: bool = False
     polygon_points: Optional[list[Location]] = None
+    # GeoJSON file path or inline object; (Multi)Polygons with holes. Takes precedence over polygon_points.
+    polygon_geojson: Optional[Union[str, Dict[str, Any]]] = None
+    # PNG, APNG or GIF file, a directory of PNG frames, or a glob such as "frames/*.png".
     overlay_path: Optional[str] = None
+    overlay_position: Optional[OverlayPosition] = None
+    overlay_scale: float = 1.0
+    overlay_fps: float = 12.0
+    overlay_loop: bool = True
+    overlay_cache_dir: Optional[str] = ".cache/overlays"
     watermark_text: str = "© OpenStreetMap contributors"
     safe_margin_px: int = 80
     ui_preset: Literal["classic", "social_map"] = "classic"
@@ -52,6 +74,41 @@ class StyleConfig(BaseModel):
     social_account_label: str = "Account"
     social_zoom_factor: float = 1.0
     show_social_chrome: bool = True
+    render_scale: float = 1.0
+    vector_overlay: Optional[VectorOverlayConfig] = None
+
+    @field_validator("render_scale")
+    @classmethod
+    def _render_scale_range(cls, value: float) -> float:
+        if not 0 < value <= 1:
+            raise ValueError("render_scale must be in (0, 1]")
+        return value
+
+
+Ease = Literal["linear", "ease_in_out"]
+
+
+class CameraKeyframe(BaseModel):
+    """Camera at a point in time; fields left out carry over from the previous keyframe."""
+
+    time: float = Field(..., ge=0)
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
+    # Center on this POI (index into pois) instead of lat/lon.
+    focus_poi: Optional[int] = Field(None, ge=0)
+    zoom: Optional[float] = Field(None, ge=0, le=22)
+    # Degrees clockwise from north that point up on screen.
+    bearing: Optional[float] = None
+    # Easing of the move from the previous keyframe into this one.
+    ease: Ease = "ease_in_out"
+
+    @model_validator(mode="after")
+    def _validate_center(self) -> "CameraKeyframe":
+        if (self.lat is None) != (self.lon is None):
+            raise ValueError("camera keyframe needs both lat and lon")
+        if self.focus_poi is not None and self.lat is not None:
+            raise ValueError("camera keyframe takes either focus_poi or lat/lon")
+        return self
 
 
 class TimelineConfig(BaseModel):
@@ -59,9 +116,11 @@ class TimelineConfig(BaseModel):
     intro_delay: float = 0.5
     poi_stagger: float = 0.8
     ring_period: float = 1.6
-    ease: Literal["linear", "ease_in_out"] = "ease_in_out"
+    ease: Ease = "ease_in_out"
     camera_start_zoom: Optional[int] = None
     camera_end_zoom: Optional[int] = None
+    # When set, replaces the start/end zoom ramp with a keyframed camera track.
+    camera_keyframes: list[CameraKeyframe] = Field(default_factory=list)
 
 
 class OutputConfig(BaseModel):
@@ -70,6 +129,19 @@ class OutputConfig(BaseModel):
     bitrate: Optional[str] = None
     preset: str = "medium"
     faststart: bool = True
+    work_dir: str = ".cache/renders"
+    segment_seconds: float = 2.0
+    keep_segments: bool = False
+    # Finished renders keyed by content; None disables the output cache.
+    cache_dir: Optional[str] = ".cache/outputs"
+    cache_max_mb: float = 4096.0
+
+    @field_validator("segment_seconds")
+    @classmethod
+    def _segment_positive(cls, value: float) -> float:
+        if value <= 0:
+            raise ValueError("segment_seconds must be positive")
+        return value
 
 
 class AudioConfig(BaseModel):
@@ -78,18 +150,46 @@ class AudioConfig(BaseModel):
     music_volume: float = 0.5
     voiceover_volume: float = 1.0
     ducking_ratio: float = 0.35
+    ducking_threshold_db: float = -40.0
+    ducking_attack: float = 0.08
+    ducking_release: float = 0.4
     fade_in: float = 0.4
     fade_out: float = 0.6
+    sample_rate: int = 44100
+    cache_dir: Optional[str] = ".cache/audio"
+    cache_max_mb: float = 1024.0
 
 
 class ProviderConfig(BaseModel):
-    name: Literal["osm", "mapbox", "custom"] = "osm"
+    name: Literal["osm", "mapbox", "custom", "local_raster"] = "osm"
     api_key: Optional[str] = None
     url_template: Optional[str] = None
     user_agent: Optional[str] = None
     cache_dir: str = ".cache/tiles"
     max_retries: int = 3
     throttle_s: float = 0.1
+    # None uses the provider's largest supported size (512 for mapbox, 256 otherwise).
+    tile_size: Optional[Literal[256, 512]] = None
+    # 2 requests @2x (retina) tiles; custom templates place the suffix with {r}.
+    tile_scale: Literal[1, 2] = 1
+    # Templates serving the same tiles as url_template; requests are sharded across all of them.
+    mirrors: list[str] = Field(default_factory=list)
+    # Values for {s}; defaults to a, b, c.
+    subdomains: Optional[list[str]] = None
+    # Send a duplicate request to another mirror once one is slower than this latency percentile.
+    hedge_percentile: Optional[float] = Field(95.0, gt=0, le=100)
+    # Parallel tile downloads; None uses the provider's limit (2 for osm, per its usage policy, 8 otherwise).
+    max_connections: Optional[int] = Field(None, ge=1)
+    # Build missing tiles from cached ones at neighbouring zooms: "offline" when the network is
+    # unavailable, "always" before fetching, or "never". Derived tiles are replaced once fetched.
+    derive_tiles: Literal["never", "offline", "always"] = "offline"
+    # Zoom levels to look up for a cached tile to upscale when no children are cached; 0 disables.
+    upscale_parents: int = Field(0, ge=0, le=4)
+    # local_raster: a north-up GeoTIFF, .npy or raw uint8 raster, georeferenced by tags or a world file.
+    raster_path: Optional[str] = None
+    raster_crs: Literal["EPSG:3857", "EPSG:4326"] = "EPSG:3857"
+    # (height, width, bands) of a headerless raw raster.
+    raster_shape: Optional[Tuple[int, int, int]] = None
 
     @model_validator(mode="after")
     def _validate_provider(self) -> "ProviderConfig":
@@ -97,6 +197,10 @@ class ProviderConfig(BaseModel):
             raise ValueError("mapbox provider requires api_key")
         if self.name == "custom" and not self.url_template:
             raise ValueError("custom provider requires url_template")
+        if self.name == "osm" and (self.tile_size == 512 or self.tile_scale == 2):
+            raise ValueError("osm provider only serves 256px tiles")
+        if self.name == "local_raster" and not self.raster_path:
+            raise ValueError("local_raster provider requires raster_path")
         return self
 
 
@@ -114,4 +218,7 @@ class InputConfig(BaseModel):
     def _validate_pois(self) -> "InputConfig":
         if len(self.pois) > self.max_pois:
             raise ValueError("Too many POIs")
+        for keyframe in self.timeline.camera_keyframes:
+            if keyframe.focus_poi is not None and keyframe.focus_poi >= len(self.pois):
+                raise ValueError(f"camera keyframe focus_poi {keyframe.focus_poi} is out of range")
         return self
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import io
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from geovideo.geo import TILE_SIZE
+from geovideo.providers.synthetic import synthetic_tile_array
+
+ENCODED_TILE_CACHE = 512
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """How the stand-in server misbehaves; every draw comes from one seeded generator."""
+
+    # Median response latency and the sigma of its log-normal spread (0 = constant).
+    latency_ms: float = 0.0
+    latency_sigma: float = 0.0
+    # Share of requests answered 500, and 429 with Retry-After.
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after_s: int = 1
+    # Per-response body bandwidth; 0 is unlimited.
+    bandwidth_kbps: float = 0.0
+    seed: int = 0
+
+
+class TileServer:
+    """Synthetic XYZ tiles over local HTTP with injected latency, errors, 429s and bandwidth caps.
+
+    The last three path segments are z/x/y(.png), so prefixes stand in for subdomains or mirrors:
+    http://127.0.0.1:PORT/a/{z}/{x}/{y}.png and /b/... serve the same tiles.
+    """
+
+    def __init__(self, faults: FaultProfile = FaultProfile(), host: str = "127.0.0.1", port: int = 0) -> None:
+        self.faults = faults
+        self.statuses: Counter = Counter()
+        self._random = random.Random(faults.seed)
+        self._lock = threading.Lock()
+        self._tiles: "OrderedDict[Tuple[int, int, int, int], bytes]" = OrderedDict()
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url_template(self) -> str:
+        return f"{self.url}/{{z}}/{{x}}/{{y}}.png"
+
+    def start(self) -> "TileServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="geovideo-tileserver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def __enter__(self) -> "TileServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """Latency in seconds and an injected status (None for a normal 200) for one request."""
+        faults = self.faults
+        with self._lock:
+            latency = faults.latency_ms / 1000
+            if latency and faults.latency_sigma:
+                latency *= self._random.lognormvariate(0.0, faults.latency_sigma)
+            roll = self._random.random()
+        if roll < faults.throttle_rate:
+            return latency, 429
+        if roll < faults.throttle_rate + faults.error_rate:
+            return latency, 500
+        return latency, None
+
+    def tile_png(self, z: int, x: int, y: int, size: int) -> bytes:
+        key = (z, x, y, size)
+        with self._lock:
+            content = self._tiles.get(key)
+            if content is not None:
+                self._tiles.move_to_end(key)
+                return content
+        buffer = io.BytesIO()
+        Image.fromarray(synthetic_tile_array(z, x, y, size)).save(buffer, format="PNG")
+        content = buffer.getvalue()
+        with self._lock:
+            self._tiles[key] = content
+            if len(self._tiles) > ENCODED_TILE_CACHE:
+                self._tiles.popitem(last=False)
+        return content
+
+    def record(self, status: int) -> None:
+        with self._lock:
+            self.statuses[status] += 1
+
+
+def _handler(server: TileServer):
+    class TileHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            latency, status = server.draw()
+            if latency:
+                time.sleep(latency)
+            tile = _parse_tile(self.path)
+            if tile is None:
+                status = 404
+            if status is not None:
+                server.record(status)
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", str(server.faults.retry_after_s))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            z, x, y, size = tile
+            content = server.tile_png(z, x, y, size)
+            server.record(200)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self._send_body(content)
+
+        def _send_body(self, content: bytes) -> None:
+            kbps = server.faults.bandwidth_kbps
+            if not kbps:
+                self.wfile.write(content)
+                return
+            chunk = 4096
+            seconds_per_chunk = chunk * 8 / (kbps * 1000)
+            for offset in range(0, len(content), chunk):
+                self.wfile.write(content[offset : offset + chunk])
+                time.sleep(seconds_per_chunk)
+
+        def log_message(self, format: str, *args: object) -> None:
+            return None
+
+    return TileHandler
+
+
+def _parse_tile(path: str) -> Optional[Tuple[int, int, int, int]]:
+    """z, x, y and pixel size from .../z/x/y.png, .../z/x/y@2x.png or /512/z/x/y.png style paths."""
+    parts = path.split("?", 1)[0].strip("/").split("/")
+    if len(parts) < 3:
+        return None
+    name = parts[-1].rsplit(".", 1)[0]
+    scale = 2 if name.endswith("@2x") else 1
+    name = name.removesuffix("@2x")
+    size = int(parts[-4]) if len(parts) >= 4 and parts[-4] in ("256", "512") else TILE_SIZE
+    try:
+        return int(parts[-3]), int(parts[-2]), int(name), size * scale
+    except ValueError:
+        return None
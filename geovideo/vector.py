@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from geovideo.geometry import (
+    SIMPLIFY_TOLERANCE_PX,
+    bbox_intersects,
+    path_bboxes,
+    project_mercator,
+    simplify_mask,
+    world_scale,
+)
+from geovideo.osm_import import NodeIndex, WayStore, iter_elements
+from geovideo.schemas import VectorOverlayConfig
+
+ROAD = 0
+BUILDING = 1
+
+
+@dataclass(frozen=True)
+class PathSet:
+    """Polylines as one flat (n, 2) coordinate array, split by offsets, with a bbox per path."""
+
+    coords: np.ndarray
+    offsets: np.ndarray
+    kinds: np.ndarray
+    bboxes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def path(self, index: int) -> np.ndarray:
+        return self.coords[self.offsets[index] : self.offsets[index + 1]]
+
+
+@dataclass
+class VectorLayer:
+    paths: PathSet
+    _levels: Dict[int, PathSet] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def at_zoom(self, zoom: int) -> PathSet:
+        """Paths simplified to half a pixel at this zoom; sub-pixel paths are dropped. Computed once per zoom."""
+        level = self._levels.get(zoom)
+        if level is None:
+            level = self._levels[zoom] = _simplify(self.paths, SIMPLIFY_TOLERANCE_PX / world_scale(zoom))
+        return level
+
+    def visible(self, zoom: int, view: Tuple[float, float, float, float]) -> Tuple[PathSet, np.ndarray]:
+        level = self.at_zoom(zoom)
+        return level, np.flatnonzero(bbox_intersects(level.bboxes, view))
+
+
+def _simplify(paths: PathSet, tolerance: float) -> PathSet:
+    extent = np.maximum(paths.bboxes[:, 2] - paths.bboxes[:, 0], paths.bboxes[:, 3] - paths.bboxes[:, 1])
+    kept_coords = []
+    lengths = []
+    kinds = []
+    for index in np.flatnonzero(extent >= tolerance):
+        points = paths.path(index)
+        points = points[simplify_mask(points, tolerance)]
+        kept_coords.append(points)
+        lengths.append(len(points))
+        kinds.append(paths.kinds[index])
+    if not kept_coords:
+        return _empty_paths()
+    coords = np.concatenate(kept_coords)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    return PathSet(coords, offsets, np.asarray(kinds, dtype=np.uint8), path_bboxes(coords, offsets))
+
+
+def _empty_paths() -> PathSet:
+    return PathSet(np.empty((0, 2)), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.uint8), np.empty((0, 4)))
+
+
+def load_vector_layer(path: Path, roads: bool = True, buildings: bool = True) -> VectorLayer:
+    """Collect highway and building ways from an Overpass export into flat mercator arrays."""
+    nodes = NodeIndex()
+    ways = WayStore()
+    kinds = []
+    for element in iter_elements(path):
+        kind = element.get("type")
+        if kind == "node":
+            nodes.add(element["id"], element["lat"], element["lon"])
+        elif kind == "way" and len(element.get("nodes", ())) >= 2:
+            tags = element.get("tags") or {}
+            if roads and "highway" in tags:
+                kinds.append(ROAD)
+            elif buildings and "building" in tags:
+                kinds.append(BUILDING)
+            else:
+                continue
+            ways.add(element["id"], element["nodes"], {})
+
+    if not len(ways):
+        return VectorLayer(_empty_paths())
+    latlon, found = nodes.resolve(np.frombuffer(ways.refs, dtype=np.int64))
+    lengths = np.diff(np.asarray(ways.offsets, dtype=np.int64))
+    way_of_point = np.repeat(np.arange(len(ways)), lengths)
+    resolved = np.bincount(way_of_point[found], minlength=len(ways))
+    valid = resolved >= 2
+    keep = found & valid[way_of_point]
+    coords = project_mercator(latlon[keep, 0], latlon[keep, 1])
+    offsets = np.concatenate([[0], np.cumsum(resolved[valid])])
+    paths = PathSet(coords, offsets, np.asarray(kinds, dtype=np.uint8)[valid], path_bboxes(coords, offsets))
+    return VectorLayer(paths)
+
+
+def render_vector_layer(
+    layer: VectorLayer,
+    style: VectorOverlayConfig,
+    zoom: int,
+    origin: Tuple[float, float],
+    pixels_per_unit: float,
+    size: Tuple[int, int],
+    line_scale: float = 1.0,
+) -> Image.Image:
+    """Rasterize the paths in view to a transparent RGBA image.
+
+    origin is the normalized mercator coordinate of the top-left pixel and pixels_per_unit maps
+    normalized units to output pixels, so callers can fold render scale and zoom crops into it.
+    """
+    width, height = size
+    image = Image.new("RGBA", size, (0, 0, 0, 0))
+    road_width = max(int(round(style.road_width * line_scale)), 1)
+    pad = road_width / pixels_per_unit
+    view = (
+        origin[0] - pad,
+        origin[1] - pad,
+        origin[0] + width / pixels_per_unit + pad,
+        origin[1] + height / pixels_per_unit + pad,
+    )
+    level, indices = layer.visible(zoom, view)
+    if not len(indices):
+        return image
+    draw = ImageDraw.Draw(image)
+    origin_arr = np.asarray(origin)
+    outline_width = max(int(round(line_scale)), 1)
+    # Buildings underneath roads, each group in one pass.
+    for kind in (BUILDING, ROAD):
+        for index in indices[level.kinds[indices] == kind]:
+            points = ((level.path(index) - origin_arr) * pixels_per_unit).ravel().tolist()
+            if kind == ROAD:
+                draw.line(points, fill=style.road_color, width=road_width, joint="curve")
+            elif len(points) >= 6:
+                draw.polygon(points, fill=style.building_fill, outline=style.building_outline, width=outline_width)
+    return image
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from geovideo.camera import CameraState
+from geovideo.compositor import Compositor, FrameContext
+from geovideo.providers.synthetic import SyntheticTileProvider
+from geovideo.schemas import InputConfig
+
+REFERENCE_BACKEND = "pil"
+DEFAULT_MAX_MEAN_DIFF = 0.1
+DEFAULT_MIN_SSIM = 0.999
+# Whole-frame averages hide a small misdrawn element; any single pixel this far off fails the frame.
+DEFAULT_MAX_DIFF = 8
+
+
+def ssim(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean structural similarity of two BGR frames on luma, with the usual 11px Gaussian window."""
+    x = cv2.cvtColor(a, cv2.COLOR_BGR2GRAY).astype(np.float64)
+    y = cv2.cvtColor(b, cv2.COLOR_BGR2GRAY).astype(np.float64)
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+
+    def blur(image: np.ndarray) -> np.ndarray:
+        return cv2.GaussianBlur(image, (11, 11), 1.5)
+
+    mu_x, mu_y = blur(x), blur(y)
+    var_x = blur(x * x) - mu_x**2
+    var_y = blur(y * y) - mu_y**2
+    cov = blur(x * y) - mu_x * mu_y
+    index = ((2 * mu_x * mu_y + c1) * (2 * cov + c2)) / ((mu_x**2 + mu_y**2 + c1) * (var_x + var_y + c2))
+    return float(index.mean())
+
+
+@dataclass(frozen=True)
+class FrameDiff:
+    time_s: float
+    max_diff: int
+    mean_diff: float
+    ssim: float
+
+    def passes(self, max_mean_diff: float, min_ssim: float, max_diff: Optional[int] = None) -> bool:
+        if max_diff is not None and self.max_diff > max_diff:
+            return False
+        return self.mean_diff <= max_mean_diff and self.ssim >= min_ssim
+
+
+@dataclass
+class VerifyReport:
+    backend: str
+    max_mean_diff: float = DEFAULT_MAX_MEAN_DIFF
+    min_ssim: float = DEFAULT_MIN_SSIM
+    max_diff: Optional[int] = DEFAULT_MAX_DIFF
+    frames: List[FrameDiff] = field(default_factory=list)
+
+    @property
+    def failures(self) -> List[FrameDiff]:
+        return [frame for frame in self.frames if not frame.passes(self.max_mean_diff, self.min_ssim, self.max_diff)]
+
+    def describe(self) -> List[str]:
+        lines = [
+            f"{frame.time_s:7.2f}s  max {frame.max_diff:3d}  mean {frame.mean_diff:7.4f}  ssim {frame.ssim:.5f}"
+            + ("" if frame.passes(self.max_mean_diff, self.min_ssim, self.max_diff) else "  FAIL")
+            for frame in self.frames
+        ]
+        limit = f"mean <= {self.max_mean_diff}, ssim >= {self.min_ssim}"
+        if self.max_diff is not None:
+            limit += f", max <= {self.max_diff}"
+        lines.append(
+            f"{self.backend} vs {REFERENCE_BACKEND}: {len(self.frames) - len(self.failures)}/{len(self.frames)} "
+            f"frames within {limit}"
+        )
+        return lines
+
+
+def verify_backend(
+    config: InputConfig,
+    camera: CameraState,
+    times: Sequence[float],
+    backend: str = "numpy",
+    max_mean_diff: float = DEFAULT_MAX_MEAN_DIFF,
+    min_ssim: float = DEFAULT_MIN_SSIM,
+    max_diff: Optional[int] = DEFAULT_MAX_DIFF,
+    out_dir: Optional[Path] = None,
+) -> VerifyReport:
+    """Render times through the reference backend and `backend` from the same synthetic tiles and compare.
+
+    With out_dir, failing frames are written there as reference, candidate and amplified diff images.
+    """
+    provider = SyntheticTileProvider(tile_size=config.provider.tile_size or 256, tile_scale=config.provider.tile_scale)
+    reference = Compositor(config, provider, backend=REFERENCE_BACKEND)
+    candidate = Compositor(config, provider, backend=backend)
+    report = VerifyReport(backend=backend, max_mean_diff=max_mean_diff, min_ssim=min_ssim, max_diff=max_diff)
+    for t in times:
+        context = FrameContext(time_s=t, camera=camera)
+        expected = reference.render_frame(context)
+        actual = candidate.render_frame(context)
+        diff = cv2.absdiff(expected, actual)
+        frame = FrameDiff(time_s=t, max_diff=int(diff.max()), mean_diff=float(diff.mean()), ssim=ssim(expected, actual))
+        report.frames.append(frame)
+        if out_dir is not None and not frame.passes(max_mean_diff, min_ssim, max_diff):
+            out_dir.mkdir(parents=True, exist_ok=True)
+            stem = out_dir / f"{t:07.2f}s"
+            cv2.imwrite(f"{stem}-reference.png", expected)
+            cv2.imwrite(f"{stem}-{backend}.png", actual)
+            cv2.imwrite(f"{stem}-diff.png", np.clip(diff.astype(np.uint16) * 8, 0, 255).astype(np.uint8))
+    return report
@@ -0,0 +1,19 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from geovideo.benchmark import compare_to_baseline, default_cases, load_baseline, run_benchmark
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("GEOVIDEO_BENCH"), reason="set GEOVIDEO_BENCH=1 to run render benchmarks"
+)
+
+
+def test_render_throughput_against_baseline():
+    tolerance = float(os.getenv("GEOVIDEO_BENCH_TOLERANCE", "0.25"))
+    results = run_benchmark(default_cases(quick=True), frames=20)
+    regressions = compare_to_baseline(results, load_baseline(BASELINE), tolerance)
+    assert not regressions, "\n".join(regressions)
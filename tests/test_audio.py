@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+
+from geovideo.audio import (
+    AudioTracks,
+    decode_audio,
+    decode_cached,
+    ducking_envelope,
+    fade_envelope,
+    load_audio,
+    mix_audio,
+    write_wav,
+)
+from geovideo import audio_cache
+from geovideo.audio_cache import AudioCache
+from geovideo.schemas import AudioConfig
+
+SR = 8000
+
+
+def _voice(seconds: float, start: float, end: float) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    mono = np.where((t >= start) & (t < end), 0.5 * np.sin(2 * np.pi * 300 * t), 0.0).astype(np.float32)
+    return np.stack([mono, mono], axis=1)
+
+
+def test_ducking_only_while_voice_speaks():
+    config = AudioConfig(ducking_ratio=0.3, ducking_attack=0.1, ducking_release=0.5)
+    gain = ducking_envelope(_voice(4.0, 1.0, 2.0), SR, config)
+    assert gain[int(0.5 * SR)] == 1.0
+    assert np.allclose(gain[int(1.05 * SR) : int(1.95 * SR)], 0.3, atol=1e-3)
+    assert 0.3 < gain[int(2.25 * SR)] < 1.0
+    assert gain[int(3.0 * SR)] == 1.0
+    assert 0.3 < gain[int(0.95 * SR)] < 1.0
+
+
+def test_fade_envelope_and_mix_length():
+    fade = fade_envelope(SR, SR, fade_in=0.25, fade_out=0.25)
+    assert fade[0] == 0.0 and fade[SR // 2] == 1.0 and fade[-1] == 0.0
+    music = np.full((SR * 2, 2), 0.2, dtype=np.float32)
+    mix = mix_audio(AudioTracks(music=music, voiceover=_voice(1.0, 0.0, 1.0), sample_rate=SR), AudioConfig())
+    assert mix.shape == (SR * 2, 2)
+    assert np.isclose(mix[int(1.8 * SR), 0], 0.2)
+
+
+def test_wav_roundtrip(tmp_path):
+    path = tmp_path / "tone.wav"
+    write_wav(path, _voice(0.5, 0.0, 0.5), SR)
+    decoded = decode_audio(str(path), SR)
+    assert decoded.shape == (SR // 2, 2)
+    assert np.abs(decoded - _voice(0.5, 0.0, 0.5)).max() < 1e-3
+
+
+def test_decoded_audio_cache_reuses_and_evicts(tmp_path):
+    source = tmp_path / "tone.wav"
+    write_wav(source, _voice(1.0, 0.0, 1.0), SR)
+    cache = AudioCache(tmp_path / "cache", max_bytes=10**9)
+    first = decode_cached(str(source), SR, 0.5, cache)
+    key = cache.key(str(source), SR, 2)
+    assert cache.path(key).exists()
+    assert cache.load(key).shape == (SR, 2)
+    assert np.array_equal(first, decode_cached(str(source), SR, 0.5, cache))
+
+    cache.store("other", np.zeros((SR, 2), dtype=np.float32))
+    cache.max_bytes = 1
+    cache.evict(keep="other")
+    assert not cache.path(key).exists()
+    assert cache.path("other").exists()
+
+
+def test_source_digests_are_memoized_across_loads(tmp_path, monkeypatch):
+    source = tmp_path / "music.wav"
+    write_wav(source, _voice(0.5, 0.0, 0.5), SR)
+    hashed = []
+    monkeypatch.setattr(audio_cache, "file_digest", lambda path: hashed.append(path) or f"digest{len(hashed)}")
+    config = AudioConfig(music_path=str(source), sample_rate=SR, cache_dir=str(tmp_path / "cache"))
+    load_audio(config, 0.5)
+    load_audio(config, 0.5)
+    assert len(hashed) == 1
+    write_wav(source, _voice(0.5, 0.0, 0.25), SR)
+    os.utime(source, ns=(1, 1))
+    load_audio(config, 0.5)
+    assert len(hashed) == 2
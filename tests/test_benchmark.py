@@ -0,0 +1,19 @@
+from geovideo.benchmark import BenchCase, BenchResult, build_case_config, compare_to_baseline, run_case
+
+
+def test_build_case_config_matches_case():
+    case = BenchCase("social_map", 540, 960, poi_count=30, polygon_vertices=64)
+    config = build_case_config(case)
+    assert len(config.pois) == 30
+    assert len(config.style.polygon_points) == 64
+    assert config.style.ui_preset == "social_map"
+
+
+def test_run_case_offline_and_compare():
+    case = BenchCase("classic", 270, 480, poi_count=2, polygon_vertices=4)
+    result = run_case(case, frames=2, repeats=1)
+    assert result.fps > 0
+    baseline = {case.name: {"fps": result.fps * 10, "peak_mem_mb": result.peak_mem_mb}}
+    regressions = compare_to_baseline({case.name: result}, baseline, tolerance=0.25)
+    assert len(regressions) == 1 and "fps" in regressions[0]
+    assert not compare_to_baseline({case.name: BenchResult(1.0, 1.0, 1.0)}, {}, tolerance=0.25)
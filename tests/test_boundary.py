@@ -0,0 +1,78 @@
+import numpy as np
+
+from geovideo.boundary import load_geojson, render_boundary
+from geovideo.camera import CameraState
+from geovideo.compositor import Compositor, FrameContext
+from geovideo.geometry import clip_ring, project_mercator, world_scale
+from geovideo.profiling import Profiler
+from geovideo.providers.synthetic import SyntheticTileProvider
+from geovideo.schemas import InputConfig
+
+
+def _square(lon, lat, size):
+    return [[lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]
+
+
+MULTIPOLYGON = {
+    "type": "Feature",
+    "geometry": {
+        "type": "MultiPolygon",
+        "coordinates": [
+            [_square(105.800, 21.025, 0.008), _square(105.803, 21.028, 0.002)],
+            [_square(105.812, 21.025, 0.002)],
+        ],
+    },
+}
+
+
+def test_clip_ring_to_rectangle():
+    square = np.array([[-5.0, -5.0], [5.0, -5.0], [5.0, 5.0], [-5.0, 5.0]])
+    clipped = clip_ring(square, (0.0, 0.0, 10.0, 10.0))
+    assert sorted(map(tuple, clipped.tolist())) == [(0.0, 0.0), (0.0, 5.0), (5.0, 0.0), (5.0, 5.0)]
+    assert len(clip_ring(square, (20.0, 20.0, 30.0, 30.0))) == 0
+
+
+def test_load_geojson_multipolygon_with_hole():
+    boundary = load_geojson(MULTIPOLYGON)
+    assert len(boundary.outers) == 2 and len(boundary.holes) == 1
+    assert boundary.vertex_count == 12
+
+
+def test_render_boundary_cuts_holes_and_antialiases():
+    boundary = load_geojson(MULTIPOLYGON)
+    zoom = 16
+    scale = world_scale(zoom)
+    center = project_mercator(21.029, 105.804)[0]
+    origin = (center[0] - 200 / scale, center[1] - 200 / scale)
+    patch, (x0, y0) = render_boundary(boundary, zoom, origin, scale, (400, 400), (0, 0, 255, 200), (255, 0, 0, 255), 2)
+    alpha = np.asarray(patch)[..., 3]
+    hole = ((project_mercator(21.029, 105.804)[0] - origin) * scale).astype(int)
+    assert alpha[hole[1] - y0, hole[0] - x0] == 0
+    inside = ((project_mercator(21.026, 105.801)[0] - origin) * scale).astype(int)
+    assert alpha[inside[1] - y0, inside[0] - x0] == 200
+    # Supersampled edges produce partial coverage values.
+    assert ((alpha > 0) & (alpha < 200)).any()
+
+
+def test_large_boundary_is_clipped_and_drawn_once_per_camera():
+    # A ring far larger than the viewport with thousands of vertices.
+    angles = np.linspace(0, 2 * np.pi, 5000, endpoint=False)
+    ring = np.column_stack([105.8 + 0.5 * np.cos(angles), 21.03 + 0.5 * np.sin(angles)]).tolist()
+    config = InputConfig.model_validate(
+        {
+            "center": {"name": "Center", "lat": 21.03, "lon": 105.8},
+            "style": {
+                "width": 270,
+                "height": 480,
+                "show_polygon": True,
+                "polygon_geojson": {"type": "Polygon", "coordinates": [ring]},
+            },
+            "timeline": {"duration": 2.0, "camera_start_zoom": 15, "camera_end_zoom": 15},
+        }
+    )
+    profiler = Profiler()
+    compositor = Compositor(config, SyntheticTileProvider(), profiler=profiler)
+    camera = CameraState(center_lat=21.03, center_lon=105.8, zoom=15)
+    for t in (0.0, 0.5, 1.0):
+        compositor.render_frame(FrameContext(time_s=t, camera=camera))
+    assert profiler.summary()["stages"]["draw_polygon"]["count"] == 1
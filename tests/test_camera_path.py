@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+from typing import Set, Tuple
+
+import numpy as np
+from PIL import Image
+
+from geovideo.camera import CameraState
+from geovideo.camera_path import compile_camera_path
+from geovideo.compositor import LABEL_CACHE_SIZE, Compositor, FrameContext
+from geovideo.profiling import Profiler
+from geovideo.providers.synthetic import SyntheticTileProvider
+from geovideo.schemas import InputConfig
+from geovideo.timeline import camera_zoom_at
+
+BASE = CameraState(center_lat=21.0285, center_lon=105.8045, zoom=15)
+
+
+def _config(timeline, pois=()):
+    return InputConfig.model_validate(
+        {
+            "center": {"name": "Center", "lat": 21.0285, "lon": 105.8045},
+            "pois": [{"name": f"P{index}", "lat": lat, "lon": lon} for index, (lat, lon) in enumerate(pois)],
+            "style": {"width": 270, "height": 480, "fps": 10},
+            "timeline": {"duration": 2.0, **timeline},
+        }
+    )
+
+
+def test_legacy_zoom_ramp_compiles_to_the_same_curve():
+    config = _config({"camera_start_zoom": 13, "camera_end_zoom": 16})
+    path = compile_camera_path(config, BASE)
+    assert len(path) == 20
+    expected = [camera_zoom_at(index / 10, config.timeline, BASE.zoom) for index in range(20)]
+    assert np.array_equal(path.zoom, expected)
+    assert np.all(path.lat == BASE.center_lat) and np.all(path.bearing == 0)
+
+
+def test_keyframes_hold_ease_focus_and_turn_the_short_way():
+    config = _config(
+        {
+            "camera_keyframes": [
+                {"time": 0.5, "zoom": 14, "bearing": 350},
+                {"time": 1.5, "focus_poi": 0, "zoom": 16, "bearing": 10, "ease": "linear"},
+            ]
+        },
+        pois=[(21.04, 105.82)],
+    )
+    path = compile_camera_path(config, BASE)
+    # Held before the first keyframe and after the last one.
+    assert path.state(0) == CameraState(BASE.center_lat, BASE.center_lon, 14, 350.0)
+    assert path.state(19) == CameraState(21.04, 105.82, 16, 10.0)
+    assert path.zoom[10] == 15.0
+    assert path.lon[10] == (BASE.center_lon + 105.82) / 2
+    assert abs(path.bearing[10]) < 1e-9 or abs(path.bearing[10] - 360) < 1e-9
+
+
+@dataclass
+class RecordingProvider(SyntheticTileProvider):
+    requested: Set[Tuple[int, int, int]] = field(default_factory=set)
+
+    def get_tile(self, z: int, x: int, y: int, derive: bool = True) -> Image.Image:
+        self.requested.add((z, x, y))
+        return super().get_tile(z, x, y, derive=derive)
+
+
+def test_path_tiles_match_what_the_render_requests():
+    config = _config(
+        {
+            "camera_keyframes": [
+                {"time": 0.0, "zoom": 15},
+                {"time": 2.0, "lat": 21.035, "lon": 105.815, "zoom": 16, "bearing": 30},
+            ]
+        }
+    )
+    provider = RecordingProvider()
+    compositor = Compositor(config, provider)
+    expected = compositor.path_tiles(BASE)
+    for index in range(20):
+        compositor.render_frame(FrameContext(time_s=index / 10, camera=BASE))
+    assert provider.requested == expected
+
+
+def test_bearing_turns_markers_with_the_map():
+    config = _config({"camera_keyframes": [{"time": 0.0, "zoom": 15, "bearing": 90}]})
+    compositor = Compositor(config, SyntheticTileProvider())
+    camera = compositor.camera_path(BASE).state(0)
+    # With east up, a point east of the center sits straight above it.
+    x, y = compositor._to_screen(BASE.center_lat, BASE.center_lon + 0.005, camera)
+    assert abs(x - 135) < 1e-6 and y < 240
+
+
+def test_moving_camera_keeps_label_cache_bounded():
+    config = _config(
+        {"camera_keyframes": [{"time": 0.0, "zoom": 15}, {"time": 2.0, "lat": 21.035, "lon": 105.815, "zoom": 16}]},
+        pois=[(21.03, 105.806)],
+    )
+    compositor = Compositor(config, SyntheticTileProvider())
+    for index in range(20):
+        compositor.render_frame(FrameContext(time_s=index / 10, camera=BASE))
+    assert len(compositor._label_cache) == LABEL_CACHE_SIZE
+
+
+def test_moving_camera_frames_skip_static_layers_and_match_pil():
+    config = _config(
+        {"camera_keyframes": [{"time": 0.0, "zoom": 15}, {"time": 2.0, "lat": 21.035, "lon": 105.815, "zoom": 16}]},
+        pois=[(21.03, 105.806)],
+    )
+    profiler = Profiler()
+    compositor = Compositor(config, SyntheticTileProvider(), profiler=profiler)
+    reference = Compositor(config, SyntheticTileProvider(), backend="pil")
+    out = compositor.canvas.allocate()
+    for index in range(6):
+        ctx = FrameContext(time_s=index / 5, camera=BASE)
+        assert compositor.render_frame(ctx, out=out) is out
+        assert np.array_equal(out, reference.render_frame(ctx))
+    assert profiler.counters["static_frame_builds"] == 1
+    assert profiler.counters["direct_frames"] == 5
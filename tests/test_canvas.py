@@ -0,0 +1,96 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from geovideo.camera import CameraState
+from geovideo.canvas import blend_mask, blend_rgba
+from geovideo.compositor import Compositor, FrameContext
+from geovideo.draw import ring_mask
+from geovideo.profiling import Profiler
+from geovideo.providers.synthetic import SyntheticTileProvider
+from geovideo.schemas import InputConfig
+
+
+def _background():
+    rng = np.random.default_rng(3)
+    return rng.integers(0, 256, size=(40, 60, 3), dtype=np.uint8)
+
+
+def test_blend_mask_matches_pil_bitmap():
+    background = _background()
+    mask = ring_mask(12, 170, width=3)
+    image = Image.fromarray(background).convert("RGBA")
+    ImageDraw.Draw(image).bitmap((-5, 20), mask, fill=(255, 255, 255))
+    frame = background.copy()
+    # Partly off the left and bottom edges.
+    blend_mask(frame, np.asarray(mask), (255, 255, 255), -5, 20)
+    assert np.array_equal(frame, np.asarray(image.convert("RGB")))
+
+
+def test_blend_rgba_matches_pil_paste_into_bgr():
+    background = _background()
+    rng = np.random.default_rng(4)
+    sprite = rng.integers(0, 256, size=(16, 16, 4), dtype=np.uint8)
+    image = Image.fromarray(background)
+    image.paste(Image.fromarray(sprite), (50, 4), Image.fromarray(sprite))
+    frame = np.ascontiguousarray(background[..., ::-1])
+    blend_rgba(frame, sprite, 50, 4, swap_rb=True)
+    assert np.array_equal(frame[..., ::-1], np.asarray(image))
+
+
+def _compositor(backend, profiler=None, **style):
+    config = InputConfig.model_validate(
+        {
+            "center": {"name": "Center", "lat": 21.0285, "lon": 105.8045},
+            "pois": [{"name": "Market", "lat": 21.0295, "lon": 105.8055, "type": "market"}],
+            "style": {"width": 270, "height": 480, **style},
+            "timeline": {"duration": 2.0, "camera_start_zoom": 16, "camera_end_zoom": 16},
+        }
+    )
+    return Compositor(config, SyntheticTileProvider(), profiler=profiler or Profiler(), backend=backend)
+
+
+def test_numpy_backend_reuses_static_layers_and_one_buffer():
+    profiler = Profiler()
+    compositor = _compositor("numpy", profiler)
+    camera = CameraState(center_lat=21.0285, center_lon=105.8045, zoom=16)
+    out = compositor.canvas.allocate()
+    times = [index / 10 for index in range(10)]
+    for t in times:
+        assert compositor.render_frame(FrameContext(time_s=t, camera=camera), out=out) is out
+    # One allocation up front, then exactly one full-frame copy per frame.
+    assert compositor.canvas.copies == 1 + len(times)
+    assert profiler.counters["static_frame_builds"] == 1
+
+
+def test_numpy_backend_matches_pil_reference(tmp_path):
+    camera = CameraState(center_lat=21.0285, center_lon=105.8045, zoom=16)
+    # A half-transparent overlay under the bottom-right attribution.
+    overlay = tmp_path / "overlay.png"
+    Image.new("RGBA", (200, 60), (200, 40, 40, 128)).save(overlay)
+    overlay_style = {"overlay_path": str(overlay), "overlay_position": "bottom_right", "overlay_cache_dir": None}
+    for style in ({}, overlay_style):
+        numpy_comp, pil_comp = _compositor("numpy", **style), _compositor("pil", **style)
+        for t in (0.2, 1.1):
+            ctx = FrameContext(time_s=t, camera=camera)
+            assert np.array_equal(numpy_comp.render_frame(ctx), pil_comp.render_frame(ctx))
+
+
+def test_ring_layers_are_kept_only_around_the_ring():
+    # The POI sits near the right edge, so the ring's box is clipped by the frame.
+    config = InputConfig.model_validate(
+        {
+            "center": {"name": "Center", "lat": 21.0285, "lon": 105.8045},
+            "pois": [{"name": "Edge", "lat": 21.0285, "lon": 105.8062, "type": "market"}],
+            "style": {"width": 270, "height": 480},
+            "timeline": {"duration": 2.0, "camera_start_zoom": 16, "camera_end_zoom": 16},
+        }
+    )
+    numpy_comp = Compositor(config, SyntheticTileProvider())
+    pil_comp = Compositor(config, SyntheticTileProvider(), backend="pil")
+    camera = CameraState(center_lat=21.0285, center_lon=105.8045, zoom=16)
+    for t in (0.2, 0.7, 1.1, 1.6):
+        ctx = FrameContext(time_s=t, camera=camera)
+        assert np.array_equal(numpy_comp.render_frame(ctx), pil_comp.render_frame(ctx))
+    (static,) = numpy_comp._static_cache.values()
+    assert static.under.shape == static.over_black.shape == static.over_gain.shape == (130, 120, 3)
+    assert static.ring_origin == (150, 176)
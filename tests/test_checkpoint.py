@@ -0,0 +1,98 @@
+import os
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from geovideo.audio import write_wav
+from geovideo.checkpoint import RenderCheckpoint, audio_digest, config_digest, plan_segments
+from geovideo.cli import _render_video
+from geovideo.compositor import Compositor
+from geovideo.schemas import InputConfig
+
+
+def test_plan_segments_covers_all_frames():
+    segments = plan_segments(duration=5.0, fps=30, segment_seconds=2.0)
+    assert [segment.frame_count for segment in segments] == [60, 60, 30]
+    assert segments[-1].start_frame == 120
+
+
+def test_config_digest_ignores_output_location():
+    config = InputConfig.model_validate({"center": {"name": "C", "lat": 21.0, "lon": 105.8}})
+    moved = config.model_copy(deep=True)
+    moved.output.path = "elsewhere.mp4"
+    changed = config.model_copy(deep=True)
+    changed.style.fps = 24
+    assert config_digest(config, 1, "all") == config_digest(moved, 1, "all")
+    assert config_digest(config, 1, "all") != config_digest(changed, 1, "all")
+    assert config_digest(config, 1, "all") != config_digest(config, 2, "all")
+
+
+def _render_config(tmp_path, **audio):
+    return InputConfig.model_validate(
+        {
+            "center": {"name": "Center", "lat": 21.0285, "lon": 105.8045},
+            "style": {"width": 96, "height": 160, "fps": 5},
+            "timeline": {"duration": 1.2},
+            "provider": {"cache_dir": str(tmp_path / "tiles")},
+            "audio": {"sample_rate": 8000, "cache_dir": str(tmp_path / "audio"), **audio},
+            "output": {
+                "path": str(tmp_path / "out.mp4"),
+                "work_dir": str(tmp_path / "work"),
+                "segment_seconds": 0.4,
+                "keep_segments": True,
+            },
+        }
+    )
+
+
+def _checkpoint(config):
+    segments = plan_segments(config.timeline.duration, config.style.fps, config.output.segment_seconds)
+    return RenderCheckpoint(Path(config.output.work_dir) / config_digest(config, None, "all"), segments)
+
+
+def test_interrupted_render_resumes_after_the_finished_segments(tmp_path, monkeypatch):
+    monkeypatch.setenv("GEOVIDEO_OFFLINE", "1")
+    config = _render_config(tmp_path)
+    render_frame = Compositor.render_frame
+    rendered = []
+    crash_at = [2]
+
+    def interrupt_in_second_segment(self, ctx, out=None):
+        rendered.append(round(ctx.time_s * config.style.fps))
+        if rendered[-1] in crash_at:
+            raise RuntimeError("render killed")
+        return render_frame(self, ctx, out=out)
+
+    monkeypatch.setattr(Compositor, "render_frame", interrupt_in_second_segment)
+    with pytest.raises(RuntimeError, match="render killed"):
+        _render_video(config, None, "all", verbose=False, use_cache=False)
+    checkpoint = _checkpoint(config)
+    assert [segment.index for segment in checkpoint.pending()] == [1, 2]
+
+    rendered.clear()
+    crash_at.clear()
+    _render_video(config, None, "all", verbose=False, use_cache=False)
+    assert rendered == [2, 3, 4, 5]
+    assert checkpoint.pending() == []
+    assert Path(config.output.path).stat().st_size > 0
+
+
+def test_editing_the_audio_file_in_place_remixes_on_resume(tmp_path, monkeypatch):
+    monkeypatch.setenv("GEOVIDEO_OFFLINE", "1")
+    music = tmp_path / "music.wav"
+    write_wav(music, np.full((8000, 2), 0.1, dtype=np.float32), 8000)
+    config = _render_config(tmp_path, music_path=str(music), fade_in=0.0, fade_out=0.0)
+    _render_video(config, None, "all", verbose=False, use_cache=False)
+    first = audio_digest(config.audio)
+    write_wav(music, np.full((8000, 2), -0.2, dtype=np.float32), 8000)
+    os.utime(music, ns=(1, 1))
+    assert audio_digest(config.audio) != first
+
+    _render_video(config, None, "all", verbose=False, use_cache=False)
+    mixes = sorted(_checkpoint(config).work_dir.glob("audio.*.wav"))
+    assert [path.name for path in mixes] == [f"audio.{audio_digest(config.audio)}.wav"]
+    with wave.open(str(mixes[0])) as mix:
+        samples = np.frombuffer(mix.readframes(mix.getnframes()), dtype=np.int16)
+    assert samples[:100].mean() < 0
@@ -0,0 +1,102 @@
+import io
+from dataclasses import dataclass, field
+from typing import List
+
+from PIL import Image
+
+from geovideo.prefetch import prefetch_tiles
+from geovideo.providers.base import TileProvider
+from geovideo.providers.derive import derived_path
+from geovideo.providers.synthetic import SyntheticTileProvider
+
+COLORS = [(200, 0, 0), (0, 200, 0), (0, 0, 200), (200, 200, 0)]
+
+
+def _png(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (256, 256), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@dataclass
+class CountingProvider(TileProvider):
+    name: str = "counting"
+    url_template: str = "https://tiles.test/{z}/{x}/{y}.png"
+    attribution: str = ""
+    throttle_s: float = 0.0
+    downloads: List[str] = field(default_factory=list)
+
+    def _download(self, url: str) -> bytes:
+        self.downloads.append(url)
+        return _png((10, 20, 30))
+
+
+def _cache(provider, z, x, y, color):
+    provider.tile_cache.write(provider._cache_path(z, x, y), _png(color))
+
+
+def _cache_children(provider, z, x, y):
+    for index, color in enumerate(COLORS):
+        _cache(provider, z + 1, 2 * x + index % 2, 2 * y + index // 2, color)
+
+
+def test_offline_tile_is_downsampled_from_cached_children(tmp_path, monkeypatch):
+    monkeypatch.setenv("GEOVIDEO_OFFLINE", "1")
+    provider = CountingProvider(cache_dir=tmp_path, tile_log={})
+    _cache_children(provider, 10, 5, 6)
+    tile = provider.get_tile(10, 5, 6)
+    assert [tile.getpixel(point) for point in ((64, 64), (192, 64), (64, 192), (192, 192))] == COLORS
+    assert provider.tile_log[(10, 5, 6)] == "derived"
+    assert derived_path(provider._cache_path(10, 5, 6)).exists()
+    assert not provider._cache_path(10, 5, 6).exists()
+    # Two levels up, from the sixteen grandchildren.
+    for x in (4, 5):
+        for y in (6, 7):
+            _cache_children(provider, 10, x, y)
+    assert provider.get_tile(9, 2, 3).getpixel((32, 32)) == COLORS[0]
+
+
+def test_parent_is_upscaled_only_when_configured(tmp_path, monkeypatch):
+    monkeypatch.setenv("GEOVIDEO_OFFLINE", "1")
+    provider = CountingProvider(cache_dir=tmp_path)
+    parent = Image.new("RGB", (256, 256), COLORS[0])
+    parent.paste(COLORS[3], (128, 128, 256, 256))
+    buffer = io.BytesIO()
+    parent.save(buffer, format="PNG")
+    provider.tile_cache.write(provider._cache_path(9, 2, 3), buffer.getvalue())
+    assert provider.get_tile(10, 5, 7).getpixel((128, 128)) == (230, 233, 238)
+    provider.upscale_parents = 1
+    assert provider.get_tile(10, 5, 7).getpixel((128, 128)) == COLORS[3]
+    # Blurry stand-ins are not stored.
+    assert not derived_path(provider._cache_path(10, 5, 7)).exists()
+
+
+def test_derived_tiles_are_replaced_once_online(tmp_path, monkeypatch):
+    monkeypatch.setenv("GEOVIDEO_OFFLINE", "1")
+    provider = CountingProvider(cache_dir=tmp_path)
+    _cache_children(provider, 10, 5, 6)
+    provider.get_tile(10, 5, 6)
+    monkeypatch.delenv("GEOVIDEO_OFFLINE", raising=False)
+    assert provider.get_tile(10, 5, 6).getpixel((0, 0)) == (10, 20, 30)
+    assert len(provider.downloads) == 1
+    assert provider._cache_path(10, 5, 6).exists()
+    assert not derived_path(provider._cache_path(10, 5, 6)).exists()
+
+
+def test_always_derives_before_fetching(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEOVIDEO_OFFLINE", raising=False)
+    provider = CountingProvider(cache_dir=tmp_path, derive_tiles="always")
+    _cache_children(provider, 10, 5, 6)
+    assert provider.get_tile(10, 5, 6).getpixel((64, 64)) == COLORS[0]
+    assert provider.downloads == []
+    # warm-cache fetches real tiles regardless.
+    provider.get_tile(10, 5, 6, derive=False)
+    assert len(provider.downloads) == 1
+
+
+def test_prefetch_accepts_providers_overriding_get_tile(monkeypatch):
+    monkeypatch.delenv("GEOVIDEO_OFFLINE", raising=False)
+    tiles = {(12, x, y) for x in (3224, 3225) for y in (1798, 1799)}
+    for derive in (True, False):
+        report = prefetch_tiles(SyntheticTileProvider(), tiles, derive=derive)
+        assert report.fetched == len(tiles) and report.failed == []
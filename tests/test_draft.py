@@ -0,0 +1,33 @@
+import json
+
+from typer.testing import CliRunner
+
+from geovideo import cli
+from geovideo.compositor import Compositor
+from geovideo.draft import DRAFT_PRESET, SpeedupReport, draft_config
+from geovideo.providers import build_provider
+from geovideo.schemas import InputConfig
+
+
+def test_draft_config_scales_frame_and_uses_fast_preset():
+    config = InputConfig.model_validate({"center": {"name": "C", "lat": 21.0, "lon": 105.8}})
+    draft = draft_config(config, 0.5)
+    assert draft.output.preset == DRAFT_PRESET
+    assert config.output.preset == "medium"
+    compositor = Compositor(draft, build_provider(draft.provider))
+    assert (compositor.frame_width, compositor.frame_height) == (540, 960)
+
+
+def test_draft_preview_renders_full_quality_only_with_compare(tmp_path, monkeypatch):
+    monkeypatch.setenv("GEOVIDEO_OFFLINE", "1")
+    calls = []
+    monkeypatch.setattr(cli, "compare_to_full_quality", lambda *args: calls.append(args) or SpeedupReport(0.01, 0.04))
+    config = tmp_path / "project.json"
+    project = {"center": {"name": "C", "lat": 21.0, "lon": 105.8}, "style": {"width": 180, "height": 320}}
+    config.write_text(json.dumps(project))
+    args = ["preview", "--input", str(config), "--out", str(tmp_path / "frame.png"), "--draft"]
+    assert CliRunner().invoke(cli.app, args).exit_code == 0
+    assert calls == []
+    result = CliRunner().invoke(cli.app, [*args, "--compare"])
+    assert result.exit_code == 0 and len(calls) == 1
+    assert "4.0x faster" in result.stdout
@@ -0,0 +1,84 @@
+import io
+import json
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from geovideo.cli import app
+from geovideo.events import NULL_EVENTS, JsonEvents, open_events
+
+
+def _lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_progress_reports_rate_eta_and_bytes(tmp_path):
+    stream = io.StringIO()
+    events = JsonEvents(stream, interval_s=0.0)
+    events.set_context(job=1)
+    events.phase("render", total_frames=4)
+    events.start_frames(4, done=1, bytes_written=100)
+    partial = tmp_path / "segment.partial.mp4"
+    partial.write_bytes(b"x" * 50)
+    events.writing(partial)
+    for _ in range(3):
+        events.frame_done()
+    records = _lines(stream)
+    assert records[0]["event"] == "phase" and records[0]["phase"] == "render" and records[0]["job"] == 1
+    progress = [record for record in records if record["event"] == "progress"]
+    assert [record["frames_done"] for record in progress] == [2, 3, 4]
+    assert progress[0]["fps"] is None
+    assert progress[-1]["fps"] > 0 and progress[-1]["eta_s"] == 0
+    assert progress[-1]["bytes_written"] == 150
+    events.wrote(partial)
+    assert events.bytes_written == 150 and events.current_file is None
+
+
+def test_progress_is_throttled():
+    stream = io.StringIO()
+    events = JsonEvents(stream, interval_s=60.0)
+    events.start_frames(1000)
+    for _ in range(1000):
+        events.frame_done()
+    # The first frame and the last one.
+    assert [record["frames_done"] for record in _lines(stream)] == [1, 1000]
+
+
+def test_open_events_targets(tmp_path):
+    assert open_events(None) is NULL_EVENTS
+    events = open_events(str(tmp_path / "logs" / "events.jsonl"))
+    events.emit("done", cached=True)
+    events.close()
+    assert json.loads((tmp_path / "logs" / "events.jsonl").read_text())["cached"] is True
+    read_fd, write_fd = os.pipe()
+    events = open_events(f"fd:{write_fd}")
+    events.phase("mux")
+    events.close()
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        assert json.loads(pipe.readline())["phase"] == "mux"
+    with pytest.raises(ValueError):
+        open_events("fd:x")
+
+
+def test_batch_keeps_stdout_to_json_events(tmp_path, monkeypatch):
+    monkeypatch.setenv("GEOVIDEO_OFFLINE", "1")
+    config = {
+        "center": {"name": "Center", "lat": 21.0285, "lon": 105.8045},
+        "pois": [{"name": "Market", "lat": 21.0295, "lon": 105.8055}],
+        "style": {"width": 180, "height": 320, "fps": 5},
+        "timeline": {"duration": 0.4},
+        "provider": {"cache_dir": str(tmp_path / "tiles")},
+        "output": {"path": str(tmp_path / "out.mp4"), "work_dir": str(tmp_path / "work")},
+    }
+    path = tmp_path / "project.json"
+    path.write_text(json.dumps(config))
+    result = CliRunner().invoke(app, ["batch", str(path), "--events", "stdout", "--verbose", "--no-cache"])
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    events = [record["event"] for record in records]
+    assert events[0] == "job" and events[-1] == "batch_done"
+    assert "done" in events and records[-1]["failed"] == 0
+    assert "Rendering video frames..." in result.stderr
+    assert (tmp_path / "out.mp4").stat().st_size > 0
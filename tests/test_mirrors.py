@@ -0,0 +1,115 @@
+import io
+import threading
+import time
+from collections import Counter
+
+from PIL import Image
+
+from geovideo.profiling import Profiler
+from geovideo.providers import build_provider
+from geovideo.providers.mirrors import HedgedFetcher, LatencyTracker, expand_templates
+from geovideo.schemas import ProviderConfig
+
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (256, 256), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_subdomains_and_mirrors_expand_to_hosts():
+    urls = expand_templates(["https://{s}.tiles.test/{z}/{x}/{y}.png", "https://mirror.test/{z}/{x}/{y}.png"])
+    assert urls == [
+        "https://a.tiles.test/{z}/{x}/{y}.png",
+        "https://b.tiles.test/{z}/{x}/{y}.png",
+        "https://c.tiles.test/{z}/{x}/{y}.png",
+        "https://mirror.test/{z}/{x}/{y}.png",
+    ]
+    assert expand_templates(["https://{s}.t/{z}"], ["x", "y"]) == ["https://x.t/{z}", "https://y.t/{z}"]
+
+
+def test_slow_mirror_is_hedged_and_first_answer_wins():
+    def get(url):
+        if "slow" in url:
+            time.sleep(1.0)
+            return b"slow"
+        return b"fast"
+
+    fetcher = HedgedFetcher(LatencyTracker(initial_s=0.05))
+    start = time.perf_counter()
+    result = fetcher.fetch(get, ["https://slow.test/1", "https://fast.test/1"], primary=0)
+    assert time.perf_counter() - start < 0.5
+    assert (result.content, result.hedged, result.hedge_won) == (b"fast", True, True)
+    # A quick primary is never duplicated.
+    result = fetcher.fetch(get, ["https://fast.test/2", "https://slow.test/2"], primary=0)
+    assert (result.content, result.hedged) == (b"fast", False)
+    fetcher.close()
+
+
+def test_provider_shards_tiles_and_retries_on_another_mirror(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEOVIDEO_OFFLINE", raising=False)
+    config = ProviderConfig(
+        name="custom",
+        url_template="https://{s}.tiles.test/{z}/{x}/{y}.png",
+        subdomains=["a", "b"],
+        cache_dir=str(tmp_path),
+        throttle_s=0,
+        hedge_percentile=None,
+    )
+    provider = build_provider(config)
+    provider.profiler = Profiler()
+    hosts = Counter()
+    png = _png()
+
+    def download(url):
+        hosts[url.split("/")[2]] += 1
+        if url.endswith("/9/0/0.png") and "a." in url:
+            raise OSError("host down")
+        return png
+
+    monkeypatch.setattr(provider, "_download", download)
+    for x in range(4):
+        provider.get_tile(3, x, 1)
+    assert hosts == {"a.tiles.test": 2, "b.tiles.test": 2}
+    provider.get_tile(9, 0, 0)
+    assert hosts["b.tiles.test"] == 3
+    assert provider.profiler.counters["tile_fetch_errors"] == 1
+
+
+def test_provider_threads_share_one_hedger_and_hedges_skip_the_primary_queue(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEOVIDEO_OFFLINE", raising=False)
+    config = ProviderConfig(
+        name="custom",
+        url_template="https://{s}.tiles.test/{z}/{x}/{y}.png",
+        subdomains=["slow", "fast"],
+        cache_dir=str(tmp_path),
+        throttle_s=0,
+        max_connections=1,
+    )
+    provider = build_provider(config)
+    fetchers = set()
+    barrier = threading.Barrier(8)
+
+    def fetcher():
+        barrier.wait()
+        fetchers.add(id(provider._hedged_fetcher()))
+
+    threads = [threading.Thread(target=fetcher) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fetchers) == 1
+
+    def get(url):
+        time.sleep(1.0 if "slow" in url else 0.0)
+        return url.encode()
+
+    hedger = provider._hedged_fetcher()
+    hedger.tracker.initial_s = 0.05
+    # The single primary worker is busy with a slow request; the hedge must not wait for it.
+    start = time.perf_counter()
+    result = hedger.fetch(get, ["https://slow.test/1", "https://fast.test/1"], primary=0)
+    assert result.hedge_won and time.perf_counter() - start < 0.5
+    provider.close()
+    assert provider._hedger is None
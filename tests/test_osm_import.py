@@ -0,0 +1,58 @@
+import json
+
+from geovideo.osm_import import NodeIndex, build_import_config, import_overpass, iter_elements
+from geovideo.schemas import Location
+
+CENTER = Location(name="Center", lat=10.0, lon=106.0)
+
+
+def _write_overpass(path):
+    # Overpass exports often list ways before the nodes they reference.
+    elements = [
+        {"type": "way", "id": 10, "nodes": [1, 2, 3, 1], "tags": {"amenity": "school", "name": "Green School"}},
+        {"type": "way", "id": 11, "nodes": [1, 2, 3, 1], "tags": {"highway": "residential"}},
+        {"type": "node", "id": 1, "lat": 10.001, "lon": 106.001},
+        {"type": "node", "id": 2, "lat": 10.002, "lon": 106.001},
+        {"type": "node", "id": 3, "lat": 10.002, "lon": 106.002},
+        {"type": "node", "id": 4, "lat": 10.0005, "lon": 106.0, "tags": {"amenity": "school", "name": "Green School"}},
+        {"type": "node", "id": 5, "lat": 10.003, "lon": 106.0, "tags": {"amenity": "cafe", "name": "Cafe"}},
+        {"type": "node", "id": 6, "lat": 10.5, "lon": 106.5, "tags": {"shop": "supermarket", "name": "Far Mart"}},
+        {"type": "node", "id": 7, "lat": 10.001, "lon": 106.0, "tags": {"leisure": "park", "name": "Park"}},
+    ]
+    path.write_text(json.dumps({"version": 0.6, "elements": elements}, indent=1), encoding="utf-8")
+
+
+def test_iter_elements_streams_across_small_chunks(tmp_path):
+    path = tmp_path / "export.json"
+    _write_overpass(path)
+    ids = [element["id"] for element in iter_elements(path, chunk_size=7)]
+    assert ids == [10, 11, 1, 2, 3, 4, 5, 6, 7]
+
+
+def test_node_index_lookup_skips_missing_refs():
+    index = NodeIndex()
+    for node_id, lat in ((30, 3.0), (10, 1.0), (20, 2.0)):
+        index.add(node_id, lat, 0.0)
+    assert index.lookup([20, 99, 10])[:, 0].tolist() == [2.0, 1.0]
+
+
+def test_import_filters_radius_and_dedupes(tmp_path):
+    path = tmp_path / "export.json"
+    _write_overpass(path)
+    result = import_overpass(path, CENTER, radius_m=1000)
+    assert [(poi.name, poi.type) for poi in result.pois] == [("Green School", "school"), ("Cafe", "food")]
+    assert result.pois[0].lat == 10.0005
+    assert result.nodes_indexed == 7
+
+    with_other = import_overpass(path, CENTER, radius_m=1000, include_other=True, max_pois=2)
+    assert [poi.name for poi in with_other.pois] == ["Green School", "Park"]
+
+
+def test_import_boundary_way_builds_polygon(tmp_path):
+    path = tmp_path / "export.json"
+    _write_overpass(path)
+    result = import_overpass(path, CENTER, radius_m=1000, boundary_way=11)
+    assert [(p.lat, p.lon) for p in result.polygon] == [(10.001, 106.001), (10.002, 106.001), (10.002, 106.002)]
+    config = build_import_config(None, CENTER, result)
+    assert config.style.show_polygon and len(config.style.polygon_points) == 3
+    assert len(config.pois) == 2
@@ -0,0 +1,78 @@
+import os
+
+from geovideo.output_cache import OutputCache, output_cache_key, tile_fingerprint
+from geovideo.providers.base import TileProvider
+from geovideo.schemas import InputConfig
+
+
+def _config(tmp_path, **audio):
+    return InputConfig.model_validate(
+        {"center": {"name": "C", "lat": 21.0, "lon": 105.8}, "output": {"path": str(tmp_path / "out.mp4")}, "audio": audio}
+    )
+
+
+def _provider(tmp_path):
+    return TileProvider(name="osm", url_template="https://tiles/{z}/{x}/{y}.png", attribution="", cache_dir=tmp_path / "tiles")
+
+
+def test_key_covers_settings_and_input_content(tmp_path):
+    music = tmp_path / "music.mp3"
+    music.write_bytes(b"one")
+    config = _config(tmp_path, music_path=str(music))
+    provider = _provider(tmp_path)
+    key = output_cache_key(config, 1, "all", provider)
+
+    moved = config.model_copy(deep=True)
+    moved.output.path = str(tmp_path / "elsewhere" / "out.mp4")
+    moved.provider.throttle_s = 2.0
+    assert output_cache_key(moved, 1, "all", provider) == key
+    assert output_cache_key(config, 2, "all", provider) != key
+    other_tiles = _provider(tmp_path)
+    other_tiles.url_template = "https://satellite/{z}/{x}/{y}.png"
+    assert output_cache_key(config, 1, "all", other_tiles) != key
+
+    music.write_bytes(b"two")
+    assert output_cache_key(config, 1, "all", provider) != key
+
+
+def test_tile_fingerprint_rejects_placeholders(tmp_path):
+    provider = _provider(tmp_path)
+    tile = provider._cache_path(16, 1, 2)
+    tile.parent.mkdir(parents=True)
+    tile.write_bytes(b"png")
+    provider.tile_log = {(16, 1, 2): "cache"}
+    assert list(tile_fingerprint(provider)) == [str(tile)]
+    provider.tile_log[(16, 1, 3)] = "placeholder"
+    assert tile_fingerprint(provider) is None
+
+
+def test_fetch_links_output_and_invalidates_on_tile_change(tmp_path):
+    cache = OutputCache(tmp_path / "cache", max_bytes=1 << 20)
+    tile = tmp_path / "tile.png"
+    tile.write_bytes(b"png")
+    rendered = tmp_path / "render.mp4"
+    rendered.write_bytes(b"video")
+    stat = tile.stat()
+    cache.store("k1", rendered, {str(tile): (stat.st_size, stat.st_mtime_ns)})
+
+    destination = tmp_path / "again" / "out.mp4"
+    assert cache.fetch("k1", destination)
+    assert destination.read_bytes() == b"video"
+    assert cache.fetch("k1", destination)
+    assert sorted(path.name for path in destination.parent.iterdir()) == ["out.mp4"]
+
+    tile.write_bytes(b"newer png")
+    assert not cache.fetch("k1", tmp_path / "third.mp4")
+    assert not cache.media_path("k1", ".mp4").exists()
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    cache = OutputCache(tmp_path / "cache", max_bytes=10)
+    for index, key in enumerate(("old", "new")):
+        source = tmp_path / f"{key}.mp4"
+        source.write_bytes(b"x" * 8)
+        cache.store(key, source, {})
+        os.utime(cache.media_path(key, ".mp4"), (index, index))
+    cache.evict()
+    assert not cache.manifest_path("old").exists()
+    assert cache.media_path("new", ".mp4").exists()
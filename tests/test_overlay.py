@@ -0,0 +1,46 @@
+import numpy as np
+from PIL import Image
+
+from geovideo.overlay import build_overlay_layer, overlay_origin
+
+
+def _write_gif(path):
+    frames = [Image.new("RGBA", (40, 20), color) for color in ((255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 255))]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=[100, 200, 100], loop=0, disposal=2)
+
+
+def test_gif_frames_follow_their_durations(tmp_path):
+    path = tmp_path / "badge.gif"
+    _write_gif(path)
+    layer = build_overlay_layer(str(path), (80, 80), "top_left", margin=4)
+    assert layer.frames.shape == (3, 40, 80, 4)
+    assert [layer.frame_index(t) for t in (0.0, 0.15, 0.35, 0.45)] == [0, 1, 2, 0]
+    assert layer.position == (4, 4)
+    layer.loop = False
+    assert layer.frame_index(5.0) == 2
+
+
+def test_png_sequence_is_cropped_and_memory_mapped(tmp_path):
+    frames_dir = tmp_path / "frames"
+    frames_dir.mkdir()
+    for index in range(4):
+        image = Image.new("RGBA", (100, 100), (0, 0, 0, 0))
+        image.paste((255, 255, 255, 255), (40 + index, 40, 60 + index, 60))
+        image.save(frames_dir / f"{index:03d}.png")
+    cache_dir = tmp_path / "cache"
+    layer = build_overlay_layer(str(frames_dir), (100, 100), "bottom_right", margin=0, sequence_fps=4, cache_dir=str(cache_dir))
+    assert isinstance(layer.frames, np.memmap)
+    # Only the union of visible pixels is stored, and the blit position accounts for the crop.
+    assert layer.frames.shape == (4, 20, 23, 4)
+    assert layer.position == (40, 40)
+    assert layer.frame_index(0.6) == 2
+
+    again = build_overlay_layer(str(frames_dir), (100, 100), "center", margin=0, sequence_fps=4, cache_dir=str(cache_dir))
+    assert again.frames.filename == layer.frames.filename
+    assert len(list(cache_dir.glob("*.npy"))) == 1
+
+
+def test_overlay_origin_presets():
+    assert overlay_origin("right", (270, 480), (100, 50), 20) == (150, 96)
+    assert overlay_origin("bottom_left", (270, 480), (100, 50), 20) == (20, 410)
+    assert overlay_origin("center", (270, 480), (100, 50), 20) == (85, 215)
@@ -0,0 +1,23 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from geovideo.preview import contact_sheet, frame_paths, preview_times
+
+
+def test_preview_times_from_list_and_step():
+    assert preview_times(None, 0.0, None, None, duration=10.0) == [3.2]
+    assert preview_times([1.5], 0.0, 2.0, 1.0, duration=10.0) == [1.5, 0.0, 1.0, 2.0]
+    assert len(preview_times(None, 0.0, None, 0.5, duration=10.0)) == 21
+    for step in (0.0, -1.0):
+        with pytest.raises(ValueError):
+            preview_times(None, 0.0, None, step, duration=10.0)
+
+
+def test_frame_paths_and_contact_sheet_size():
+    paths = frame_paths(Path("out/frame.png"), [0.0, 1.25])
+    assert paths[1].name == "frame_001_1.25s.png"
+    frames = [np.zeros((192, 108, 3), dtype=np.uint8) for _ in range(5)]
+    sheet = contact_sheet(frames, [0, 1, 2, 3, 4], columns=2, thumb_width=54, gap=4)
+    assert sheet.size == (2 * 54 + 3 * 4, 3 * 96 + 4 * 4)
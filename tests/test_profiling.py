@@ -0,0 +1,22 @@
+from geovideo.profiling import NULL_PROFILER, Profiler
+
+
+def test_profiler_summary_and_trace():
+    profiler = Profiler()
+    for _ in range(3):
+        with profiler.span("draw_labels"):
+            pass
+    profiler.count("tile_cache_hits", 3)
+    profiler.count("tile_cache_misses")
+    summary = profiler.summary()
+    assert summary["stages"]["draw_labels"]["count"] == 3
+    assert summary["tile_cache_hit_ratio"] == 0.75
+    events = profiler.trace()["traceEvents"]
+    assert {event["ph"] for event in events} == {"X"}
+    assert all(event["dur"] >= 0 for event in events)
+
+
+def test_null_profiler_is_inert():
+    with NULL_PROFILER.span("anything"):
+        NULL_PROFILER.count("x")
+    assert not NULL_PROFILER.enabled
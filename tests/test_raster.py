@@ -0,0 +1,112 @@
+import math
+import struct
+
+import numpy as np
+from PIL import Image
+
+from geovideo.profiling import Profiler
+from geovideo.providers import build_provider
+from geovideo.providers.raster import NO_DATA_RGB, LocalRasterProvider
+from geovideo.schemas import ProviderConfig
+
+HALF = math.pi * 6378137.0
+Z, X, Y = 12, 3257, 1798
+PIXEL = 2 * HALF / 2**Z / 256
+ORIGIN = ((X / 2**Z - 0.5) * 2 * HALF, (0.5 - Y / 2**Z) * 2 * HALF)
+
+
+def _raster():
+    return np.random.default_rng(7).integers(0, 256, size=(256, 256, 3), dtype=np.uint8)
+
+
+def _world_file(path):
+    # Exactly covers tile Z/X/Y; world files locate the center of the top-left pixel.
+    lines = [PIXEL, 0, 0, -PIXEL, ORIGIN[0] + PIXEL / 2, ORIGIN[1] - PIXEL / 2]
+    path.write_text("\n".join(repr(value) for value in lines))
+
+
+def _write_tiled_tiff(path, array, tile=64):
+    height, width, bands = array.shape
+    chunks = [
+        array[row : row + tile, col : col + tile].tobytes()
+        for row in range(0, height, tile)
+        for col in range(0, width, tile)
+    ]
+    header = 8
+    data = b"".join(chunks)
+    extra_at = header + len(data)
+    extra = b""
+
+    def out_of_line(payload):
+        nonlocal extra
+        offset = extra_at + len(extra)
+        extra += payload
+        return offset
+
+    offsets = [header + sum(len(chunk) for chunk in chunks[:index]) for index in range(len(chunks))]
+    entries = [
+        (256, 3, 1, struct.pack("<HH", width, 0)),
+        (257, 3, 1, struct.pack("<HH", height, 0)),
+        (258, 3, 3, struct.pack("<I", out_of_line(struct.pack("<3H", 8, 8, 8)))),
+        (259, 3, 1, struct.pack("<HH", 1, 0)),
+        (262, 3, 1, struct.pack("<HH", 2, 0)),
+        (277, 3, 1, struct.pack("<HH", bands, 0)),
+        (322, 3, 1, struct.pack("<HH", tile, 0)),
+        (323, 3, 1, struct.pack("<HH", tile, 0)),
+        (324, 4, len(chunks), struct.pack("<I", out_of_line(struct.pack(f"<{len(offsets)}I", *offsets)))),
+        (325, 4, len(chunks), struct.pack("<I", out_of_line(struct.pack(f"<{len(chunks)}I", *map(len, chunks))))),
+        (33550, 12, 3, struct.pack("<I", out_of_line(struct.pack("<3d", PIXEL, PIXEL, 0)))),
+        (33922, 12, 6, struct.pack("<I", out_of_line(struct.pack("<6d", 0, 0, 0, *ORIGIN, 0)))),
+    ]
+    ifd_at = extra_at + len(extra)
+    ifd = struct.pack("<H", len(entries))
+    ifd += b"".join(struct.pack("<HHI", tag, kind, count) + value for tag, kind, count, value in entries)
+    ifd += struct.pack("<I", 0)
+    path.write_bytes(b"II*\x00" + struct.pack("<I", ifd_at) + data + extra + ifd)
+
+
+def test_tile_cut_from_an_aligned_raster_is_exact_and_cached(tmp_path):
+    array = _raster()
+    np.save(tmp_path / "ortho.npy", array)
+    _world_file(tmp_path / "ortho.npyw")
+    config = ProviderConfig(name="local_raster", raster_path=str(tmp_path / "ortho.npy"), cache_dir=str(tmp_path / "tiles"))
+    provider = build_provider(config)
+    provider.profiler = Profiler()
+    provider.tile_log = {}
+    tile = provider.get_tile(Z, X, Y)
+    assert np.array_equal(np.asarray(tile), array)
+    assert provider.tile_log[(Z, X, Y)] == "generated"
+    assert provider._cache_path(Z, X, Y).exists()
+    provider.get_tile(Z, X, Y)
+    assert provider.tile_log[(Z, X, Y)] == "cache"
+    # Beyond the raster edge the tile falls back to the placeholder background.
+    assert np.all(np.asarray(provider.get_tile(Z, X + 2, Y)) == NO_DATA_RGB)
+
+
+def test_tiled_geotiff_and_deflate_strips_match_the_array(tmp_path):
+    array = _raster()
+    _write_tiled_tiff(tmp_path / "tiled.tif", array)
+    Image.fromarray(array).save(tmp_path / "strips.tif", compression="tiff_adobe_deflate")
+    _world_file(tmp_path / "strips.tfw")
+    for name in ("tiled.tif", "strips.tif"):
+        provider = LocalRasterProvider(cache_dir=tmp_path / "tiles", raster_path=tmp_path / name)
+        assert np.array_equal(provider.render_tile(Z, X, Y), array), name
+        # Odd pixels of a zoomed-in tile sit a quarter of the way between source pixels.
+        quadrant = provider.render_tile(Z + 1, 2 * X, 2 * Y).astype(float)
+        source = array[:129, :129].astype(float)
+        rows = source[:-1] * 0.75 + source[1:] * 0.25
+        expected = rows[:, :-1] * 0.75 + rows[:, 1:] * 0.25
+        assert np.abs(quadrant[1::2, 1::2] - expected).max() <= 1
+
+
+def test_editing_the_world_file_changes_the_tile_source(tmp_path):
+    np.save(tmp_path / "ortho.npy", _raster())
+    world = tmp_path / "ortho.npyw"
+    _world_file(world)
+    before = LocalRasterProvider(cache_dir=tmp_path / "tiles", raster_path=tmp_path / "ortho.npy")
+    lines = world.read_text().splitlines()
+    lines[4] = repr(float(lines[4]) + PIXEL * 16)
+    world.write_text("\n".join(lines))
+    after = LocalRasterProvider(cache_dir=tmp_path / "tiles", raster_path=tmp_path / "ortho.npy")
+    assert after.url_template != before.url_template
+    assert after._cache_path(Z, X, Y) != before._cache_path(Z, X, Y)
@@ -0,0 +1,128 @@
+import io
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from geovideo.prefetch import prefetch_tiles
+from geovideo.profiling import Profiler
+from geovideo.providers import build_provider
+from geovideo.providers.base import TileProvider
+from geovideo.providers.cache import TileCache
+from geovideo.schemas import ProviderConfig
+
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (256, 256), (10, 20, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@dataclass
+class SlowProvider(TileProvider):
+    name: str = "slow"
+    url_template: str = "https://tiles.test/{z}/{x}/{y}.png"
+    attribution: str = ""
+    throttle_s: float = 0.0
+    log_path: Path = Path("downloads.log")
+
+    def _download(self, url: str) -> bytes:
+        with open(self.log_path, "a", encoding="utf-8") as handle:
+            handle.write(url + "\n")
+        time.sleep(0.3)
+        return _png()
+
+
+def _fetch(cache_dir: str, log_path: str) -> None:
+    provider = SlowProvider(cache_dir=Path(cache_dir), log_path=Path(log_path))
+    assert provider.get_tile(5, 3, 7).size == (256, 256)
+
+
+@pytest.fixture(autouse=True)
+def _online(monkeypatch):
+    monkeypatch.delenv("GEOVIDEO_OFFLINE", raising=False)
+
+
+def test_concurrent_processes_fetch_a_missing_tile_once(tmp_path):
+    log_path = tmp_path / "downloads.log"
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_fetch, args=(str(tmp_path / "tiles"), str(log_path))) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+    assert [worker.exitcode for worker in workers] == [0, 0, 0, 0]
+    assert len(log_path.read_text().splitlines()) == 1
+    # Nothing but the tile itself is left behind: no temp files, no lock.
+    assert [path.name for path in (tmp_path / "tiles").rglob("*") if path.is_file()] == ["7.png"]
+
+
+def test_corrupt_entry_is_refetched(tmp_path):
+    provider = SlowProvider(cache_dir=tmp_path / "tiles", log_path=tmp_path / "downloads.log")
+    provider.profiler = Profiler()
+    path = provider._cache_path(5, 3, 7)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(_png()[:100])
+    assert provider.get_tile(5, 3, 7).getpixel((0, 0)) == (10, 20, 30)
+    assert provider.profiler.counters["tile_cache_corrupt"] == 1
+    assert provider.get_tile(5, 3, 7).size == (256, 256)
+    assert len((tmp_path / "downloads.log").read_text().splitlines()) == 1
+
+
+def test_stale_lock_is_taken_over(tmp_path):
+    provider = SlowProvider(cache_dir=tmp_path / "tiles", log_path=tmp_path / "downloads.log")
+    provider.tile_cache.stale_lock_s = 0.2
+    path = provider._cache_path(5, 3, 7)
+    path.parent.mkdir(parents=True)
+    path.with_name("7.png.lock").write_text("12345")
+    provider.get_tile(5, 3, 7)
+    assert path.exists() and not path.with_name("7.png.lock").exists()
+
+
+def test_lock_taken_over_meanwhile_is_left_to_its_new_owner(tmp_path):
+    cache = TileCache()
+    path = tmp_path / "7.png"
+    lock = tmp_path / "7.png.lock"
+    with cache.locked(path):
+        lock.write_text("12345 other")
+    assert lock.read_text() == "12345 other"
+
+
+def test_only_one_waiter_breaks_a_stale_lock(tmp_path):
+    cache = TileCache(stale_lock_s=0.0)
+    lock = tmp_path / "7.png.lock"
+    lock.write_text("12345")
+    time.sleep(0.01)
+    cache._break_stale_lock(lock)
+    with pytest.raises(FileNotFoundError):
+        cache._break_stale_lock(lock)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prefetch_stays_within_the_providers_connection_limit(tmp_path):
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    class CountingProvider(SlowProvider):
+        def _download(self, url: str) -> bytes:
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                time.sleep(0.05)
+                return _png()
+            finally:
+                with lock:
+                    active[0] -= 1
+
+    provider = CountingProvider(cache_dir=tmp_path / "tiles", max_connections=2)
+    tiles = {(12, x, 1798) for x in range(3220, 3228)}
+    report = prefetch_tiles(provider, tiles, workers=8)
+    assert report.fetched == len(tiles)
+    assert peak[0] == 2
+    assert build_provider(ProviderConfig()).max_connections == 2
+    assert build_provider(ProviderConfig(max_connections=1)).max_connections == 1
@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Set, Tuple
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from geovideo.camera import CameraState
+from geovideo.compositor import Compositor
+from geovideo.providers import build_provider
+from geovideo.providers.base import TileProvider
+from geovideo.schemas import InputConfig, ProviderConfig
+
+
+@dataclass
+class WorldGridProvider(TileProvider):
+    """Tiles whose pixels encode their world position, so any tile size must assemble the same basemap."""
+
+    name: str = "grid"
+    url_template: str = ""
+    attribution: str = ""
+    requested: Set[Tuple[int, int, int]] = field(default_factory=set)
+
+    def get_tile(self, z: int, x: int, y: int, derive: bool = True) -> Image.Image:
+        self.requested.add((z, x, y))
+        size = self.tile_px
+        cols = (x * size + np.arange(size)) % 251
+        rows = (y * size + np.arange(size)) % 241
+        tile = np.zeros((size, size, 3), dtype=np.uint8)
+        tile[..., 0] = cols[None, :]
+        tile[..., 1] = rows[:, None]
+        return Image.fromarray(tile)
+
+
+def _basemap(provider):
+    config = InputConfig.model_validate(
+        {"center": {"name": "Center", "lat": 21.0285, "lon": 105.8045}, "style": {"width": 540, "height": 960}}
+    )
+    compositor = Compositor(config, provider)
+    camera = CameraState(center_lat=21.0285, center_lon=105.8045, zoom=16)
+    return np.asarray(compositor._render_basemap(camera, 540, 960))
+
+
+@pytest.mark.parametrize("tile_size,tile_scale", [(512, 1), (256, 2)])
+def test_large_tiles_assemble_the_same_basemap_with_fewer_requests(tile_size, tile_scale):
+    small = WorldGridProvider()
+    large = WorldGridProvider(tile_size=tile_size, tile_scale=tile_scale)
+    assert np.array_equal(_basemap(small), _basemap(large))
+    assert {z for z, _, _ in large.requested} == {15}
+    assert len(large.requested) * 2 <= len(small.requested)
+
+
+def test_large_tiles_use_their_own_cache_layout_and_url():
+    config = ProviderConfig(name="mapbox", api_key="token", tile_scale=2)
+    provider = build_provider(config)
+    assert provider.tile_px == 1024
+    assert provider._cache_path(3, 1, 2) == Path(".cache/tiles/mapbox/512@2x/3/1/2.png")
+    url = provider.url_template.format(z=3, x=1, y=2, api_key="token", tile_size=provider.tile_size, r="@2x")
+    assert "/tiles/512/3/1/2@2x?" in url
+    assert build_provider(ProviderConfig())._cache_path(3, 1, 2) == Path(".cache/tiles/osm/3/1/2.png")
+    with pytest.raises(ValueError):
+        ProviderConfig(name="osm", tile_size=512)
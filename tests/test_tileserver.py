@@ -0,0 +1,29 @@
+import io
+
+import requests
+from PIL import Image
+
+from geovideo.benchmark import BenchCase
+from geovideo.load_benchmark import run_load_benchmark
+from geovideo.tileserver import FaultProfile, TileServer
+
+
+def test_server_serves_synthetic_tiles_and_injects_429s():
+    with TileServer() as server:
+        response = requests.get(f"{server.url}/mirror/512/15/100/200@2x.png", timeout=5)
+        assert response.status_code == 200
+        assert Image.open(io.BytesIO(response.content)).size == (1024, 1024)
+        assert requests.get(f"{server.url}/tile.png", timeout=5).status_code == 404
+    with TileServer(FaultProfile(throttle_rate=1.0, retry_after_s=3)) as server:
+        response = requests.get(server.url_template.format(z=1, x=0, y=0), timeout=5)
+        assert response.status_code == 429 and response.headers["Retry-After"] == "3"
+        assert server.statuses == {429: 1}
+
+
+def test_load_benchmark_retries_through_injected_errors():
+    case = BenchCase("classic", 270, 480, poi_count=1, polygon_vertices=4)
+    result = run_load_benchmark(FaultProfile(error_rate=0.3, seed=1), "bulk", max_retries=8, case=case)
+    assert result.tiles > 0 and result.failed == 0
+    assert result.retries == result.server_statuses[500] > 0
+    assert result.server_statuses[200] == result.tiles
+    assert result.p50_ms <= result.p99_ms
@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+
+from geovideo.camera import CameraState
+from geovideo.compositor import Compositor, FrameContext
+from geovideo.geometry import project_mercator, simplify_mask
+from geovideo.profiling import Profiler
+from geovideo.providers.synthetic import SyntheticTileProvider
+from geovideo.schemas import InputConfig
+from geovideo.vector import BUILDING, ROAD, load_vector_layer
+
+
+def _write_ways(path):
+    elements = [
+        {"type": "way", "id": 1, "nodes": [1, 2, 3, 4], "tags": {"highway": "primary"}},
+        {"type": "way", "id": 2, "nodes": [5, 6, 7, 5], "tags": {"building": "yes"}},
+        {"type": "way", "id": 3, "nodes": [1, 99], "tags": {"highway": "service"}},
+        {"type": "way", "id": 4, "nodes": [1, 2], "tags": {"waterway": "river"}},
+        {"type": "node", "id": 1, "lat": 21.0285, "lon": 105.800},
+        {"type": "node", "id": 2, "lat": 21.0285, "lon": 105.803},
+        {"type": "node", "id": 3, "lat": 21.02850001, "lon": 105.806},
+        {"type": "node", "id": 4, "lat": 21.0285, "lon": 105.809},
+        {"type": "node", "id": 5, "lat": 21.030, "lon": 105.804},
+        {"type": "node", "id": 6, "lat": 21.031, "lon": 105.804},
+        {"type": "node", "id": 7, "lat": 21.031, "lon": 105.805},
+    ]
+    path.write_text(json.dumps({"elements": elements}), encoding="utf-8")
+
+
+def test_simplify_mask_drops_near_collinear_points():
+    points = np.array([[0.0, 0.0], [1.0, 0.01], [2.0, 0.0], [3.0, 2.0], [4.0, 0.0]])
+    assert simplify_mask(points, 0.1).tolist() == [True, False, True, True, True]
+    ring = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0]])
+    assert simplify_mask(ring, 0.1).all()
+
+
+def test_load_vector_layer_keeps_resolvable_roads_and_buildings(tmp_path):
+    path = tmp_path / "ways.json"
+    _write_ways(path)
+    layer = load_vector_layer(path)
+    assert layer.paths.kinds.tolist() == [ROAD, BUILDING]
+    assert layer.paths.offsets.tolist() == [0, 4, 8]
+    np.testing.assert_allclose(layer.paths.path(0)[0], project_mercator(21.0285, 105.800)[0])
+
+    # The near-straight road collapses to its end points; a zoom where the building is
+    # smaller than half a pixel drops it entirely.
+    assert len(layer.at_zoom(16).path(0)) == 2
+    assert layer.at_zoom(9).kinds.tolist() == [ROAD]
+    assert load_vector_layer(path, buildings=False).paths.kinds.tolist() == [ROAD]
+
+
+def test_compositor_draws_vector_layer_once_per_camera(tmp_path):
+    path = tmp_path / "ways.json"
+    _write_ways(path)
+    config = InputConfig.model_validate(
+        {
+            "center": {"name": "Center", "lat": 21.0285, "lon": 105.8045},
+            "style": {"width": 270, "height": 480, "vector_overlay": {"path": str(path), "road_color": [255, 0, 255, 255]}},
+            "timeline": {"duration": 2.0, "camera_start_zoom": 16, "camera_end_zoom": 16},
+        }
+    )
+    profiler = Profiler()
+    compositor = Compositor(config, SyntheticTileProvider(), profiler=profiler)
+    camera = CameraState(center_lat=21.0285, center_lon=105.8045, zoom=16)
+    frames = [compositor.render_frame(FrameContext(time_s=t, camera=camera)) for t in (0.0, 0.5, 1.0)]
+    assert profiler.summary()["stages"]["vector_layer"]["count"] == 1
+    # The road runs through the frame center row; frames are BGR.
+    row = frames[-1][240]
+    assert ((row[:, 0] == 255) & (row[:, 1] == 0) & (row[:, 2] == 255)).sum() > 200
@@ -0,0 +1,53 @@
+import numpy as np
+from PIL import Image
+
+from geovideo.camera import CameraState
+from geovideo.schemas import InputConfig
+from geovideo.verify import FrameDiff, ssim, verify_backend
+
+
+def test_ssim_is_one_for_identical_frames_and_drops_with_noise():
+    frame = np.random.default_rng(1).integers(0, 256, size=(64, 64, 3), dtype=np.uint8)
+    noisy = np.clip(frame + np.random.default_rng(2).normal(0, 40, frame.shape), 0, 255).astype(np.uint8)
+    assert abs(ssim(frame, frame) - 1.0) < 1e-9
+    assert ssim(frame, noisy) < 0.9
+
+
+def test_numpy_backend_matches_the_pil_reference():
+    config = InputConfig.model_validate(
+        {
+            "center": {"name": "C", "lat": 21.0285, "lon": 105.8045},
+            "pois": [{"name": "A", "lat": 21.031, "lon": 105.807}],
+            "style": {"width": 270, "height": 480, "fps": 10},
+            "timeline": {"duration": 2.0},
+        }
+    )
+    camera = CameraState(center_lat=21.0285, center_lon=105.8045, zoom=15)
+    report = verify_backend(config, camera, [0.0, 1.0, 1.9])
+    assert len(report.frames) == 3 and not report.failures
+    # The ring sits under the POI label in both backends.
+    assert max(frame.max_diff for frame in report.frames) <= 1
+    assert FrameDiff(0.0, 255, 0.5, 0.99).passes(0.1, 0.999) is False
+
+
+def test_overlay_stays_under_the_attribution_in_both_backends(tmp_path):
+    overlay = tmp_path / "overlay.png"
+    Image.new("RGBA", (200, 60), (200, 40, 40, 128)).save(overlay)
+    config = InputConfig.model_validate(
+        {
+            "center": {"name": "C", "lat": 21.0285, "lon": 105.8045},
+            "pois": [{"name": "A", "lat": 21.031, "lon": 105.807}],
+            "style": {
+                "width": 270,
+                "height": 480,
+                "fps": 10,
+                "overlay_path": str(overlay),
+                "overlay_position": "bottom_right",
+                "overlay_cache_dir": None,
+            },
+            "timeline": {"duration": 2.0},
+        }
+    )
+    camera = CameraState(center_lat=21.0285, center_lon=105.8045, zoom=15)
+    report = verify_backend(config, camera, [0.0, 1.0, 1.9])
+    assert max(frame.max_diff for frame in report.frames) == 0